@@ -3,7 +3,6 @@ NAWRA Backend API - Vercel Serverless Deployment
 Includes authentication, database connectivity, and debug endpoints
 """
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from datetime import datetime
 import sys
@@ -13,6 +12,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.config import settings
+from app.core.middleware import install_middleware
 
 # API Documentation Metadata
 description = """
@@ -95,14 +95,8 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS if isinstance(settings.CORS_ORIGINS, list) else [settings.CORS_ORIGINS],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Admission, idempotency, CORS, response encoding and stale labels, as in main.py
+install_middleware(app)
 
 # Custom OpenAPI schema to add security schemes
 def custom_openapi():
@@ -144,12 +138,13 @@ router_status = {
     "books": "not_loaded",
     "profile": "not_loaded",
     "requests": "not_loaded",
+    "system": "not_loaded",
     "error": None
 }
 
 # Include routers
 try:
-    from app.api.v1.endpoints import auth, analytics, dashboard, users, circulation, reports, settings, books, profile, requests
+    from app.api.v1.endpoints import auth, analytics, dashboard, users, circulation, reports, settings, books, profile, requests, system, catalog, sync
 
     # Authentication
     app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
@@ -189,6 +184,18 @@ try:
     app.include_router(requests.router, prefix="/api/v1/requests", tags=["book-requests"])
     router_status["requests"] = "loaded"
 
+    # Public catalogue (no authentication)
+    app.include_router(catalog.router, prefix="/api/v1/catalog", tags=["catalog"])
+    router_status["catalog"] = "loaded"
+
+    # Delta sync for offline clients
+    app.include_router(sync.router, prefix="/api/v1/sync", tags=["sync"])
+    router_status["sync"] = "loaded"
+
+    # Operations
+    app.include_router(system.router, prefix="/api/v1/system", tags=["system"])
+    router_status["system"] = "loaded"
+
 except Exception as e:
     router_status["error"] = str(e)
     print(f"Warning: Could not load routers: {e}")
@@ -4,22 +4,18 @@ Analytics endpoints for dashboard charts and statistics
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional
 from datetime import datetime, timedelta
-from ....db import get_supabase
+from ....db.replica import get_read_db
+from ....services.circulation_history_service import CirculationHistoryService
 from ....core.dependencies import require_any_permission
 from supabase import Client
 
 router = APIRouter()
 
 
-def get_db() -> Client:
-    """Dependency to get Supabase client"""
-    return get_supabase()
-
-
 @router.get("/borrowing-trends", summary="Get borrowing and return trends")
-async def get_borrowing_trends(
+def get_borrowing_trends(
     days: int = Query(default=30, ge=1, le=365, description="Number of days to fetch"),
-    db: Client = Depends(get_db),
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "circulation.checkout", "circulation.checkin"]))
 ):
     """
@@ -99,8 +95,8 @@ async def get_borrowing_trends(
 
 
 @router.get("/categories", summary="Get books by category")
-async def get_books_by_category(
-    db: Client = Depends(get_db),
+def get_books_by_category(
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "inventory.read"]))
 ):
     """
@@ -155,8 +151,8 @@ async def get_books_by_category(
 
 
 @router.get("/user-distribution", summary="Get user distribution by type")
-async def get_user_distribution(
-    db: Client = Depends(get_db),
+def get_user_distribution(
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "users.read"]))
 ):
     """
@@ -208,7 +204,6 @@ async def get_user_distribution(
 @router.get("/monthly-circulation", summary="Get monthly circulation statistics")
 async def get_monthly_circulation(
     months: int = Query(default=12, ge=1, le=24, description="Number of months to fetch"),
-    db: Client = Depends(get_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "circulation.checkout", "circulation.checkin"]))
 ):
     """
@@ -225,21 +220,21 @@ async def get_monthly_circulation(
         end_date = datetime.now()
         start_date = end_date - timedelta(days=months*30)  # Approximate
 
-        # Fetch all circulation_records in range
-        response = db.table('circulation_records').select(
-            'checkout_date, return_date, id'
-        ).gte(
-            'checkout_date', start_date.isoformat()
-        ).execute()
+        # Fetch all circulation records in range (archived years included)
+        records = await CirculationHistoryService().get_records(
+            start_date.date(),
+            end_date.date(),
+            ('id', 'issue_date', 'return_date')
+        )
 
         # Process data by month
         monthly_checkouts = {}
         monthly_returns = {}
 
-        for transaction in response.data:
+        for transaction in records:
             # Process checkout
-            if transaction.get('checkout_date'):
-                month_key = transaction['checkout_date'][:7]  # YYYY-MM
+            if transaction.get('issue_date'):
+                month_key = transaction['issue_date'][:7]  # YYYY-MM
                 monthly_checkouts[month_key] = monthly_checkouts.get(month_key, 0) + 1
 
             # Process return
@@ -1,10 +1,18 @@
 """
 Books and categories management endpoints.
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from uuid import UUID
+import json
+import tempfile
+from app.core.catalog_formats import FORMATS, read_records, resolve_format
+from app.core.config import settings
 from app.core.dependencies import require_permissions, require_any_permission
+from app.core.conditional import ResourceVersion
+from app.core.fields import sparse_fields, sparse_response
+from app.core.responses import FastJSONResponse
 from app.models.books import (
     # Category models
     CategoryCreate,
@@ -16,6 +24,7 @@ from app.models.books import (
     BookUpdate,
     BookResponse,
     BookListResponse,
+    BookListItem,
     BookFilters,
     BookStatistics,
     BookSortField,
@@ -25,8 +34,15 @@ from app.models.books import (
     BulkBookUpdate,
     BulkBookDelete,
     BulkOperationResponse,
+    # Availability
+    BookAvailabilityRequest,
+    BookAvailabilityResponse,
+    # Suggestions
+    BookSuggestResponse,
 )
 from app.services.books_service import BooksService
+from app.services.import_service import CatalogImportService
+from app.services.search_service import get_search_index
 from datetime import date
 
 
@@ -49,12 +65,17 @@ def get_books_service() -> BooksService:
     tags=["Categories"]
 )
 async def get_categories(
-    include_counts: bool = Query(False, description="Include book counts for each category"),
+    request: Request,
+    include_counts: bool = Query(False, description="Include book counts (direct and subtree) for each category"),
     books_service: BooksService = Depends(get_books_service)
 ):
     """
     Get all library categories.
 
+    Supports conditional requests: returns 304 when If-None-Match matches
+    the listing's ETag (derived from category count, newest updated_at and
+    book counts), without re-serializing the listing.
+
     Args:
         include_counts: Whether to include book counts for each category
 
@@ -63,7 +84,17 @@ async def get_categories(
     """
     try:
         categories = await books_service.get_categories(include_counts=include_counts)
-        return categories
+
+        version = ResourceVersion.of_collection(
+            "categories",
+            categories.items,
+            include_counts,
+            [item.book_count for item in categories.items] if include_counts else None
+        )
+        if version.matches(request):
+            return version.not_modified()
+
+        return version.apply(FastJSONResponse(categories))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -252,6 +283,7 @@ async def get_books(
     # Search and filters
     search: Optional[str] = Query(None, description="Search in title, author, ISBN"),
     category_id: Optional[UUID] = Query(None, description="Filter by category"),
+    include_subcategories: bool = Query(False, description="Also match books in sub-categories of category_id"),
     status: Optional[BookStatus] = Query(None, description="Filter by status"),
     available_only: Optional[bool] = Query(None, description="Show only available books"),
     language: Optional[str] = Query(None, description="Filter by language"),
@@ -268,6 +300,12 @@ async def get_books(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(12, ge=1, le=100, description="Items per page"),
 
+    # Sparse fieldset
+    fields: Optional[List[str]] = Depends(sparse_fields(BookListItem)),
+
+    # Facet counts
+    facets: bool = Query(False, description="Include category/language/status/year facet counts"),
+
     books_service: BooksService = Depends(get_books_service),
     current_user: dict = Depends(require_any_permission(["inventory.read", "catalog.search"]))
 ):
@@ -278,11 +316,14 @@ async def get_books(
 
     Supports:
     - Full-text search in title, author, and ISBN
-    - Filtering by category, status, language, year range, acquisition date
+    - Filtering by category (optionally with its sub-categories), status,
+      language, year range, acquisition date
 
     **Required permission:** Any of inventory.read or catalog.search
     - Sorting by various fields
     - Pagination
+    - Sparse fieldsets (`fields=id,title,author`)
+    - Facet counts (`facets=true`), each ignoring its own filter
 
     Returns:
         BookListResponse with paginated results and metadata
@@ -292,6 +333,7 @@ async def get_books(
         filters = BookFilters(
             search=search,
             category_id=category_id,
+            include_subcategories=include_subcategories,
             status=status,
             available_only=available_only,
             language=language,
@@ -305,8 +347,8 @@ async def get_books(
             page_size=page_size
         )
 
-        books = await books_service.get_books(filters)
-        return books
+        books = await books_service.get_books(filters, fields=fields, facets=facets)
+        return sparse_response(books) if fields else FastJSONResponse(books)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -314,6 +356,36 @@ async def get_books(
         )
 
 
+@router.get(
+    "/books/suggest",
+    response_model=BookSuggestResponse,
+    summary="Typeahead suggestions",
+    tags=["Books"]
+)
+async def suggest_books(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    limit: int = Query(8, ge=1, le=20, description="Maximum suggestions"),
+    current_user: dict = Depends(require_any_permission(["inventory.read", "catalog.search"]))
+):
+    """
+    Suggest titles, authors and ISBNs starting with `q`.
+
+    Served from an in-process prefix index (case, accents and Arabic
+    diacritics/letter variants are ignored), not from the database.
+
+    **Required permission:** Any of inventory.read or catalog.search
+    """
+    try:
+        search_index = get_search_index()
+        await search_index.ensure_ready()
+        return FastJSONResponse({'query': q, 'items': search_index.suggest(q, limit=limit)})
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch suggestions: {str(e)}"
+        )
+
+
 @router.get(
     "/books/{book_id}",
     response_model=BookResponse,
@@ -322,12 +394,17 @@ async def get_books(
 )
 async def get_book(
     book_id: UUID,
+    request: Request,
+    response: Response,
     books_service: BooksService = Depends(get_books_service),
     current_user: dict = Depends(require_any_permission(["inventory.read", "catalog.search"]))
 ):
     """
     Get a specific book by ID with full details and category information.
 
+    Supports conditional requests (If-None-Match / If-Modified-Since); the
+    ETag covers the book's and its category's updated_at.
+
     Args:
         book_id: The book's UUID
 
@@ -335,6 +412,7 @@ async def get_book(
         BookResponse object with complete book details
 
     Raises:
+        304: Client copy is current
         404: Book not found
     """
     try:
@@ -344,6 +422,18 @@ async def get_book(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Book {book_id} not found"
             )
+
+        version = ResourceVersion.of(
+            "book",
+            book.id,
+            book.updated_at.isoformat(),
+            book.category.updated_at.isoformat() if book.category else None,
+            last_modified=book.updated_at
+        )
+        if version.matches(request):
+            return version.not_modified()
+
+        version.apply(response)
         return book
     except HTTPException:
         raise
@@ -606,6 +696,40 @@ async def check_book_availability(
         )
 
 
+@router.post(
+    "/books/availability",
+    response_model=BookAvailabilityResponse,
+    summary="Check availability for many books",
+    tags=["Books", "Inventory"]
+)
+async def check_books_availability(
+    availability_request: BookAvailabilityRequest,
+    books_service: BooksService = Depends(get_books_service),
+    current_user: dict = Depends(require_any_permission(["inventory.read", "catalog.search"]))
+):
+    """
+    Check availability for up to 100 books in one request.
+
+    Args:
+        availability_request: Book IDs to check
+
+    Returns:
+        BookAvailabilityResponse keyed by book ID, plus IDs that were not found
+    """
+    try:
+        items = await books_service.get_availability(availability_request.book_ids)
+        missing = [
+            book_id for book_id in dict.fromkeys(availability_request.book_ids)
+            if str(book_id) not in items
+        ]
+        return BookAvailabilityResponse(items=items, missing=missing)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to check availability: {str(e)}"
+        )
+
+
 # =====================================================
 # Bulk Operations Endpoints
 # =====================================================
@@ -676,6 +800,67 @@ async def bulk_delete_books(
         )
 
 
+@router.post(
+    "/books/import",
+    summary="Import a catalogue file",
+    tags=["Books", "Bulk Operations"],
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One BookImportProgress per line"}}
+)
+async def import_books(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv, jsonl or marc (default: from Content-Type)"),
+    on_duplicate: str = Query("skip", pattern="^(skip|update)$", description="Skip or update books already catalogued"),
+    resume_from: int = Query(0, ge=0, description="resume_from of the last progress line of an interrupted import"),
+    current_user: dict = Depends(require_permissions(["inventory.create"]))
+):
+    """
+    Bulk import books from a CSV, JSON lines or MARC 21 file.
+
+    The file is the raw request body (e.g. `curl --data-binary @catalogue.mrc
+    -H 'Content-Type: application/marc'`). Progress is streamed back as
+    newline-delimited JSON after every batch; a failure mid-import ends the
+    stream with an `{"error": ...}` line, and re-posting the file with the
+    last `resume_from` continues where it stopped.
+
+    Raises:
+        400: Unknown format
+        413: File larger than IMPORT_MAX_FILE_SIZE
+    """
+    fmt = resolve_format(format) or resolve_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown import format; pass format= one of {', '.join(FORMATS)} or a matching Content-Type"
+        )
+
+    # Spool the body (to disk past MAX_FILE_SIZE) so the import reads it at its own pace
+    upload = tempfile.SpooledTemporaryFile(max_size=settings.MAX_FILE_SIZE)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.IMPORT_MAX_FILE_SIZE:
+            upload.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Import file too large; use scripts/import_catalogue.py"
+            )
+        upload.write(chunk)
+    upload.seek(0)
+
+    import_service = CatalogImportService(on_duplicate=on_duplicate)
+
+    async def progress_lines():
+        try:
+            async for progress in import_service.run(read_records(upload, fmt), resume_from=resume_from):
+                yield progress.model_dump_json() + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            upload.close()
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+
 # =====================================================
 # Statistics Endpoint
 # =====================================================
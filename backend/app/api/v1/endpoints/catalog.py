@@ -0,0 +1,239 @@
+"""
+Public catalogue endpoints (anonymous, read-only, CDN-cacheable).
+
+No authentication dependency, so no per-request user lookup. Responses are
+cached server-side under keys embedding the catalogue version (bumped by
+every BooksService write) and carry public Cache-Control with
+stale-while-revalidate plus an ETag of version + canonical query, so CDNs
+and browsers can serve and revalidate them cheaply.
+
+The version is only shared by every worker when Redis is configured.
+Without it (or while it is unreachable) responses get no ETag and only
+`private, max-age=CATALOG_MAX_AGE`, so no shared cache keeps a copy that
+another worker's write has outdated.
+
+Listing URLs are normalised: a request whose query string is not in
+canonical form (sorted keys, defaults dropped, search whitespace/case
+folded, unknown parameters removed) is redirected to the canonical URL,
+so equivalent queries share one shared-cache entry.
+"""
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import RedirectResponse
+from pydantic import TypeAdapter
+
+from ....core.cache import get_cache
+from ....core.conditional import ResourceVersion
+from ....core.config import settings
+from ....core.responses import FastJSONResponse
+from ....models.books import (
+    BookFilters,
+    BookListResponse,
+    BookSortField,
+    CategoryListResponse,
+    PublicBookResponse,
+    SortOrder,
+)
+from ....services.books_service import BooksService, CATALOG_VERSION
+
+router = APIRouter()
+
+_book_list_adapter = TypeAdapter(BookListResponse)
+_book_adapter = TypeAdapter(Optional[PublicBookResponse])
+_category_list_adapter = TypeAdapter(CategoryListResponse)
+
+
+def get_books_service() -> BooksService:
+    """Dependency to get books service instance."""
+    return BooksService()
+
+
+def _cache_control() -> str:
+    return (
+        f"public, max-age={settings.CATALOG_MAX_AGE}, "
+        f"s-maxage={settings.CATALOG_SHARED_MAX_AGE}, "
+        f"stale-while-revalidate={settings.CATALOG_STALE_WHILE_REVALIDATE}"
+    )
+
+
+def canonical_query(filters: BookFilters) -> str:
+    """Deterministic query string for a filter set (sorted, defaults dropped)."""
+    params = filters.model_dump(mode="json", exclude_defaults=True, exclude_none=True)
+    return urlencode(sorted(
+        (key, str(value).lower() if isinstance(value, bool) else value)
+        for key, value in params.items()
+    ))
+
+
+def _vary(response: Response) -> Response:
+    # Shared caches must key negotiated representations separately
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    return response
+
+
+async def _respond(
+    request: Request,
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    adapter: TypeAdapter,
+) -> Response:
+    """Serve `key` for the current catalogue version, honouring conditional requests."""
+    cache = get_cache()
+    catalog_version = await cache.get_shared_version(CATALOG_VERSION)
+    if catalog_version is not None:
+        version = ResourceVersion.of("catalog", catalog_version, key, cache_control=_cache_control())
+        if version.matches(request):
+            return _vary(version.not_modified())
+        cache_key = f"v{catalog_version}:{key}"
+    else:
+        # Per-worker versions: the same number can name different content
+        version = None
+        cache_key = f"local{await cache.get_version(CATALOG_VERSION)}:{key}"
+
+    if cache.enabled:
+        result = await cache.get_or_load(
+            "catalog",
+            cache_key,
+            loader,
+            adapter=adapter,
+            ttl=settings.CATALOG_CACHE_TTL,
+        )
+    else:
+        result = await loader()
+
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    response = FastJSONResponse(result)
+    if version is not None:
+        version.apply(response)
+    else:
+        response.headers["Cache-Control"] = f"private, max-age={settings.CATALOG_MAX_AGE}"
+    return _vary(response)
+
+
+@router.get(
+    "/books",
+    response_model=BookListResponse,
+    summary="Browse the public catalogue"
+)
+async def browse_books(
+    request: Request,
+    search: Optional[str] = Query(None, description="Search in title, author, ISBN"),
+    category_id: Optional[UUID] = Query(None, description="Filter by category"),
+    include_subcategories: bool = Query(False, description="Also match books in sub-categories of category_id"),
+    available_only: Optional[bool] = Query(None, description="Show only available books"),
+    language: Optional[str] = Query(None, description="Filter by language"),
+    year_from: Optional[int] = Query(None, ge=1000, le=9999, description="Publication year from"),
+    year_to: Optional[int] = Query(None, ge=1000, le=9999, description="Publication year to"),
+    sort_by: BookSortField = Query(BookSortField.CREATED_AT, description="Sort field"),
+    sort_order: SortOrder = Query(SortOrder.DESC, description="Sort order"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(12, ge=1, le=100, description="Items per page"),
+    books_service: BooksService = Depends(get_books_service)
+):
+    """
+    Browse the catalogue without authentication.
+
+    Non-canonical query strings are redirected (308) to their canonical
+    form; responses are publicly cacheable.
+    """
+    # Normalise inputs that do not change the result set
+    search = " ".join(search.split()).lower() if search else None
+    filters = BookFilters(
+        search=search or None,
+        category_id=category_id,
+        include_subcategories=include_subcategories and category_id is not None,
+        available_only=available_only or None,
+        language=language.strip().lower() if language and language.strip() else None,
+        year_from=year_from,
+        year_to=year_to,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        page=page,
+        page_size=page_size
+    )
+
+    query = canonical_query(filters)
+    if request.url.query != query:
+        target = request.url.path + (f"?{query}" if query else "")
+        return RedirectResponse(
+            target,
+            status_code=status.HTTP_308_PERMANENT_REDIRECT,
+            headers={"Cache-Control": "public, max-age=86400"}
+        )
+
+    try:
+        return await _respond(
+            request,
+            f"books:{query}",
+            lambda: books_service.get_books(filters),
+            _book_list_adapter
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch catalogue: {str(e)}"
+        )
+
+
+@router.get(
+    "/books/{book_id}",
+    response_model=PublicBookResponse,
+    summary="Get a public catalogue record"
+)
+async def get_public_book(
+    book_id: UUID,
+    request: Request,
+    books_service: BooksService = Depends(get_books_service)
+):
+    """
+    Get a book's public catalogue record (no acquisition or staff fields).
+    """
+    async def load() -> Optional[PublicBookResponse]:
+        book = await books_service.get_book_by_id(book_id)
+        return PublicBookResponse.model_validate(book) if book else None
+
+    try:
+        return await _respond(request, f"book:{book_id}", load, _book_adapter)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch book: {str(e)}"
+        )
+
+
+@router.get(
+    "/categories",
+    response_model=CategoryListResponse,
+    summary="List public catalogue categories"
+)
+async def list_public_categories(
+    request: Request,
+    include_counts: bool = Query(False, description="Include book counts for each category"),
+    books_service: BooksService = Depends(get_books_service)
+):
+    """
+    List categories without authentication.
+    """
+    try:
+        return await _respond(
+            request,
+            f"categories:include_counts={str(include_counts).lower()}",
+            lambda: books_service.get_categories(include_counts=include_counts),
+            _category_list_adapter
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch categories: {str(e)}"
+        )
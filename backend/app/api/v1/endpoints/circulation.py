@@ -2,7 +2,8 @@
 Circulation management endpoints
 """
 from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from ....models.circulation import (
     CirculationCreate,
     CirculationReturn,
@@ -13,7 +14,10 @@ from ....models.circulation import (
     CirculationStatsResponse
 )
 from ....services.circulation_service import CirculationService
+from ....services.circulation_feed_service import get_circulation_feed, publish_loan_change
 from ....core.dependencies import get_current_user, require_any_permission, require_permissions
+from ....core.fields import sparse_fields, sparse_response
+from ....core.responses import FastJSONResponse
 import csv
 import io
 
@@ -35,6 +39,7 @@ async def get_circulation_records(
     due_date_filter: Optional[str] = Query(None, description="Filter by due date (today, tomorrow, week, overdue)"),
     sort_by: str = Query("issue_date", description="Sort field"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="Sort order"),
+    fields: Optional[List[str]] = Depends(sparse_fields(CirculationResponse)),
     circulation_service: CirculationService = Depends(get_circulation_service),
     current_user: dict = Depends(require_any_permission(["circulation.checkout", "circulation.checkin", "circulation.renew", "loans.view"]))
 ):
@@ -52,6 +57,7 @@ async def get_circulation_records(
     - **due_date_filter**: Filter by due date (today, tomorrow, week, overdue)
     - **sort_by**: Sort field (issue_date, due_date, etc.)
     - **sort_order**: Sort order (asc or desc)
+    - **fields**: Comma-separated subset of fields to return (e.g. id,book_title,due_date,status)
 
     **Required permission:** Any of circulation.checkout, circulation.checkin, circulation.renew, or loans.view
     """
@@ -70,9 +76,10 @@ async def get_circulation_records(
             due_date_filter=due_date_filter,
             sort_by=sort_by,
             sort_order=sort_order,
-            user_id=user_id_filter
+            user_id=user_id_filter,
+            fields=fields
         )
-        return result
+        return sparse_response(result) if fields else FastJSONResponse(result)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -97,6 +104,10 @@ async def get_circulation_stats(
     - Most borrowed books
     - Most active users
 
+    Fines, average duration and the rankings are over the live table only
+    (`includes_archived` is false); loans archived after
+    CIRCULATION_RETENTION_DAYS are in the date-ranged reports instead.
+
     **Staff only** - requires circulation or reports permissions
     **Required permission:** Any of circulation.checkout, circulation.checkin, or reports.view
     """
@@ -110,6 +121,47 @@ async def get_circulation_stats(
         )
 
 
+@router.get("/events", summary="Stream live circulation events")
+async def stream_circulation_events(
+    current_user: dict = Depends(require_any_permission(["circulation.checkout", "circulation.checkin", "reports.view"]))
+):
+    """
+    Server-sent events for live dashboards and circulation lists, replacing
+    polling of /dashboard/stats and /circulation
+
+    Events (each `data` is JSON):
+    - **snapshot**: the counters `active_issues`, `overdue_books`,
+      `returned_today`, `total_fines`, `total_fines_paid`; sent first, every
+      CIRCULATION_FEED_REFRESH_INTERVAL seconds, and whenever the client
+      fell behind. Replace local counters with it.
+    - **loan.issued**, **loan.returned**, **loan.renewed**, **fine.paid**,
+      **loan.updated**, **loan.deleted**: `record_id`, `book_id`, `user_id`,
+      the loan dates and fine, and `deltas` to add to the counters
+      (books currently borrowed = active_issues + overdue_books)
+
+    A `: ping` comment is sent when idle. The stream does not replay events
+    missed while disconnected; on reconnect the snapshot brings counters up
+    to date.
+
+    **Staff only** - requires circulation or reports permissions
+    **Required permission:** Any of circulation.checkout, circulation.checkin, or reports.view
+    """
+    feed = get_circulation_feed()
+    try:
+        await feed.load()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch circulation stats: {str(e)}"
+        )
+
+    return StreamingResponse(
+        feed.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/export", summary="Export circulation records to CSV")
 async def export_circulation_records(
     search: Optional[str] = Query(None, description="Search by user name, book title"),
@@ -502,6 +554,8 @@ async def renew_loan(
                 detail="Failed to renew loan"
             )
 
+        publish_loan_change('UPDATE', record, update_response.data[0])
+
         return {
             "message": "Loan renewed successfully",
             "record_id": record_id,
@@ -2,9 +2,13 @@
 Dashboard endpoints for statistics and overview data
 """
 from fastapi import APIRouter, HTTPException, Depends
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timedelta
 from ....db import get_supabase
+from ....core.cache import get_cache
+from ....core.config import settings
 from ....core.dependencies import require_any_permission
+from ....core.singleflight import get_singleflight
 from supabase import Client
 
 router = APIRouter()
@@ -32,128 +36,145 @@ async def get_dashboard_stats(
     **Required permission:** Any of reports.view, circulation.checkout, circulation.checkin, users.read, or inventory.read
     """
     try:
-        # Get current date and date 30 days ago for trend calculation
-        current_date = datetime.now()
-        thirty_days_ago = current_date - timedelta(days=30)
-        sixty_days_ago = current_date - timedelta(days=60)
+        # The last good statistics stand in while the database is unreachable
+        return await get_cache().with_fallback(
+            "dashboard",
+            "stats",
+            lambda: get_singleflight("stats").do(
+                "dashboard:stats",
+                lambda: run_in_threadpool(build_dashboard_stats, db),
+                timeout=settings.SINGLEFLIGHT_TIMEOUT,
+            ),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching dashboard stats: {str(e)}"
+        )
 
-        # --- TOTAL USERS ---
-        total_users_response = db.table('users').select(
-            'id, created_at', count='exact'
-        ).eq('is_active', True).execute()
 
-        total_users = total_users_response.count
+def build_dashboard_stats(db: Client) -> dict:
+    """
+    Compute dashboard statistics (blocking).
 
-        # Users created in last 30 days
-        recent_users_response = db.table('users').select(
-            'id', count='exact'
-        ).gte('created_at', thirty_days_ago.isoformat()).eq('is_active', True).execute()
+    Concurrent dashboard requests share a single run of this function.
+    """
+    # Get current date and date 30 days ago for trend calculation
+    current_date = datetime.now()
+    thirty_days_ago = current_date - timedelta(days=30)
+    sixty_days_ago = current_date - timedelta(days=60)
 
-        # Users created between 60-30 days ago
-        previous_users_response = db.table('users').select(
-            'id', count='exact'
-        ).gte('created_at', sixty_days_ago.isoformat()).lt('created_at', thirty_days_ago.isoformat()).eq('is_active', True).execute()
+    # --- TOTAL USERS ---
+    total_users_response = db.table('users').select(
+        'id, created_at', count='exact'
+    ).eq('is_active', True).execute()
 
-        users_trend = calculate_trend(recent_users_response.count, previous_users_response.count)
+    total_users = total_users_response.count
 
-        # --- TOTAL BOOKS ---
-        total_books_response = db.table('books').select(
-            'id, created_at', count='exact'
-        ).execute()
+    # Users created in last 30 days
+    recent_users_response = db.table('users').select(
+        'id', count='exact'
+    ).gte('created_at', thirty_days_ago.isoformat()).eq('is_active', True).execute()
 
-        total_books = total_books_response.count
+    # Users created between 60-30 days ago
+    previous_users_response = db.table('users').select(
+        'id', count='exact'
+    ).gte('created_at', sixty_days_ago.isoformat()).lt('created_at', thirty_days_ago.isoformat()).eq('is_active', True).execute()
 
-        # Books added in last 30 days
-        recent_books_response = db.table('books').select(
-            'id', count='exact'
-        ).gte('created_at', thirty_days_ago.isoformat()).execute()
+    users_trend = calculate_trend(recent_users_response.count, previous_users_response.count)
 
-        # Books added between 60-30 days ago
-        previous_books_response = db.table('books').select(
-            'id', count='exact'
-        ).gte('created_at', sixty_days_ago.isoformat()).lt('created_at', thirty_days_ago.isoformat()).execute()
+    # --- TOTAL BOOKS ---
+    total_books_response = db.table('books').select(
+        'id, created_at', count='exact'
+    ).execute()
 
-        books_trend = calculate_trend(recent_books_response.count, previous_books_response.count)
+    total_books = total_books_response.count
 
-        # --- BOOKS BORROWED (Currently checked out) ---
-        borrowed_books_response = db.table('circulation_records').select(
-            'id, checkout_date', count='exact'
-        ).is_('return_date', 'null').execute()
+    # Books added in last 30 days
+    recent_books_response = db.table('books').select(
+        'id', count='exact'
+    ).gte('created_at', thirty_days_ago.isoformat()).execute()
 
-        books_borrowed = borrowed_books_response.count
+    # Books added between 60-30 days ago
+    previous_books_response = db.table('books').select(
+        'id', count='exact'
+    ).gte('created_at', sixty_days_ago.isoformat()).lt('created_at', thirty_days_ago.isoformat()).execute()
 
-        # Borrowings in last 30 days
-        recent_borrowings_response = db.table('circulation_records').select(
-            'id', count='exact'
-        ).gte('checkout_date', thirty_days_ago.isoformat()).is_('return_date', 'null').execute()
+    books_trend = calculate_trend(recent_books_response.count, previous_books_response.count)
 
-        # Borrowings between 60-30 days ago (that were active then)
-        previous_borrowings_response = db.table('circulation_records').select(
-            'id', count='exact'
-        ).gte('checkout_date', sixty_days_ago.isoformat()).lt('checkout_date', thirty_days_ago.isoformat()).execute()
+    # --- BOOKS BORROWED (Currently checked out) ---
+    borrowed_books_response = db.table('circulation_records').select(
+        'id, checkout_date', count='exact'
+    ).is_('return_date', 'null').execute()
 
-        borrowed_trend = calculate_trend(recent_borrowings_response.count, previous_borrowings_response.count)
+    books_borrowed = borrowed_books_response.count
 
-        # --- OVERDUE BOOKS ---
-        # Books that are checked out and due date has passed
-        overdue_books_response = db.table('circulation_records').select(
-            'id, due_date', count='exact'
-        ).is_('return_date', 'null').lt('due_date', current_date.isoformat()).execute()
+    # Borrowings in last 30 days
+    recent_borrowings_response = db.table('circulation_records').select(
+        'id', count='exact'
+    ).gte('checkout_date', thirty_days_ago.isoformat()).is_('return_date', 'null').execute()
 
-        overdue_books = overdue_books_response.count
+    # Borrowings between 60-30 days ago (that were active then)
+    previous_borrowings_response = db.table('circulation_records').select(
+        'id', count='exact'
+    ).gte('checkout_date', sixty_days_ago.isoformat()).lt('checkout_date', thirty_days_ago.isoformat()).execute()
 
-        # Overdue books 30 days ago
-        thirty_days_ago_overdue = db.table('circulation_records').select(
-            'id', count='exact'
-        ).is_('return_date', 'null').lt('due_date', thirty_days_ago.isoformat()).execute()
+    borrowed_trend = calculate_trend(recent_borrowings_response.count, previous_borrowings_response.count)
 
-        # Calculate overdue trend (inverted logic - decrease is good)
-        if thirty_days_ago_overdue.count > 0:
-            overdue_change = ((overdue_books - thirty_days_ago_overdue.count) / thirty_days_ago_overdue.count) * 100
-        else:
-            overdue_change = 0 if overdue_books == 0 else 100
-
-        overdue_trend = {
-            'direction': 'up' if overdue_change > 0 else 'down',
-            'percentage': abs(round(overdue_change, 1))
-        }
-
-        # --- SPARKLINE DATA (Last 7 days for mini charts) ---
-        # Generate sparkline data for each metric
-        users_sparkline = generate_sparkline_data(db, 'users', 'created_at', 7)
-        books_sparkline = generate_sparkline_data(db, 'books', 'created_at', 7)
-        borrowings_sparkline = generate_sparkline_data(db, 'transactions', 'checkout_date', 7)
-        overdue_sparkline = generate_overdue_sparkline(db, 7)
-
-        return {
-            "total_users": {
-                "value": total_users,
-                "trend": users_trend,
-                "sparkline": users_sparkline
-            },
-            "total_books": {
-                "value": total_books,
-                "trend": books_trend,
-                "sparkline": books_sparkline
-            },
-            "books_borrowed": {
-                "value": books_borrowed,
-                "trend": borrowed_trend,
-                "sparkline": borrowings_sparkline
-            },
-            "overdue_books": {
-                "value": overdue_books,
-                "trend": overdue_trend,
-                "sparkline": overdue_sparkline
-            },
-            "last_updated": current_date.isoformat()
-        }
+    # --- OVERDUE BOOKS ---
+    # Books that are checked out and due date has passed
+    overdue_books_response = db.table('circulation_records').select(
+        'id, due_date', count='exact'
+    ).is_('return_date', 'null').lt('due_date', current_date.isoformat()).execute()
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching dashboard stats: {str(e)}"
-        )
+    overdue_books = overdue_books_response.count
+
+    # Overdue books 30 days ago
+    thirty_days_ago_overdue = db.table('circulation_records').select(
+        'id', count='exact'
+    ).is_('return_date', 'null').lt('due_date', thirty_days_ago.isoformat()).execute()
+
+    # Calculate overdue trend (inverted logic - decrease is good)
+    if thirty_days_ago_overdue.count > 0:
+        overdue_change = ((overdue_books - thirty_days_ago_overdue.count) / thirty_days_ago_overdue.count) * 100
+    else:
+        overdue_change = 0 if overdue_books == 0 else 100
+
+    overdue_trend = {
+        'direction': 'up' if overdue_change > 0 else 'down',
+        'percentage': abs(round(overdue_change, 1))
+    }
+
+    # --- SPARKLINE DATA (Last 7 days for mini charts) ---
+    # Generate sparkline data for each metric
+    users_sparkline = generate_sparkline_data(db, 'users', 'created_at', 7)
+    books_sparkline = generate_sparkline_data(db, 'books', 'created_at', 7)
+    borrowings_sparkline = generate_sparkline_data(db, 'transactions', 'checkout_date', 7)
+    overdue_sparkline = generate_overdue_sparkline(db, 7)
+
+    return {
+        "total_users": {
+            "value": total_users,
+            "trend": users_trend,
+            "sparkline": users_sparkline
+        },
+        "total_books": {
+            "value": total_books,
+            "trend": books_trend,
+            "sparkline": books_sparkline
+        },
+        "books_borrowed": {
+            "value": books_borrowed,
+            "trend": borrowed_trend,
+            "sparkline": borrowings_sparkline
+        },
+        "overdue_books": {
+            "value": overdue_books,
+            "trend": overdue_trend,
+            "sparkline": overdue_sparkline
+        },
+        "last_updated": current_date.isoformat()
+    }
 
 
 def calculate_trend(recent_count: int, previous_count: int) -> dict:
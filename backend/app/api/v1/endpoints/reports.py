@@ -2,9 +2,11 @@
 Reports & Analytics endpoints
 """
 from fastapi import APIRouter, HTTPException, Depends, Query, Response
-from typing import Optional
-from datetime import datetime, timedelta
-from ....db import get_supabase
+from typing import Dict, List, Optional, Sequence
+from datetime import date, datetime, timedelta
+from starlette.concurrency import run_in_threadpool
+from ....db.replica import get_read_db
+from ....services.circulation_history_service import CirculationHistoryService
 from ....core.dependencies import require_any_permission
 from supabase import Client
 import csv
@@ -14,15 +16,44 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# IDs per `in.(...)` filter when looking up names for a report
+LOOKUP_CHUNK = 200
 
-def get_db() -> Client:
-    """Dependency to get Supabase client"""
-    return get_supabase()
+
+def _report_period(from_date: Optional[str], to_date: Optional[str]):
+    """Requested report period; the last 30 days by default."""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=30)
+
+    if from_date:
+        start_date = datetime.fromisoformat(from_date)
+    if to_date:
+        end_date = datetime.fromisoformat(to_date)
+    return start_date, end_date
+
+
+async def _loans(start_date: datetime, end_date: datetime, columns: Sequence[str]) -> List[Dict]:
+    """Loans issued in the period, archived years included."""
+    return await CirculationHistoryService().get_records(start_date.date(), end_date.date(), columns)
+
+
+async def _lookup(db: Client, table: str, columns: str, ids) -> Dict[str, Dict]:
+    """Rows of `table` by ID (archived loans carry IDs, not embedded rows)."""
+    ids = sorted(set(ids))
+
+    def select(chunk):
+        return db.table(table).select(f'id, {columns}').in_('id', chunk).execute().data
+
+    rows = {}
+    for i in range(0, len(ids), LOOKUP_CHUNK):
+        for row in await run_in_threadpool(select, ids[i:i + LOOKUP_CHUNK]):
+            rows[row['id']] = row
+    return rows
 
 
 @router.get("/dashboard", summary="Get reports dashboard statistics")
-async def get_dashboard_stats(
-    db: Client = Depends(get_db),
+def get_dashboard_stats(
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
@@ -77,9 +108,9 @@ async def get_dashboard_stats(
 
 
 @router.get("/trends", summary="Get report generation trends over time")
-async def get_report_trends(
+def get_report_trends(
     period: str = Query(default="week", regex="^(week|month|year)$", description="Time period"),
-    db: Client = Depends(get_db),
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
@@ -142,8 +173,8 @@ async def get_report_trends(
 
 
 @router.get("/distribution", summary="Get report distribution by category")
-async def get_report_distribution(
-    db: Client = Depends(get_db),
+def get_report_distribution(
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
@@ -203,12 +234,12 @@ async def get_report_distribution(
 
 
 @router.get("/summary", summary="Get report summary with history")
-async def get_report_summary(
+def get_report_summary(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(8, ge=1, le=100, description="Items per page"),
     category: Optional[str] = Query(None, description="Filter by category"),
     status: Optional[str] = Query(None, description="Filter by status"),
-    db: Client = Depends(get_db),
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
@@ -333,12 +364,14 @@ async def get_report_summary(
 async def get_circulation_report(
     from_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     to_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    db: Client = Depends(get_db),
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
     Get detailed circulation report with book loans, returns, and trends
 
+    Loans are selected by issue date, archived years included.
+
     **Staff only** - requires reports permissions
 
     - **from_date**: Start date for report (optional)
@@ -347,28 +380,25 @@ async def get_circulation_report(
     **Required permission:** Any of reports.view or reports.generate
     """
     try:
-        # Set default date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-
-        if from_date:
-            start_date = datetime.fromisoformat(from_date)
-        if to_date:
-            end_date = datetime.fromisoformat(to_date)
-
-        # Fetch circulation data
-        transactions = db.table('transactions').select(
-            '*, books(title, title_ar, isbn), users(full_name, email)'
-        ).gte(
-            'checkout_date', start_date.isoformat()
-        ).lte(
-            'checkout_date', end_date.isoformat()
-        ).execute()
+        start_date, end_date = _report_period(from_date, to_date)
+
+        # Fetch circulation data (archived years included)
+        loans = await _loans(start_date, end_date, (
+            'id', 'user_id', 'book_id', 'issue_date', 'due_date', 'return_date', 'fine_amount', 'fine_paid'
+        ))
+        books = await _lookup(db, 'books', 'title, title_ar, isbn', (loan['book_id'] for loan in loans))
+        users = await _lookup(db, 'users', 'full_name, email', (loan['user_id'] for loan in loans))
+
+        today = date.today().isoformat()
+        for loan in loans:
+            loan['is_overdue'] = not loan.get('return_date') and loan['due_date'] < today
+            loan['books'] = books.get(loan['book_id'], {})
+            loan['users'] = users.get(loan['user_id'], {})
 
         # Calculate statistics
-        total_checkouts = len(transactions.data)
-        total_returns = sum(1 for t in transactions.data if t.get('return_date'))
-        total_overdue = sum(1 for t in transactions.data if t.get('is_overdue'))
+        total_checkouts = len(loans)
+        total_returns = sum(1 for t in loans if t.get('return_date'))
+        total_overdue = sum(1 for t in loans if t['is_overdue'])
 
         return {
             "period": {
@@ -381,7 +411,7 @@ async def get_circulation_report(
                 "total_overdue": total_overdue,
                 "active_loans": total_checkouts - total_returns
             },
-            "transactions": transactions.data
+            "transactions": loans
         }
 
     except Exception as e:
@@ -395,12 +425,15 @@ async def get_circulation_report(
 async def get_user_activity_report(
     from_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     to_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    db: Client = Depends(get_db),
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
     Get user activity report with registrations and engagement patterns
 
+    Active users are those with a loan issued in the period, archived
+    years included.
+
     **Staff only** - requires reports permissions
 
     - **from_date**: Start date for report (optional)
@@ -409,30 +442,17 @@ async def get_user_activity_report(
     **Required permission:** Any of reports.view or reports.generate
     """
     try:
-        # Set default date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-
-        if from_date:
-            start_date = datetime.fromisoformat(from_date)
-        if to_date:
-            end_date = datetime.fromisoformat(to_date)
-
-        # Fetch user data
-        users = db.table('users').select('*').execute()
-
-        # Fetch user transactions
-        transactions = db.table('transactions').select(
-            'user_id, checkout_date'
-        ).gte(
-            'checkout_date', start_date.isoformat()
-        ).lte(
-            'checkout_date', end_date.isoformat()
-        ).execute()
+        start_date, end_date = _report_period(from_date, to_date)
+
+        # Fetch user data (only the column the report aggregates)
+        users = await run_in_threadpool(lambda: db.table('users').select('user_type').execute())
+
+        # Borrowers in the period (archived years included)
+        loans = await _loans(start_date, end_date, ('user_id',))
 
         # Calculate statistics
         total_users = len(users.data)
-        active_users = len(set(t['user_id'] for t in transactions.data))
+        active_users = len(set(t['user_id'] for t in loans))
 
         # User type distribution
         user_types = {}
@@ -461,8 +481,8 @@ async def get_user_activity_report(
 
 
 @router.get("/collection", summary="Get collection report")
-async def get_collection_report(
-    db: Client = Depends(get_db),
+def get_collection_report(
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
@@ -517,12 +537,15 @@ async def get_collection_report(
 async def get_financial_report(
     from_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     to_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    db: Client = Depends(get_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
     Get financial report with fines collected, pending, and waived
 
+    Fines are those of loans issued in the period, archived years included.
+    Only overdue loans are fined and fines are never waived, so `waived`
+    and the other types are zero.
+
     **Staff only** - requires reports permissions
 
     - **from_date**: Start date for report (optional)
@@ -531,32 +554,27 @@ async def get_financial_report(
     **Required permission:** Any of reports.view or reports.generate
     """
     try:
-        # Set default date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
+        start_date, end_date = _report_period(from_date, to_date)
 
-        if from_date:
-            start_date = datetime.fromisoformat(from_date)
-        if to_date:
-            end_date = datetime.fromisoformat(to_date)
+        loans = await _loans(start_date, end_date, ('fine_amount', 'fine_paid'))
+        total_fines = sum((loan.get('fine_amount') or 0 for loan in loans), 0.0)
+        collected = sum((loan.get('fine_amount') or 0 for loan in loans if loan.get('fine_paid')), 0.0)
 
-        # Mock financial data
-        # In production, this would query a fines/payments table
         return {
             "period": {
                 "from": start_date.isoformat(),
                 "to": end_date.isoformat()
             },
             "summary": {
-                "total_fines": 1250.50,
-                "collected": 850.00,
-                "pending": 325.50,
-                "waived": 75.00
+                "total_fines": round(total_fines, 3),
+                "collected": round(collected, 3),
+                "pending": round(total_fines - collected, 3),
+                "waived": 0.0
             },
             "by_type": {
-                "overdue": 980.50,
-                "damaged": 180.00,
-                "lost": 90.00
+                "overdue": round(total_fines, 3),
+                "damaged": 0.0,
+                "lost": 0.0
             }
         }
 
@@ -573,7 +591,7 @@ async def export_report(
     format: str = Query(default="csv", regex="^(csv|excel|pdf)$", description="Export format"),
     from_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     to_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    db: Client = Depends(get_db),
+    db: Client = Depends(get_read_db),
     current_user: dict = Depends(require_any_permission(["reports.view", "reports.generate"]))
 ):
     """
@@ -606,14 +624,14 @@ async def export_report(
                     t.get('id', ''),
                     t.get('books', {}).get('title', ''),
                     t.get('users', {}).get('full_name', ''),
-                    t.get('checkout_date', ''),
-                    t.get('return_date', ''),
+                    t.get('issue_date', ''),
+                    t.get('return_date') or '',
                     'Returned' if t.get('return_date') else 'Active'
                 ]
                 for t in report_data.get('transactions', [])
             ]
         elif report_type == "summary":
-            report_data = await get_report_summary(1, 10000, None, None, db)
+            report_data = await run_in_threadpool(get_report_summary, 1, 10000, None, None, db)
             filename = "reports_summary.csv"
             headers = ['ID', 'Report Name', 'Category', 'Date Generated', 'Status']
             rows = [
@@ -7,6 +7,7 @@ from typing import Optional
 from datetime import datetime, timedelta
 from ....core.dependencies import get_current_user, require_any_permission
 from ....db import get_supabase
+from ....services.books_service import invalidate_books
 from supabase import Client
 
 router = APIRouter()
@@ -81,6 +82,7 @@ async def create_book_request(
         # If book is being reserved, update book status
         if request_status == 'reserved':
             db.table('books').update({'status': 'reserved'}).eq('id', book_id).execute()
+            await invalidate_books(book_id)
 
         # Create request record
         request_record = {
@@ -250,6 +252,7 @@ async def cancel_book_request(
             db.table('books').update({'status': 'available'}).eq(
                 'id', request['book_id']
             ).execute()
+            await invalidate_books(request['book_id'])
 
             # TODO: Check if there's a waiting list and reserve for next person
 
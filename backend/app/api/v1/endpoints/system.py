@@ -0,0 +1,44 @@
+"""
+System endpoints for operational metrics
+"""
+from fastapi import APIRouter, Depends
+from ....core.admission import admission_metrics
+from ....core.cache import get_cache
+from ....core.dependencies import require_permissions
+from ....core.events import event_metrics
+from ....core.idempotency import idempotency_metrics
+from ....core.resilience import circuit_metrics
+from ....core.singleflight import singleflight_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Get runtime metrics")
+async def get_metrics(
+    current_user: dict = Depends(require_permissions(["settings.manage"]))
+):
+    """
+    Get per-worker runtime metrics:
+    - Request coalescing counters per key (calls, executions, shared, timeouts)
+    - Cache tier status
+    - Live event streams (subscribers, events published and dropped)
+    - PostgREST circuit breakers
+    - Admission control per lane (in flight, waiting, admitted, rejected)
+    - Idempotency-Key replays, waits and conflicts
+
+    **Required permission:** settings.manage
+    """
+    cache = get_cache()
+    return {
+        "singleflight": singleflight_metrics(),
+        "cache": {
+            "enabled": cache.enabled,
+            "l1_entries": len(cache.l1),
+            "l2_configured": cache.redis is not None,
+            "stale_entries": len(cache.stale) if cache.stale is not None else 0,
+        },
+        "events": event_metrics(),
+        "circuits": circuit_metrics(),
+        "admission": admission_metrics(),
+        "idempotency": idempotency_metrics(),
+    }
@@ -1,8 +1,8 @@
 """
 User management endpoints
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
-from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from typing import List, Optional
 from ....models.user import (
     UserCreate,
     UserUpdate,
@@ -12,6 +12,9 @@ from ....models.user import (
 )
 from ....services.user_service import UserService
 from ....core.dependencies import require_permissions
+from ....core.conditional import ResourceVersion, is_conditional
+from ....core.fields import sparse_fields, sparse_response
+from ....core.responses import FastJSONResponse
 import csv
 import io
 
@@ -23,6 +26,11 @@ def get_user_service() -> UserService:
     return UserService()
 
 
+def _user_version(user: dict) -> ResourceVersion:
+    """Validators for a user from its id, updated_at and role."""
+    return ResourceVersion.of("user", user['id'], user['updated_at'], user['role'], last_modified=user['updated_at'])
+
+
 @router.get("", response_model=UserListResponse, summary="Get all users")
 async def get_users(
     page: int = Query(1, ge=1, description="Page number"),
@@ -32,6 +40,7 @@ async def get_users(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     sort_by: str = Query("created_at", description="Sort field"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="Sort order"),
+    fields: Optional[List[str]] = Depends(sparse_fields(UserResponse)),
     user_service: UserService = Depends(get_user_service),
     current_user: dict = Depends(require_permissions(["users.read"]))
 ):
@@ -45,6 +54,7 @@ async def get_users(
     - **is_active**: Filter by active status
     - **sort_by**: Sort field (created_at, full_name, email, etc.)
     - **sort_order**: Sort order (asc or desc)
+    - **fields**: Comma-separated subset of fields to return (e.g. id,full_name,email)
     """
     try:
         result = await user_service.get_users(
@@ -54,9 +64,10 @@ async def get_users(
             role=role,
             is_active=is_active,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            fields=fields
         )
-        return result
+        return sparse_response(result) if fields else FastJSONResponse(result)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -158,19 +169,39 @@ async def export_users(
 @router.get("/{user_id}", response_model=UserResponse, summary="Get user by ID")
 async def get_user(
     user_id: str,
+    request: Request,
+    response: Response,
     user_service: UserService = Depends(get_user_service),
     current_user: dict = Depends(require_permissions(["users.read"]))
 ):
     """
     Get single user by ID
+
+    Supports conditional requests: when If-None-Match / If-Modified-Since is
+    sent, a cheap version query (updated_at and role) is checked before the
+    full record is loaded, returning 304 when the client copy is current.
+    Otherwise the validators are computed from the loaded record.
     """
     try:
+        if is_conditional(request):
+            user_version = await user_service.get_user_version(user_id)
+            if not user_version:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            version = _user_version(user_version)
+            if version.matches(request):
+                return version.not_modified()
+
         user = await user_service.get_user(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
+
+        _user_version(user).apply(response)
         return user
     except HTTPException:
         raise
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import auth, analytics, dashboard, users, circulation, reports, settings, books, profile, requests
+from .endpoints import auth, analytics, dashboard, users, circulation, reports, settings, books, profile, requests, system, catalog, sync
 
 api_router = APIRouter(prefix="/v1")
 
@@ -25,6 +25,15 @@ api_router.include_router(books.router, prefix="", tags=["Books", "Categories"])
 api_router.include_router(profile.router, prefix="/profile", tags=["Profile"])
 api_router.include_router(requests.router, prefix="/requests", tags=["Book Requests"])
 
+# Public catalogue (no authentication)
+api_router.include_router(catalog.router, prefix="/catalog", tags=["Public Catalogue"])
+
+# Delta sync for offline clients
+api_router.include_router(sync.router, prefix="/sync", tags=["Sync"])
+
+# Operations
+api_router.include_router(system.router, prefix="/system", tags=["System"])
+
 # We'll add these as we build each feature
 # api_router.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
 # api_router.include_router(acquisitions.router, prefix="/acquisitions", tags=["Acquisitions"])
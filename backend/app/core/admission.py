@@ -0,0 +1,275 @@
+"""
+Admission control: per-class concurrency limits with priority lanes.
+
+One user-activity report or CSV export can hold a worker, a threadpool
+thread and a database connection for seconds while a patron waits at the
+desk for `POST /circulation`. AdmissionMiddleware sorts every API request
+into a lane and admits it only while the lane, and the worker as a whole,
+have room:
+
+    critical     auth and desk circulation (issue, return, renew, fines)
+    interactive  everything else
+    analytics    /analytics, /dashboard and statistics endpoints
+    reports      /reports, exports, imports and bulk operations
+
+Each lane has its own concurrency limit. All lanes also share
+ADMISSION_CAPACITY requests in flight, of which the last
+ADMISSION_CRITICAL_RESERVE are only given to the critical lane, so heavy
+traffic can never take the capacity desk work needs. A request that
+cannot be admitted waits up to ADMISSION_QUEUE_TIMEOUT seconds in its
+lane's queue; freed slots go to the highest-priority waiter first. A
+request that finds its queue full, or times out in it, gets
+`429 Too Many Requests` with `Retry-After`.
+
+Health checks, operational endpoints and the long-lived event stream are
+not counted. Per-lane counters are reported by admission_metrics().
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Pattern, Set, Tuple
+import asyncio
+import logging
+import re
+import time
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CRITICAL = "critical"
+INTERACTIVE = "interactive"
+ANALYTICS = "analytics"
+REPORTS = "reports"
+
+# Lane for each request, first match wins: (methods or None for any, path, lane).
+# None as the lane means "not admission-controlled"; unmatched API paths are interactive.
+LANE_RULES: List[Tuple[Optional[Set[str]], Pattern[str], Optional[str]]] = [
+    (None, re.compile(r"^/api/v1/(health|system/)"), None),
+    ({"GET"}, re.compile(r"^/api/v1/circulation/events$"), None),
+    (None, re.compile(r"^/api/v1/auth/"), CRITICAL),
+    ({"POST"}, re.compile(r"^/api/v1/circulation(/[^/]+/(return|renew)|/fines/collect/[^/]+)?$"), CRITICAL),
+    (None, re.compile(r"^/api/v1/reports/"), REPORTS),
+    ({"GET"}, re.compile(r"^/api/v1/[^/]+/export$"), REPORTS),
+    ({"POST"}, re.compile(r"^/api/v1/books/(import|bulk-update|bulk-delete)$"), REPORTS),
+    (None, re.compile(r"^/api/v1/(analytics|dashboard)/"), ANALYTICS),
+    ({"GET"}, re.compile(r"^/api/v1/[^/]+/(stats|statistics)$"), ANALYTICS),
+]
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Lane for a request, or None if it is not admission-controlled."""
+    if method == "OPTIONS" or not path.startswith("/api/"):
+        return None
+    for methods, pattern, lane in LANE_RULES:
+        if (methods is None or method in methods) and pattern.match(path):
+            return lane
+    return INTERACTIVE
+
+
+class Rejected(Exception):
+    """A request that cannot be admitted."""
+
+    def __init__(self, lane: "Lane", reason: str):
+        super().__init__(f"{lane.name} lane {reason}")
+        self.lane = lane
+        self.reason = reason
+
+
+@dataclass
+class Lane:
+    """One class of requests and its counters."""
+    name: str
+    priority: int  # Lower is admitted first
+    limit: int
+    retry_after: int  # Seconds suggested to rejected clients
+    uses_reserve: bool = False  # May use the capacity held back for critical work
+    in_flight: int = 0
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    max_wait_ms: float = 0.0
+    waiters: Deque["asyncio.Future[None]"] = field(default_factory=deque)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self.waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+        }
+
+
+class AdmissionController:
+    """Per-worker lane limits, shared capacity and priority wake-ups."""
+
+    def __init__(
+        self,
+        lanes: List[Lane],
+        capacity: int,
+        critical_reserve: int,
+        max_queue: int,
+        queue_timeout: float,
+    ):
+        self.lanes = {lane.name: lane for lane in lanes}
+        self._by_priority = sorted(lanes, key=lambda lane: lane.priority)
+        self.capacity = capacity
+        self.critical_reserve = critical_reserve
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+
+    def _has_room(self, lane: Lane) -> bool:
+        if lane.in_flight >= lane.limit:
+            return False
+        shared = self.capacity if lane.uses_reserve else self.capacity - self.critical_reserve
+        return self.in_flight < shared
+
+    def _take(self, lane: Lane) -> None:
+        lane.in_flight += 1
+        lane.admitted += 1
+        self.in_flight += 1
+
+    async def acquire(self, lane_name: str) -> Lane:
+        """Admit a request to a lane, waiting for a slot if need be (raises Rejected)."""
+        lane = self.lanes[lane_name]
+        # Waiters of higher or equal priority go first
+        if self._has_room(lane) and not self._waiting_ahead(lane):
+            self._take(lane)
+            return lane
+
+        if len(lane.waiters) >= self.max_queue or self.queue_timeout <= 0:
+            lane.rejected += 1
+            raise Rejected(lane, "is full")
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        lane.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as the wait ran out; keep the slot
+                return lane
+            lane.timed_out += 1
+            lane.rejected += 1
+            raise Rejected(lane, f"had no capacity within {self.queue_timeout:g}s")
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release(lane)
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                lane.waiters.remove(waiter)
+            except ValueError:
+                pass
+            lane.max_wait_ms = max(lane.max_wait_ms, (time.perf_counter() - started) * 1000)
+        return lane
+
+    def _waiting_ahead(self, lane: Lane) -> bool:
+        # Waiters held back by shared capacity, not by their own lane's limit
+        return any(
+            other.waiters and other.in_flight < other.limit
+            for other in self._by_priority if other.priority <= lane.priority
+        )
+
+    def release(self, lane: Lane) -> None:
+        """Free a slot and hand it to the highest-priority waiter that fits."""
+        lane.in_flight -= 1
+        self.in_flight -= 1
+        for candidate in self._by_priority:
+            while candidate.waiters and candidate.waiters[0].done():
+                candidate.waiters.popleft()
+            if candidate.waiters and self._has_room(candidate):
+                self._take(candidate)
+                candidate.waiters.popleft().set_result(None)
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "critical_reserve": self.critical_reserve,
+            "in_flight": self.in_flight,
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+        }
+
+
+class AdmissionMiddleware:
+    """Admits API requests through the process-wide AdmissionController."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = get_admission_controller()
+        lane_name = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if controller is None or lane_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            lane = await controller.acquire(lane_name)
+        except Rejected as e:
+            logger.info(f"Rejected {scope['method']} {scope['path']}: {str(e)}")
+            await _too_many_requests(send, e)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(lane)
+
+
+async def _too_many_requests(send: Send, rejection: Rejected) -> None:
+    body = orjson.dumps({"detail": f"Server busy: {str(rejection)}; retry later"})
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(rejection.lane.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# Create a global instance
+admission_controller = None
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """
+    Get or create the admission controller (None when ADMISSION_ENABLED is off)
+    """
+    global admission_controller
+    if admission_controller is None and settings.ADMISSION_ENABLED:
+        admission_controller = AdmissionController(
+            lanes=[
+                Lane(CRITICAL, 0, settings.ADMISSION_CRITICAL_LIMIT, retry_after=1, uses_reserve=True),
+                Lane(INTERACTIVE, 1, settings.ADMISSION_INTERACTIVE_LIMIT, retry_after=2),
+                Lane(ANALYTICS, 2, settings.ADMISSION_ANALYTICS_LIMIT, retry_after=10),
+                Lane(REPORTS, 3, settings.ADMISSION_REPORTS_LIMIT, retry_after=30),
+            ],
+            capacity=settings.ADMISSION_CAPACITY,
+            critical_reserve=settings.ADMISSION_CRITICAL_RESERVE,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+    return admission_controller
+
+
+def admission_metrics() -> Optional[Dict[str, Any]]:
+    """Per-lane admission counters (None when admission control is off)."""
+    controller = get_admission_controller()
+    return controller.stats() if controller is not None else None
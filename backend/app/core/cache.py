@@ -0,0 +1,627 @@
+"""
+Two-level cache: in-process LRU (L1) backed by a shared Redis tier (L2).
+
+Usage:
+    @cached("categories", ttl=300, tags=lambda **_: ["categories"])
+    async def get_categories(self, include_counts: bool = False) -> CategoryListResponse:
+        ...
+
+    await invalidate_tags("categories")
+
+Values are serialized for L2 with a pydantic TypeAdapter built from the
+decorated function's return annotation, so models round-trip unchanged.
+L1 holds the deserialized objects; callers must not mutate cached results.
+
+Every value loaded is also kept, for CACHE_STALE_TTL, as the last good
+value for its key. When a loader fails because the database cannot be
+reached (app.core.resilience.is_unavailable), that value is returned
+instead and the response is labelled stale. Invalidation does not remove
+last good values; they are only ever served in place of an error.
+
+A load still running when its entry is invalidated (by tag, key or a
+cleared L1) returns its result to the callers already waiting, but does
+not cache it: it may have read the rows before the write that caused the
+invalidation. Later callers start a fresh load.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import functools
+import hashlib
+import inspect
+import logging
+import random
+import threading
+import time
+import typing
+
+from pydantic import BaseModel, TypeAdapter
+
+from .config import settings
+from .resilience import collect_stale, is_unavailable, mark_stale
+from .singleflight import get_singleflight
+from ..db.redis import RedisBackend, get_redis
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _discard(self, key: str) -> None:
+        """Remove an entry and its tag registrations (lock held)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or the module's _MISSING sentinel."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._discard(key)
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+
+    def invalidate_tag(self, tag: str) -> List[str]:
+        """Drop every entry registered under `tag` and return their keys."""
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._discard(key)
+            return keys
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _PendingLoad:
+    """Keys and tags of a load in progress, and whether they were invalidated meanwhile."""
+
+    __slots__ = ("flight_key", "keys", "tags", "invalidated")
+
+    def __init__(self, flight_key: Optional[str], keys: Iterable[str], tags: Iterable[str]):
+        self.flight_key = flight_key
+        self.keys = set(keys)
+        self.tags = set(tags)
+        self.invalidated = False
+
+
+class TwoLevelCache:
+    """
+    Cache-aside helper combining an in-process L1 with an optional Redis L2.
+
+    Redis failures are logged and treated as misses, so an unavailable L2
+    degrades to per-worker caching instead of failing requests.
+    """
+
+    def __init__(
+        self,
+        l1: LRUCache,
+        redis: Optional[RedisBackend] = None,
+        prefix: str = "nawra",
+        default_ttl: int = 300,
+        l1_ttl: int = 30,
+        jitter: float = 0.1,
+        enabled: bool = True,
+        version_ttl: int = 5,
+        stale: Optional[LRUCache] = None,
+        stale_ttl: int = 86400,
+    ):
+        self.l1 = l1
+        self.redis = redis
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.l1_ttl = l1_ttl
+        self.jitter = jitter
+        self.enabled = enabled
+        self.version_ttl = version_ttl
+        self.stale = stale
+        self.stale_ttl = stale_ttl
+        self._flight = get_singleflight("cache")
+        self._local_versions: Dict[str, int] = {}
+        self._pending: Set[_PendingLoad] = set()
+
+    def make_key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _version_key(self, name: str) -> str:
+        return f"{self.prefix}:version:{name}"
+
+    def _jittered(self, ttl: float) -> float:
+        if not self.jitter:
+            return ttl
+        return max(1.0, ttl * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def _l2_get(self, full_key: str) -> Optional[str]:
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(full_key)
+        except Exception as e:
+            logger.warning(f"Cache L2 read failed for {full_key}: {str(e)}")
+            return None
+
+    async def _l2_mget(self, full_keys: List[str]) -> List[Optional[str]]:
+        if self.redis is None:
+            return [None] * len(full_keys)
+        try:
+            return await self.redis.mget(*full_keys)
+        except Exception as e:
+            logger.warning(f"Cache L2 read failed for {len(full_keys)} keys: {str(e)}")
+            return [None] * len(full_keys)
+
+    def _l2_set_commands(self, full_key: str, payload: str, ttl: float, tags: List[str]) -> List[List[Any]]:
+        commands: List[List[Any]] = [["SET", full_key, payload, "EX", int(ttl)]]
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            commands.append(["SADD", tag_key, full_key])
+            commands.append(["EXPIRE", tag_key, int(ttl) + 60])
+        return commands
+
+    async def _l2_set(self, full_key: str, payload: str, ttl: float, tags: List[str]) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.pipeline(self._l2_set_commands(full_key, payload, ttl, tags))
+        except Exception as e:
+            logger.warning(f"Cache L2 write failed for {full_key}: {str(e)}")
+
+    @contextmanager
+    def _track(self, flight_key: Optional[str], keys: Iterable[str], tags: Iterable[str]) -> Iterator[_PendingLoad]:
+        pending = _PendingLoad(flight_key, keys, tags)
+        self._pending.add(pending)
+        try:
+            yield pending
+        finally:
+            self._pending.discard(pending)
+
+    def _invalidate_pending(self, keys: Iterable[str] = (), tags: Iterable[str] = (), everything: bool = False) -> None:
+        """Stop loads in progress for these keys/tags from caching what they read."""
+        keys, tags = set(keys), set(tags)
+        for pending in self._pending:
+            if everything or pending.keys & keys or pending.tags & tags:
+                pending.invalidated = True
+                if pending.flight_key is not None:
+                    self._flight.forget(pending.flight_key)
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        adapter: TypeAdapter,
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+        cache_none: bool = False,
+    ) -> Any:
+        """
+        Return the cached value for (namespace, key), loading it on a miss.
+
+        Concurrent misses for the same key share a single loader call.
+        """
+        full_key = self.make_key(namespace, key)
+
+        value = self.l1.get(full_key)
+        if value is not _MISSING:
+            return value
+
+        value, stale = await self._flight.do(
+            full_key,
+            lambda: self._load(namespace, full_key, loader, adapter, ttl, list(tags), cache_none),
+        )
+        for source in stale:
+            mark_stale(source)
+        return value
+
+    async def _load(
+        self,
+        namespace: str,
+        full_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        adapter: TypeAdapter,
+        ttl: Optional[int],
+        tags: List[str],
+        cache_none: bool,
+    ) -> Tuple[Any, Set[str]]:
+        """Load on a miss; returns (value, namespaces it was served stale from)."""
+        ttl = ttl or self.default_ttl
+        l1_ttl = min(ttl, self.l1_ttl)
+
+        with self._track(full_key, [full_key], tags) as pending:
+            payload = await self._l2_get(full_key)
+            if payload is not None and not pending.invalidated:
+                try:
+                    value = adapter.validate_json(payload)
+                    self.l1.set(full_key, value, self._jittered(l1_ttl), tags)
+                    self._keep_last_good(full_key, value)
+                    return value, set()
+                except Exception as e:
+                    logger.warning(f"Discarding undecodable cache entry {full_key}: {str(e)}")
+
+            with collect_stale() as stale:
+                try:
+                    value = await loader()
+                except Exception as e:
+                    return self._last_good(full_key, e), {namespace}
+            if stale:
+                # Built from another entry's last good value: pass it on, uncached
+                return value, stale
+            if pending.invalidated:
+                # Invalidated while loading: the value may predate the write
+                return value, stale
+            if value is None and not cache_none:
+                return value, stale
+
+            self.l1.set(full_key, value, self._jittered(l1_ttl), tags)
+            self._keep_last_good(full_key, value)
+            if self.redis is not None:
+                await self._l2_set(full_key, adapter.dump_json(value).decode(), self._jittered(ttl), tags)
+                if pending.invalidated:
+                    # The invalidation may have run before the write landed
+                    await self._l2_delete(full_key)
+            return value, stale
+
+    def _keep_last_good(self, full_key: str, value: Any) -> None:
+        if self.stale is not None:
+            self.stale.set(full_key, value, self.stale_ttl)
+
+    def _last_good(self, full_key: str, error: Exception) -> Any:
+        """The last good value for a key whose loader failed, or re-raise."""
+        if self.stale is None or not is_unavailable(error):
+            raise error
+        value = self.stale.get(full_key)
+        if value is _MISSING:
+            raise error
+        logger.warning(f"Serving stale {full_key}: {str(error)}")
+        return value
+
+    async def with_fallback(self, namespace: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Call `loader` every time, but answer with its last good result (and
+        label the response stale) while the database is unavailable.
+
+        For reads that are not cached, such as dashboard statistics.
+        """
+        full_key = self.make_key(namespace, key)
+        with collect_stale() as stale:
+            try:
+                value = await loader()
+            except Exception as e:
+                value = self._last_good(full_key, e)
+                stale.add(namespace)
+        if not stale:
+            self._keep_last_good(full_key, value)
+        for source in stale:
+            mark_stale(source)
+        return value
+
+    async def get_many(
+        self,
+        namespace: str,
+        keys: Iterable[str],
+        loader: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        adapter: TypeAdapter,
+        ttl: Optional[int] = None,
+        tags: Optional[Callable[[str], Iterable[str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Batch cache-aside lookup.
+
+        Hits are served from L1, then from one L2 MGET; all remaining keys
+        are passed to a single `loader(missing_keys)` call returning a
+        key -> value dict. Keys the loader omits are left out of the result
+        and are not cached.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled:
+            return await loader(keys)
+
+        ttl = ttl or self.default_ttl
+        l1_ttl = min(ttl, self.l1_ttl)
+        result: Dict[str, Any] = {}
+
+        missing: List[str] = []
+        for key in keys:
+            value = self.l1.get(self.make_key(namespace, key))
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                result[key] = value
+
+        if not missing:
+            return result
+
+        full_keys = [self.make_key(namespace, key) for key in missing]
+        all_tags = [tag for key in missing for tag in (tags(key) if tags else ())]
+        with self._track(None, full_keys, all_tags) as pending:
+            if self.redis is not None:
+                payloads = await self._l2_mget(full_keys)
+                still_missing = []
+                for key, payload in zip(missing, payloads):
+                    if payload is None:
+                        still_missing.append(key)
+                        continue
+                    try:
+                        value = adapter.validate_json(payload)
+                    except Exception:
+                        still_missing.append(key)
+                        continue
+                    if not pending.invalidated:
+                        entry_tags = list(tags(key)) if tags else []
+                        self.l1.set(self.make_key(namespace, key), value, self._jittered(l1_ttl), entry_tags)
+                    result[key] = value
+                missing = still_missing
+
+            if not missing:
+                return result
+
+            loaded = await loader(missing)
+            if pending.invalidated:
+                # Invalidated while loading: the values may predate the write
+                return {**result, **loaded}
+
+            commands: List[List[Any]] = []
+            for key, value in loaded.items():
+                full_key = self.make_key(namespace, key)
+                entry_tags = list(tags(key)) if tags else []
+                self.l1.set(full_key, value, self._jittered(l1_ttl), entry_tags)
+                if self.redis is not None:
+                    commands.extend(self._l2_set_commands(
+                        full_key, adapter.dump_json(value).decode(), self._jittered(ttl), entry_tags
+                    ))
+                result[key] = value
+
+            if commands:
+                try:
+                    await self.redis.pipeline(commands)
+                except Exception as e:
+                    logger.warning(f"Cache L2 batch write failed for {namespace}: {str(e)}")
+                if pending.invalidated:
+                    # The invalidation may have run before the write landed
+                    await self._l2_delete(*(self.make_key(namespace, key) for key in loaded))
+        return result
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Evict every entry registered under any of the given tags."""
+        self.evict_local(*tags)
+        await self.invalidate_shared(*tags)
+
+    def evict_local(self, *tags: str) -> None:
+        """Evict tagged entries from this worker's L1 only."""
+        self._invalidate_pending(tags=tags)
+        for tag in tags:
+            self.l1.invalidate_tag(tag)
+
+    async def invalidate_shared(self, *tags: str) -> None:
+        """Evict tagged entries from the shared L2 only (one worker suffices)."""
+        if self.redis is None or not tags:
+            return
+        try:
+            tag_keys = [self._tag_key(tag) for tag in tags]
+            members = await self.redis.pipeline([["SMEMBERS", k] for k in tag_keys])
+            keys = {key for group in members for key in (group or [])}
+            await self.redis.delete(*keys, *tag_keys)
+        except Exception as e:
+            logger.warning(f"Cache L2 invalidation failed for tags {tags}: {str(e)}")
+
+    async def _read_version(self, name: str) -> Tuple[int, bool]:
+        """(counter value, whether it came from Redis), memoized for `version_ttl`."""
+        full_key = self._version_key(name)
+        memo = self.l1.get(full_key)
+        if memo is not _MISSING:
+            return memo
+
+        version, shared = self._local_versions.get(name, 0), False
+        if self.redis is not None:
+            try:
+                version, shared = int(await self.redis.get(full_key) or 0), True
+            except Exception as e:
+                logger.warning(f"Cache version read failed for {name}: {str(e)}")
+
+        self.l1.set(full_key, (version, shared), self.version_ttl)
+        return version, shared
+
+    async def get_version(self, name: str) -> int:
+        """
+        Current value of a named version counter (for embedding in keys).
+
+        Read from Redis when configured and memoized in L1 for
+        `version_ttl` seconds, which bounds cross-worker lag after a bump.
+        Without Redis each worker counts on its own, so the value is only
+        meaningful inside this worker.
+        """
+        version, _ = await self._read_version(name)
+        return version
+
+    async def get_shared_version(self, name: str) -> Optional[int]:
+        """
+        The counter as every worker sees it, or None when it cannot be read
+        from Redis (per-worker values would name different content with the
+        same number, so they must not reach clients as validators).
+        """
+        version, shared = await self._read_version(name)
+        return version if shared else None
+
+    async def bump_version(self, name: str) -> int:
+        """Increment a named version counter, making keys built on it unreachable."""
+        full_key = self._version_key(name)
+        version = self._local_versions[name] = self._local_versions.get(name, 0) + 1
+        shared = False
+        if self.redis is not None:
+            try:
+                version, shared = await self.redis.incr(full_key), True
+            except Exception as e:
+                logger.warning(f"Cache version bump failed for {name}: {str(e)}")
+
+        self.l1.set(full_key, (version, shared), self.version_ttl)
+        return version
+
+    def forget_version(self, name: str) -> None:
+        """Drop this worker's memoized counter so the next read goes to Redis."""
+        self.l1.delete(self._version_key(name))
+
+    def clear_local(self) -> None:
+        """Drop this worker's L1 (e.g. after missing change notifications)."""
+        self._invalidate_pending(everything=True)
+        self.l1.clear()
+
+    async def _l2_delete(self, *full_keys: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(*full_keys)
+        except Exception as e:
+            logger.warning(f"Cache L2 delete failed for {', '.join(full_keys)}: {str(e)}")
+
+    async def delete(self, namespace: str, key: str) -> None:
+        full_key = self.make_key(namespace, key)
+        self._invalidate_pending(keys=[full_key])
+        self.l1.delete(full_key)
+        await self._l2_delete(full_key)
+
+
+# Create a global instance
+cache_instance = None
+
+
+def get_cache() -> TwoLevelCache:
+    """
+    Get or create the application cache
+    """
+    global cache_instance
+    if cache_instance is None:
+        cache_instance = TwoLevelCache(
+            l1=LRUCache(settings.CACHE_L1_MAX_ENTRIES),
+            redis=get_redis(),
+            prefix=settings.CACHE_NAMESPACE,
+            default_ttl=settings.CACHE_DEFAULT_TTL,
+            l1_ttl=settings.CACHE_L1_TTL,
+            jitter=settings.CACHE_TTL_JITTER,
+            enabled=settings.CACHE_ENABLED,
+            version_ttl=settings.CACHE_VERSION_TTL,
+            stale=LRUCache(settings.CACHE_STALE_MAX_ENTRIES),
+            stale_ttl=settings.CACHE_STALE_TTL,
+        )
+    return cache_instance
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Evict all cached entries carrying any of the given tags."""
+    await get_cache().invalidate_tags(*tags)
+
+
+def _key_part(value: Any) -> str:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json(exclude_none=True)
+    return str(value)
+
+
+def _default_key(arguments: Dict[str, Any]) -> str:
+    key = ":".join(f"{name}={_key_part(value)}" for name, value in arguments.items())
+    if len(key) > 200:
+        key = hashlib.sha1(key.encode()).hexdigest()
+    return key or "_"
+
+
+def cached(
+    namespace: str,
+    ttl: Optional[int] = None,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    key: Optional[Callable[..., str]] = None,
+    cache_none: bool = False,
+) -> Callable:
+    """
+    Decorator caching an async function's result in the two-level cache.
+
+    Args:
+        namespace: Key namespace (e.g. "categories", "book")
+        ttl: L2 time-to-live in seconds (defaults to CACHE_DEFAULT_TTL)
+        tags: Callable receiving the call's arguments as keywords (minus
+            `self`) and returning invalidation tags for the entry
+        key: Callable building the cache key from the same keywords;
+            defaults to all arguments joined into a string
+        cache_none: Whether a None result should be cached
+
+    The undecorated function stays available as `wrapper.uncached`.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+        adapter_holder: List[TypeAdapter] = []
+
+        def get_adapter() -> TypeAdapter:
+            # Resolved lazily so forward references in annotations work
+            if not adapter_holder:
+                return_type = typing.get_type_hints(func).get('return', Any)
+                adapter_holder.append(TypeAdapter(return_type))
+            return adapter_holder[0]
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if not cache.enabled:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self', None)
+
+            cache_key = key(**arguments) if key else _default_key(arguments)
+            entry_tags = list(tags(**arguments)) if tags else []
+
+            return await cache.get_or_load(
+                namespace,
+                cache_key,
+                lambda: func(*args, **kwargs),
+                adapter=get_adapter(),
+                ttl=ttl,
+                tags=entry_tags,
+                cache_none=cache_none,
+            )
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
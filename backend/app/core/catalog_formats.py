@@ -0,0 +1,210 @@
+"""
+Readers for catalogue import files: CSV, JSON lines and MARC 21.
+
+Each reader takes a binary stream and yields one dict per record, keyed by
+BookCreate field names (plus `category`, a category name or Dewey number to
+resolve), without validating anything. Files are read incrementally, so a
+large catalogue never has to fit in memory.
+
+CSV files need a header row naming the columns; empty cells are treated as
+missing. MARC records are ISO 2709 (the usual `.mrc` export of library
+systems); see MARC_FIELDS for what is mapped. Records encoded in MARC-8
+rather than UTF-8 are decoded leniently.
+
+Usage:
+    with open('legacy.mrc', 'rb') as stream:
+        for record in read_records(stream, 'marc'):
+            ...
+"""
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+import re
+
+FORMATS = ('csv', 'jsonl', 'marc')
+
+# File extensions and media types recognised for each format
+FORMAT_ALIASES = {
+    'csv': 'csv', 'text/csv': 'csv',
+    'jsonl': 'jsonl', 'ndjson': 'jsonl', 'application/x-ndjson': 'jsonl', 'application/jsonl': 'jsonl',
+    'marc': 'marc', 'mrc': 'marc', 'application/marc': 'marc',
+}
+
+_FIELD_TERMINATOR = 0x1E
+_RECORD_TERMINATOR = 0x1D
+_SUBFIELD_DELIMITER = '\x1f'
+
+_TRAILING_PUNCTUATION = re.compile(r'[\s/:;,.=]+$')
+_YEAR = re.compile(r'\d{4}')
+_NUMBER = re.compile(r'\d+')
+
+# MARC 21 language codes (008/35-37) to the two-letter codes used by books.language
+MARC_LANGUAGES = {
+    'ara': 'ar', 'eng': 'en', 'fre': 'fr', 'ger': 'de', 'spa': 'es', 'per': 'fa',
+    'urd': 'ur', 'hin': 'hi', 'tur': 'tr', 'ita': 'it', 'rus': 'ru', 'chi': 'zh',
+}
+
+# (tag, subfield) -> book field; repeated sources are joined with "; "
+MARC_FIELDS = {
+    ('020', 'a'): 'isbn',
+    ('082', 'a'): 'dewey_decimal',
+    ('100', 'a'): 'author',
+    ('110', 'a'): 'author',
+    ('245', 'a'): 'title',
+    ('245', 'b'): 'subtitle',
+    ('250', 'a'): 'edition',
+    ('260', 'a'): 'publication_place',
+    ('260', 'b'): 'publisher',
+    ('260', 'c'): 'publication_year',
+    ('264', 'a'): 'publication_place',
+    ('264', 'b'): 'publisher',
+    ('264', 'c'): 'publication_year',
+    ('300', 'a'): 'pages',
+    ('300', 'c'): 'dimensions',
+    ('505', 'a'): 'table_of_contents',
+    ('520', 'a'): 'description',
+    ('650', 'a'): 'subjects',
+    ('700', 'a'): 'co_authors',
+    ('852', 'h'): 'shelf_location',
+    ('852', 'p'): 'barcode',
+}
+_REPEATABLE = {'subjects', 'co_authors'}
+
+# 880 (alternate script) fields linked to these tags hold the Arabic forms
+MARC_ARABIC_FIELDS = {'100': 'author_ar', '245': 'title_ar', '260': 'publisher_ar', '264': 'publisher_ar'}
+
+
+def resolve_format(name: Optional[str]) -> Optional[str]:
+    """Format for a name, file extension or media type (None if unknown)."""
+    if not name:
+        return None
+    name = name.split(';')[0].strip().lower().rsplit('.', 1)[-1]
+    return FORMAT_ALIASES.get(name)
+
+
+def read_records(stream: BinaryIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yield raw records from `stream` in the given format."""
+    if fmt == 'csv':
+        return _read_csv(stream)
+    if fmt == 'jsonl':
+        return _read_jsonl(stream)
+    if fmt == 'marc':
+        return _read_marc(stream)
+    raise ValueError(f"Unsupported import format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+
+def _read_csv(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        for row in csv.DictReader(text):
+            yield {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+    finally:
+        # Leave the caller's stream open
+        if not text.closed:
+            text.detach()
+
+
+def _read_jsonl(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            # Surfaces as a validation error for this record
+            record = {'_error': f"invalid JSON on line {number}: {str(e)}"}
+        yield record if isinstance(record, dict) else {'_error': f"line {number} is not a JSON object"}
+
+
+def _read_marc(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    while True:
+        length = stream.read(5)
+        if len(length) < 5 or not length.strip():
+            return
+        try:
+            rest = stream.read(int(length) - 5)
+        except ValueError:
+            yield {'_error': f"corrupt MARC record length {length!r}"}
+            return
+        yield parse_marc_record(length + rest)
+
+
+def _marc_fields(record: bytes) -> List[Tuple[str, str]]:
+    """(tag, data) pairs from an ISO 2709 record."""
+    leader = record[:24].decode('ascii', 'replace')
+    encoding = 'utf-8' if leader[9] == 'a' else 'latin-1'
+    base = int(leader[12:17])
+    directory = record[24:base - 1]
+    fields = []
+    for start in range(0, len(directory) - 11, 12):
+        entry = directory[start:start + 12].decode('ascii', 'replace')
+        tag, size, offset = entry[:3], int(entry[3:7]), int(entry[7:12])
+        data = record[base + offset:base + offset + size]
+        if data and data[-1] == _FIELD_TERMINATOR:
+            data = data[:-1]
+        fields.append((tag, data.decode(encoding, 'replace')))
+    return fields
+
+
+def _subfields(data: str) -> List[Tuple[str, str]]:
+    return [(part[0], part[1:]) for part in data.split(_SUBFIELD_DELIMITER)[1:] if part]
+
+
+def _clean(value: str) -> str:
+    return _TRAILING_PUNCTUATION.sub('', value.strip())
+
+
+def parse_marc_record(record: bytes) -> Dict[str, Any]:
+    """Map one MARC 21 bibliographic record to book fields."""
+    try:
+        fields = _marc_fields(record)
+    except (ValueError, IndexError) as e:
+        return {'_error': f"corrupt MARC record: {str(e)}"}
+
+    book: Dict[str, Any] = {}
+    repeated: Dict[str, List[str]] = {}
+    for tag, data in fields:
+        if tag == '008' and len(data) >= 38:
+            language = MARC_LANGUAGES.get(data[35:38])
+            if language:
+                book.setdefault('language', language)
+            continue
+        if tag < '010':
+            continue
+
+        subfields = _subfields(data)
+        if tag == '880':
+            linkage = next((value for code, value in subfields if code == '6'), '')
+            target = MARC_ARABIC_FIELDS.get(linkage[:3])
+            value = next((value for code, value in subfields if code in 'ab'), None)
+            if target and value:
+                book.setdefault(target, _clean(value))
+            continue
+
+        for code, value in subfields:
+            target = MARC_FIELDS.get((tag, code))
+            value = _clean(value)
+            if not target or not value:
+                continue
+            if target in _REPEATABLE:
+                repeated.setdefault(target, []).append(value)
+            else:
+                book.setdefault(target, value)
+
+    for target, values in repeated.items():
+        book[target] = '; '.join(dict.fromkeys(values))
+
+    # "0-19-539288-3 (pbk.)" -> "0-19-539288-3"; "c2010." -> 2010; "xii, 471 p." -> 471
+    if 'isbn' in book:
+        book['isbn'] = book['isbn'].split()[0]
+    for target, pattern in (('publication_year', _YEAR), ('pages', _NUMBER)):
+        if target in book:
+            numbers = pattern.findall(book[target])
+            if target == 'pages':
+                numbers = numbers[-1:]
+            book[target] = int(numbers[0]) if numbers else None
+    if 'dewey_decimal' in book:
+        book['dewey_decimal'] = book['dewey_decimal'].replace('/', '')
+    return book
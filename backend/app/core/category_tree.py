@@ -0,0 +1,96 @@
+"""
+In-memory category hierarchy with nested-set intervals.
+
+Categories are laid out in depth-first (pre-)order, so every subtree is a
+contiguous run [left, right) of that order: a category's descendants are a
+list slice, "is X under Y" is an interval check, and subtree totals of any
+per-category number are two lookups in a prefix-sum array.
+
+Usage:
+    tree = CategoryTree.build(supabase.table('categories').select('id,parent_id').execute().data)
+    tree.subtree(dewey_900)  # [dewey_900, dewey_910, dewey_911, ...]
+    tree.subtree_totals({category_id: book_count, ...})
+"""
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class CategoryTree:
+    """Immutable category forest, indexed for subtree queries."""
+
+    def __init__(self, order: List[str], spans: Dict[str, Tuple[int, int]], version: int = 0):
+        self._order = order
+        self._spans = spans
+        self.version = version
+
+    @classmethod
+    def build(cls, rows: Iterable[Mapping[str, Any]], version: int = 0) -> "CategoryTree":
+        """
+        Build from rows with `id` and `parent_id`.
+
+        Categories whose parent is missing are treated as roots; a parent
+        cycle (which the schema does not prevent) is broken where it is
+        first entered, so every category appears exactly once.
+        """
+        parents: Dict[str, Optional[str]] = {}
+        for row in rows:
+            parent_id = row.get('parent_id')
+            parents[str(row['id'])] = str(parent_id) if parent_id else None
+
+        children: Dict[Optional[str], List[str]] = {}
+        for category_id in sorted(parents):
+            parent_id = parents[category_id]
+            if parent_id not in parents:
+                parent_id = None
+            children.setdefault(parent_id, []).append(category_id)
+
+        order: List[str] = []
+        spans: Dict[str, Tuple[int, int]] = {}
+        # Roots first, then whatever only a cycle can reach
+        for root in children.get(None, []) + sorted(parents):
+            if root in spans:
+                continue
+            spans[root] = (len(order), -1)
+            order.append(root)
+            stack = [(root, iter(children.get(root, ())))]
+            while stack:
+                node, pending = stack[-1]
+                child = next(pending, None)
+                if child is None:
+                    spans[node] = (spans[node][0], len(order))
+                    stack.pop()
+                elif child not in spans:
+                    spans[child] = (len(order), -1)
+                    order.append(child)
+                    stack.append((child, iter(children.get(child, ()))))
+        return cls(order, spans, version)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, category_id: Any) -> bool:
+        return str(category_id) in self._spans
+
+    def subtree(self, category_id: Any) -> List[str]:
+        """The category and all its descendants (just the id if unknown)."""
+        category_id = str(category_id)
+        span = self._spans.get(category_id)
+        if span is None:
+            return [category_id]
+        return self._order[span[0]:span[1]]
+
+    def is_descendant(self, category_id: Any, ancestor_id: Any) -> bool:
+        """Whether `category_id` is `ancestor_id` or below it."""
+        span = self._spans.get(str(category_id))
+        ancestor = self._spans.get(str(ancestor_id))
+        if span is None or ancestor is None:
+            return False
+        return ancestor[0] <= span[0] < ancestor[1]
+
+    def subtree_totals(self, values: Mapping[str, int]) -> Dict[str, int]:
+        """Per-category sum of `values` (keyed by string id) over its subtree."""
+        running = [0, *accumulate(int(values.get(category_id, 0)) for category_id in self._order)]
+        return {
+            category_id: running[right] - running[left]
+            for category_id, (left, right) in self._spans.items()
+        }
@@ -0,0 +1,135 @@
+"""
+Conditional GET support: strong ETags, Last-Modified and 304 responses.
+
+Validators are derived from `updated_at` plus the row id (entities) or from
+a collection's count and newest `updated_at` (listings), so they can be
+computed from a cheap version query or an already-cached result without
+serializing the body.
+
+Usage:
+    version = ResourceVersion.of("book", book.id, book.updated_at, last_modified=book.updated_at)
+    if version.matches(request):
+        return version.not_modified()
+    version.apply(response)
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a DB timestamp (ISO string or datetime) as an aware UTC datetime."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_conditional(request: Request) -> bool:
+    """Whether the request carries validators worth checking before loading the body."""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def _etag_values(header: str) -> Iterable[str]:
+    for value in header.split(','):
+        value = value.strip()
+        # Weak comparison: compressed responses carry the weakened tag
+        yield value[2:] if value.startswith('W/') else value
+
+
+@dataclass(frozen=True)
+class ResourceVersion:
+    """Validators for one representation of a resource."""
+    etag: str
+    last_modified: Optional[datetime] = None
+    # Revalidate on every use instead of heuristic freshness from Last-Modified
+    cache_control: str = "private, no-cache"
+
+    @classmethod
+    def of(
+        cls,
+        kind: str,
+        *parts: Any,
+        last_modified: Any = None,
+        cache_control: str = "private, no-cache"
+    ) -> "ResourceVersion":
+        """
+        Build a version from the parts identifying a representation.
+
+        Args:
+            kind: Resource kind, so equal parts of different resources differ
+            parts: id, updated_at, counters, query options...
+            last_modified: Timestamp for Last-Modified (ISO string or datetime)
+            cache_control: Cache-Control sent with the validators
+        """
+        digest = hashlib.sha1("|".join([kind, *map(str, parts)]).encode()).hexdigest()[:24]
+        return cls(
+            etag=f'"{digest}"',
+            last_modified=parse_timestamp(last_modified),
+            cache_control=cache_control
+        )
+
+    @classmethod
+    def of_collection(cls, kind: str, items: Iterable[Any], *extra: Any) -> "ResourceVersion":
+        """
+        Version of a listing from its items' `updated_at` values.
+
+        Count plus newest timestamp catches inserts, updates and deletes
+        (a delete lowers the count; an insert or update raises the newest).
+        """
+        items = list(items)
+        timestamps = [parse_timestamp(_updated_at(item)) for item in items]
+        timestamps = [ts for ts in timestamps if ts is not None]
+        newest = max(timestamps) if timestamps else None
+        return cls.of(kind, len(items), newest, *extra, last_modified=newest)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """
+        True if the client's cached copy is current.
+
+        If-None-Match takes precedence; If-Modified-Since is only consulted
+        when no entity tags were sent.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            return self.etag in _etag_values(if_none_match)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # HTTP dates have one-second resolution
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers())
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
+
+
+def _updated_at(item: Any) -> Any:
+    if isinstance(item, dict):
+        return item.get('updated_at')
+    return getattr(item, 'updated_at', None)
@@ -41,12 +41,135 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_KEY: str = ""
 
+    # PostgREST call limits; after CIRCUIT_FAILURE_THRESHOLD consecutive
+    # failures calls fail fast and cached reads are served stale
+    SUPABASE_TIMEOUT: float = 10.0  # seconds per attempt
+    SUPABASE_DEADLINE: float = 15.0  # seconds per call, retries included
+    SUPABASE_RETRIES: int = 2
+    SUPABASE_RETRY_BACKOFF: float = 0.2  # seconds before the first retry, doubling
+    SUPABASE_RETRY_BUDGET: float = 0.2  # retries allowed per call, on average
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds open before a trial call
+
     # Database Settings (Supabase PostgreSQL)
     DATABASE_URL: str = ""
 
+    # Direct Postgres (asyncpg pool on DATABASE_URL) for selected hot paths;
+    # anything not listed goes through PostgREST.
+    # Paths: auth, books.list, books.import, circulation.issue, circulation.stats
+    DIRECT_DB_PATHS: Union[List[str], str] = []
+    POSTGRES_POOL_MIN_SIZE: int = 1
+    POSTGRES_POOL_MAX_SIZE: int = 10
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 100  # 0 behind a transaction-mode pooler (port 6543)
+    POSTGRES_COMMAND_TIMEOUT: float = 10.0  # seconds
+
+    @field_validator('DIRECT_DB_PATHS', mode='before')
+    @classmethod
+    def parse_direct_db_paths(cls, v):
+        """Parse DIRECT_DB_PATHS from comma-separated string or list"""
+        if isinstance(v, str):
+            return [path.strip() for path in v.split(',') if path.strip()]
+        return v
+
+    # Read replica for reports, analytics and circulation statistics;
+    # reads fall back to the primary when it lags or is unreachable
+    SUPABASE_REPLICA_URL: str = ""  # the replica's own API URL (PostgREST reads)
+    DATABASE_REPLICA_URL: str = ""  # replica for reads on DIRECT_DB_PATHS
+    REPLICA_MAX_LAG: float = 30.0  # seconds behind the primary a replica may serve reads
+    REPLICA_CHECK_INTERVAL: float = 10.0  # seconds between replica lag checks
+
+    # Health: one background database probe per deployment (shared through
+    # Redis), served by /health; /health/deep probes on demand
+    HEALTH_PROBE_INTERVAL: float = 30.0  # seconds; also the Supabase keep-alive
+    HEALTH_DEEP_MIN_INTERVAL: float = 10.0  # seconds between on-demand probes per worker
+
     # Upstash Redis Settings
     UPSTASH_REDIS_REST_URL: str = ""
     UPSTASH_REDIS_REST_TOKEN: str = ""
+    # Plain Redis protocol URL (redis://...), used when Upstash REST is not set
+    REDIS_URL: str = ""
+
+    # Cache Settings (in-process L1 + Redis L2)
+    CACHE_ENABLED: bool = True
+    CACHE_NAMESPACE: str = "nawra"
+    CACHE_DEFAULT_TTL: int = 300  # seconds
+    CACHE_L1_MAX_ENTRIES: int = 2048
+    CACHE_L1_TTL: int = 30  # seconds; bounds staleness across workers
+    CACHE_TTL_JITTER: float = 0.1  # +/- fraction of TTL
+    BOOK_CACHE_TTL: int = 600  # seconds; book detail entries
+    AVAILABILITY_CACHE_TTL: int = 15  # seconds; batch availability entries
+    CACHE_VERSION_TTL: int = 5  # seconds a worker memoizes version counters
+    CACHE_STALE_TTL: int = 86400  # seconds a last good value may be served while the database is down
+    CACHE_STALE_MAX_ENTRIES: int = 1024
+
+    # Cross-worker invalidation: a LISTEN connection receives migration 011's
+    # change notifications and evicts matching entries in every worker
+    CACHE_LISTEN_ENABLED: bool = True
+    CACHE_LISTEN_URL: str = ""  # direct/session-mode URL (not port 6543); defaults to DATABASE_URL
+    CACHE_LISTEN_PING_INTERVAL: float = 30.0  # seconds between liveness checks
+    AUTH_USER_CACHE_TTL: int = 60  # seconds; users are only cached while listening
+
+    # Public catalogue (anonymous, CDN-cacheable)
+    CATALOG_CACHE_TTL: int = 300  # seconds; server-side cache per catalogue version
+    CATALOG_MAX_AGE: int = 60  # browser freshness
+    CATALOG_SHARED_MAX_AGE: int = 300  # CDN / shared cache freshness (s-maxage)
+    CATALOG_STALE_WHILE_REVALIDATE: int = 86400
+
+    # Delta sync (/sync/books, /sync/categories)
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_MAX_PAGE_SIZE: int = 2000
+    SYNC_SAFETY_WINDOW: int = 5  # seconds; rows newer than this are held back until their transactions settle
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90  # keep in step with prune_deleted_records()
+
+    # Faceted search counts (book_facets RPC, cached per filter set)
+    FACET_CACHE_TTL: int = 60
+    FACET_YEAR_BUCKET: int = 10  # publication-year bucket width
+
+    # Circulation history archive (scripts/archive_circulation.py; requires 'pyarrow')
+    # A filesystem path read by every API instance: with more than one
+    # instance it must be shared storage (NFS/EFS or similar), or reports on
+    # other instances silently miss the archived years
+    CIRCULATION_ARCHIVE_DIR: str = "archive/circulation"
+    CIRCULATION_RETENTION_DAYS: int = 730  # settled loans returned longer ago than this leave the database
+
+    # Bulk catalogue import (POST /books/import, scripts/import_catalogue.py)
+    IMPORT_BATCH_SIZE: int = 1000  # records validated and loaded per statement
+    IMPORT_MAX_ERRORS: int = 100  # problems listed in import progress
+    IMPORT_MAX_FILE_SIZE: int = 512 * 1024 * 1024  # 512MB uploaded; larger files via the script
+
+    # Live circulation events (GET /circulation/events, server-sent events)
+    EVENTS_QUEUE_SIZE: int = 256  # events buffered per client before it is resynced
+    EVENTS_HEARTBEAT_INTERVAL: float = 15.0  # seconds between keep-alive comments
+    CIRCULATION_FEED_REFRESH_INTERVAL: int = 300  # seconds between counter reloads
+
+    # Typeahead suggestions (in-process prefix index over the catalogue)
+    SUGGEST_REFRESH_INTERVAL: int = 60  # seconds between catch-up reads of other workers' writes
+
+    # Response encoding (MessagePack / gzip / brotli negotiation)
+    RESPONSE_ENCODING_MIN_SIZE: int = 1024  # bytes; smaller bodies are not compressed
+
+    # Request coalescing: max seconds a caller waits on a shared computation
+    SINGLEFLIGHT_TIMEOUT: float = 30.0
+
+    # Admission control: concurrent requests per worker and per lane. Keep
+    # ADMISSION_CAPACITY - ADMISSION_CRITICAL_RESERVE below the threadpool
+    # size (40) so heavy sync endpoints cannot take every thread.
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CAPACITY: int = 48
+    ADMISSION_CRITICAL_RESERVE: int = 12  # slots only auth and desk circulation may use
+    ADMISSION_CRITICAL_LIMIT: int = 48
+    ADMISSION_INTERACTIVE_LIMIT: int = 32
+    ADMISSION_ANALYTICS_LIMIT: int = 8
+    ADMISSION_REPORTS_LIMIT: int = 2  # reports, exports, imports and bulk operations
+    ADMISSION_MAX_QUEUE: int = 64  # waiting requests per lane before 429
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0  # seconds a request may wait for a slot
+
+    # Idempotency-Key for checkout, return, renewal and fine collection
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL: int = 86400  # seconds a response is replayed for
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000  # in-process responses (Redis holds them when configured)
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0  # seconds a duplicate waits on the first before 409
+    IDEMPOTENCY_LOCK_TTL: int = 60  # seconds a key stays claimed by a request that never finishes
 
     # Email Settings (Resend)
     RESEND_API_KEY: str = ""
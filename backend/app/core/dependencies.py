@@ -3,17 +3,72 @@ Authentication and authorization dependencies for FastAPI endpoints
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional, List, Callable
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Optional, List, Callable
 import logging
 
+from .cache import cached
+from .config import settings
 from .security import decode_token
 from ..db import get_supabase
+from ..db.listener import change_listener_active
+from ..db.postgres import direct_db
 
 logger = logging.getLogger(__name__)
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# Same shape as the PostgREST select below (ids as text, role embedded as `roles`)
+AUTH_USER_SQL = """
+    SELECT u.id::text AS id, u.email, u.full_name, u.user_type, u.is_active,
+           u.role_id::text AS role_id,
+           CASE WHEN r.id IS NULL THEN NULL
+                ELSE jsonb_build_object('name', r.name, 'permissions', r.permissions)
+           END AS roles
+    FROM users u
+    LEFT JOIN roles r ON r.id = u.role_id
+    WHERE u.id = $1::uuid AND u.is_active
+"""
+
+
+def user_cache_tag(user_id: Any) -> str:
+    """Cache tag carried by the cached auth record of one user."""
+    return f"user:{user_id}"
+
+
+# Carried by every cached auth record (evicted together on role changes)
+AUTH_USERS_TAG = "users"
+
+
+async def _load_user(user_id: str) -> Optional[dict]:
+    """Fetch an active user with role name and permissions (None if not found)."""
+    db = direct_db("auth")
+    if db is not None:
+        row = await db.fetchrow(AUTH_USER_SQL, user_id)
+        return dict(row) if row else None
+
+    supabase = get_supabase()
+    # Off the event loop, so a slow PostgREST call stalls only this request
+    response = await run_in_threadpool(
+        supabase.table('users').select(
+            "id, email, full_name, user_type, is_active, role_id, roles(name, permissions)"
+        ).eq('id', user_id).eq('is_active', True).execute
+    )
+    return response.data[0] if response.data else None
+
+
+@cached(
+    "auth_user",
+    ttl=settings.AUTH_USER_CACHE_TTL,
+    tags=lambda user_id: [user_cache_tag(user_id), AUTH_USERS_TAG]
+)
+async def _load_cached_user(user_id: str) -> Optional[dict]:
+    # A users/roles notification that evicts these tags while the load runs
+    # marks it invalidated: the caller gets the row, but it is not cached and
+    # later callers load afresh instead of joining it (TwoLevelCache._track)
+    return await _load_user(user_id)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -56,13 +111,15 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Fetch user from database with role and permissions
-        supabase = get_supabase()
-        response = supabase.table('users').select(
-            "id, email, full_name, user_type, is_active, role_id, roles(name, permissions)"
-        ).eq('id', user_id).eq('is_active', True).execute()
+        # Fetch user from database with role and permissions. Cached only while
+        # change notifications arrive to evict it (deactivation, role edits).
+        if change_listener_active():
+            user = await _load_cached_user(user_id)
+            user = dict(user) if user else None
+        else:
+            user = await _load_user(user_id)
 
-        if not response.data or len(response.data) == 0:
+        if not user:
             logger.warning(f"User {user_id} not found or inactive")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,8 +127,6 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        user = response.data[0]
-
         # Extract permissions from role
         role_info = user.get('roles', {})
         permissions = role_info.get('permissions', []) if isinstance(role_info, dict) else []
@@ -285,15 +340,10 @@ async def get_current_user_optional(
         if not user_id:
             return None
 
-        supabase = get_supabase()
-        response = supabase.table('users').select(
-            "id, email, full_name, user_type, is_active, role_id, roles(name, permissions)"
-        ).eq('id', user_id).eq('is_active', True).execute()
-
-        if not response.data:
+        user = await _load_user(user_id)
+        if not user:
             return None
 
-        user = response.data[0]
         role_info = user.get('roles', {})
         user['permissions'] = role_info.get('permissions', []) if isinstance(role_info, dict) else []
         user['role_name'] = role_info.get('name', 'Unknown') if isinstance(role_info, dict) else 'Unknown'
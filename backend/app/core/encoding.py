@@ -0,0 +1,195 @@
+"""
+Negotiated response encoding: MessagePack bodies and gzip/brotli compression.
+
+`ResponseEncodingMiddleware` wraps the whole app, so every router mounted
+from `app/api/v1/router.py` gets it without changes:
+
+- `Accept: application/msgpack` (or `application/x-msgpack`) preferred over
+  JSON turns JSON bodies into MessagePack (requires the `msgpack` package).
+- `Accept-Encoding: br` / `gzip` compresses bodies of at least
+  RESPONSE_ENCODING_MIN_SIZE bytes (brotli requires the `brotli` package).
+
+Only complete single-chunk bodies are re-encoded; streamed responses pass
+through untouched.
+"""
+from typing import List, Optional, Tuple
+import gzip
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def _parse_header_values(value: str) -> List[Tuple[str, float]]:
+    """Parse `a, b;q=0.5` into [(a, 1.0), (b, 0.5)]."""
+    parsed = []
+    for part in value.split(','):
+        token, _, params = part.strip().partition(';')
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, raw = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        parsed.append((token.strip().lower(), quality))
+    return parsed
+
+
+def prefers_msgpack(accept: str) -> bool:
+    """True if the Accept header ranks MessagePack above JSON."""
+    if not accept:
+        return False
+    qualities = dict(_parse_header_values(accept))
+    msgpack_q = max(qualities.get(media_type, 0.0) for media_type in MSGPACK_TYPES)
+    json_q = qualities.get("application/json", qualities.get("application/*", qualities.get("*/*", 0.0)))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick 'br' or 'gzip' from Accept-Encoding (brotli wins ties)."""
+    if not accept_encoding:
+        return None
+    qualities = dict(_parse_header_values(accept_encoding))
+    wildcard = qualities.get("*", 0.0)
+    candidates = []
+    if brotli is not None:
+        candidates.append(("br", qualities.get("br", wildcard)))
+    candidates.append(("gzip", qualities.get("gzip", wildcard)))
+    encoding, quality = max(candidates, key=lambda item: item[1])
+    return encoding if quality > 0 else None
+
+
+class ResponseEncodingMiddleware:
+    """ASGI middleware applying Accept / Accept-Encoding negotiation."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        use_msgpack = msgpack is not None and prefers_msgpack(headers.get("accept", ""))
+        encoding = choose_encoding(headers.get("accept-encoding", ""))
+
+        if not use_msgpack and encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _EncodingResponder(self, send, use_msgpack, encoding)
+        await self.app(scope, receive, responder)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+
+class _EncodingResponder:
+    """Buffers the response start, then re-encodes a single-chunk body."""
+
+    def __init__(
+        self,
+        middleware: ResponseEncodingMiddleware,
+        send: Send,
+        use_msgpack: bool,
+        encoding: Optional[str],
+    ):
+        self.middleware = middleware
+        self.send = send
+        self.use_msgpack = use_msgpack
+        self.encoding = encoding
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        if message.get("more_body", False):
+            # Streaming response: send as-is
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        body = self._encode(body, headers)
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": body})
+
+    def _encode(self, body: bytes, headers: MutableHeaders) -> bytes:
+        if not body or "content-encoding" in headers:
+            return body
+
+        content_type = headers.get("content-type", "")
+        vary = []
+        transformed = False
+
+        if self.use_msgpack:
+            vary.append("Accept")
+            if content_type.startswith("application/json"):
+                body = msgpack.packb(orjson.loads(body))
+                content_type = "application/msgpack"
+                headers["content-type"] = content_type
+                transformed = True
+
+        if self.encoding is not None:
+            vary.append("Accept-Encoding")
+            if len(body) >= self.middleware.minimum_size and content_type.startswith(COMPRESSIBLE_TYPES):
+                body = self.middleware.compress(body, self.encoding)
+                headers["content-encoding"] = self.encoding
+                transformed = True
+
+        existing_vary = {v.strip().lower() for v in headers.get("vary", "").split(",")}
+        for value in vary:
+            if value.lower() not in existing_vary:
+                headers.add_vary_header(value)
+
+        # A re-encoded body is no longer byte-identical to the tagged one
+        etag = headers.get("etag")
+        if transformed and etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+        headers["content-length"] = str(len(body))
+        return body
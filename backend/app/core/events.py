@@ -0,0 +1,116 @@
+"""
+In-process event fan-out for server-sent event streams.
+
+A publisher hands each event to an EventBroker once; every subscribed
+stream gets it from its own bounded queue, so ten open dashboards cost ten
+queue puts, not ten database queries:
+
+    broker = get_event_broker("circulation")
+    broker.publish("loan.issued", {...})
+
+    async with broker.subscribe() as subscription:
+        event = await subscription.next(timeout=15)
+
+A subscriber that falls more than its queue size behind loses events; its
+next call returns (RESYNC, None) so the stream can send a fresh snapshot
+instead.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+import asyncio
+
+import orjson
+
+# Returned by Subscription.next() after events were dropped for a slow subscriber
+RESYNC = "resync"
+
+
+class Subscription:
+    """One subscriber's queue of (event, data) pairs."""
+
+    def __init__(self, queue_size: int):
+        self._queue: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._overflowed = False
+
+    def _put(self, event: str, data: Any) -> None:
+        try:
+            self._queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._overflowed = True
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Tuple[str, Any]]:
+        """The next event, (RESYNC, None) after an overflow, or None on timeout."""
+        if self._overflowed:
+            self._overflowed = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return RESYNC, None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """Fans published events out to every current subscriber."""
+
+    def __init__(self, name: str, queue_size: int = 256):
+        self.name = name
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+
+    def publish(self, event: str, data: Any) -> None:
+        """Deliver an event to all subscribers (never blocks)."""
+        self.published += 1
+        for subscription in self._subscribers:
+            subscription._put(event, data)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[Subscription]:
+        subscription = Subscription(self.queue_size)
+        self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "dropped": sum(subscription.dropped for subscription in self._subscribers),
+        }
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One server-sent event frame with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+# Keep-alive frame: a comment line, ignored by EventSource clients
+SSE_HEARTBEAT = b": ping\n\n"
+
+
+_brokers: Dict[str, EventBroker] = {}
+
+
+def get_event_broker(name: str, queue_size: int = 256) -> EventBroker:
+    """
+    Get or create the named event broker
+    """
+    broker = _brokers.get(name)
+    if broker is None:
+        broker = _brokers[name] = EventBroker(name, queue_size)
+    return broker
+
+
+def event_metrics() -> Dict[str, Dict[str, int]]:
+    """Subscriber and delivery counters for every broker."""
+    return {name: broker.stats() for name, broker in _brokers.items()}
@@ -0,0 +1,98 @@
+"""
+Column projection and sparse fieldsets for list endpoints.
+
+List endpoints select only the columns their item model needs, and accept
+`?fields=id,title,author` so clients can ask for a smaller subset. When a
+subset is requested the endpoint returns `sparse_response(...)`, which skips
+response_model validation and serializes only the fields that were set.
+
+Usage:
+    @router.get("/books")
+    async def get_books(
+        fields: Optional[List[str]] = Depends(sparse_fields(BookListItem)),
+        ...
+    ):
+        result = await books_service.get_books(filters, fields=fields)
+        return sparse_response(result) if fields else result
+"""
+from typing import Any, Callable, Iterable, List, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+from .responses import FastJSONResponse
+
+
+def model_columns(model: Type[BaseModel], exclude: Iterable[str] = ()) -> List[str]:
+    """Names of the model's fields, in declaration order."""
+    excluded = set(exclude)
+    return [name for name in model.model_fields if name not in excluded]
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    always: Iterable[str] = ("id",)
+) -> Optional[List[str]]:
+    """
+    Parse a comma-separated field list.
+
+    Returns None when no subset was requested; otherwise the requested
+    fields (plus `always`) in the order they appear in `allowed`.
+
+    Raises:
+        ValueError: If any requested field is unknown
+    """
+    if not fields:
+        return None
+
+    allowed = list(allowed)
+    requested = {name.strip() for name in fields.split(',') if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    requested.update(always)
+    return [name for name in allowed if name in requested]
+
+
+def sparse_fields(
+    model: Type[BaseModel],
+    always: Iterable[str] = ("id",)
+) -> Callable[..., Optional[List[str]]]:
+    """
+    Dependency factory for a `fields` query parameter validated against `model`.
+    """
+    allowed = model_columns(model)
+    always = tuple(always)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated subset of fields to return ({', '.join(allowed)})"
+        )
+    ) -> Optional[List[str]]:
+        try:
+            return parse_fields(fields, allowed, always)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return dependency
+
+
+def pick(item: dict, fields: Iterable[str]) -> dict:
+    """Keep only `fields` from a dict item."""
+    return {name: item.get(name) for name in fields}
+
+
+def sparse_response(result: Any) -> FastJSONResponse:
+    """
+    Serialize a (partially populated) result without response_model validation.
+
+    Models built with `model_construct` only carry the projected fields, so
+    unset fields are left out of the payload.
+    """
+    if isinstance(result, BaseModel):
+        # Projected items hold raw column values (e.g. UUIDs as strings)
+        result = result.model_dump(mode="json", exclude_unset=True, warnings=False)
+    return FastJSONResponse(result)
@@ -0,0 +1,337 @@
+"""
+Idempotency keys for desk circulation writes.
+
+Desk clients on flaky Wi-Fi retry a checkout, return, renewal or fine
+collection whose response they never saw. A client that sends an
+`Idempotency-Key` header (any unique string, e.g. a UUID, per intended
+operation) with those requests gets each operation carried out once:
+
+- the first request runs and, if its response is final (a 2xx, or a 4xx
+  that a retry would get again: see STORED_CLIENT_ERRORS), it is stored
+  for IDEMPOTENCY_TTL seconds; anything else (401, 403, 408, 409, 429,
+  5xx) is not stored, so a retry runs again
+- a retry with the same key gets the stored response straight away,
+  marked `Idempotent-Replayed: true`
+- a retry arriving while the first is still running waits for its result
+  (in this worker, or through Redis in another) for up to
+  IDEMPOTENCY_WAIT_TIMEOUT seconds, then gets `409 Conflict`
+- a key reused with a different method, path or body gets
+  `422 Unprocessable Entity`
+
+Keys are scoped to the authenticated user. Responses are kept in Redis
+when configured (shared by every worker) and in a bounded in-process LRU
+otherwise. Requests without the header are unaffected.
+"""
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+import asyncio
+import base64
+import hashlib
+import logging
+import re
+import time
+
+import orjson
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import LRUCache, _MISSING
+from .config import settings
+from .security import decode_token
+from ..db.redis import RedisBackend, get_redis
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Writes that honour Idempotency-Key
+IDEMPOTENT_ROUTES: List[Tuple[str, Pattern[str]]] = [
+    ("POST", re.compile(r"^/api/v1/circulation$")),
+    ("POST", re.compile(r"^/api/v1/circulation/[^/]+/(return|renew)$")),
+    ("POST", re.compile(r"^/api/v1/circulation/fines/collect/[^/]+$")),
+]
+
+# How often a request waits on another worker's result is re-checked
+POLL_INTERVAL = 0.1
+
+# Client errors a retry of the same request would get again. Others depend
+# on when the request ran (expired token, revoked permission, timeout,
+# conflict, admission shedding) and must not be replayed.
+STORED_CLIENT_ERRORS = frozenset({400, 404, 410, 422})
+
+
+def is_idempotent_route(method: str, path: str) -> bool:
+    return any(method == route_method and pattern.match(path) for route_method, pattern in IDEMPOTENT_ROUTES)
+
+
+def is_final_status(status_code: int) -> bool:
+    """Whether a response is the operation's outcome, to replay on retries."""
+    return 200 <= status_code < 300 or status_code in STORED_CLIENT_ERRORS
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    return hashlib.sha256(method.encode() + b" " + path.encode() + b"\n" + body).hexdigest()
+
+
+class IdempotencyStore:
+    """Stored responses by key, with in-flight tracking for concurrent duplicates."""
+
+    def __init__(
+        self,
+        local: LRUCache,
+        redis: Optional[RedisBackend] = None,
+        prefix: str = "nawra",
+        ttl: int = 86400,
+        lock_ttl: int = 60,
+    ):
+        self.local = local
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._in_flight: Dict[str, "asyncio.Future[Optional[dict]]"] = {}
+        self.counters = {"executed": 0, "replayed": 0, "waited": 0, "conflicts": 0, "mismatches": 0}
+
+    def make_key(self, user_id: str, key: str) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return f"{self.prefix}:idempotency:{user_id}:{digest}"
+
+    async def get(self, full_key: str) -> Optional[dict]:
+        record = self.local.get(full_key)
+        if record is not _MISSING:
+            return record
+        if self.redis is None:
+            return None
+        try:
+            payload = await self.redis.get(full_key)
+        except Exception as e:
+            logger.warning(f"Idempotency read failed for {full_key}: {str(e)}")
+            return None
+        if payload is None:
+            return None
+        record = orjson.loads(payload)
+        self.local.set(full_key, record, self.ttl)
+        return record
+
+    async def put(self, full_key: str, record: dict) -> None:
+        self.local.set(full_key, record, self.ttl)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(full_key, orjson.dumps(record).decode(), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Idempotency write failed for {full_key}: {str(e)}")
+
+    async def lock(self, full_key: str) -> bool:
+        """Claim a key across workers (always True without Redis)."""
+        if self.redis is None:
+            return True
+        try:
+            return await self.redis.execute("SET", f"{full_key}:lock", "1", "NX", "EX", self.lock_ttl) is not None
+        except Exception as e:
+            # Without the shared lock, duplicates are still caught in this worker
+            logger.warning(f"Idempotency lock failed for {full_key}: {str(e)}")
+            return True
+
+    async def unlock(self, full_key: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(f"{full_key}:lock")
+        except Exception as e:
+            logger.warning(f"Idempotency unlock failed for {full_key}: {str(e)}")
+
+    async def wait_elsewhere(self, full_key: str, timeout: float) -> Optional[dict]:
+        """Poll for the result of a request another worker is running."""
+        give_up_at = time.monotonic() + timeout
+        while time.monotonic() < give_up_at:
+            await asyncio.sleep(POLL_INTERVAL)
+            record = await self.get(full_key)
+            if record is not None:
+                return record
+            try:
+                if not await self.redis.get(f"{full_key}:lock"):
+                    return None  # Finished without a stored response
+            except Exception:
+                return None
+        raise TimeoutError
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "in_flight": len(self._in_flight), "local_entries": len(self.local)}
+
+
+class IdempotencyMiddleware:
+    """Replays stored responses for repeated Idempotency-Key requests."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        store = get_idempotency_store()
+        if store is None or scope["type"] != "http" or not is_idempotent_route(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        user_id = _user_id(headers.get("authorization", ""))
+        if not key or user_id is None:
+            # Unauthenticated requests are rejected further in; nothing to scope a key to
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await _error(send, 400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await _read_body(receive)
+        fingerprint = request_fingerprint(scope["method"], scope["path"], body)
+        full_key = store.make_key(user_id, key)
+
+        while True:
+            record = await store.get(full_key)
+            if record is None:
+                record = await self._wait_for_duplicate(store, full_key)
+                if record is _CONFLICT:
+                    store.counters["conflicts"] += 1
+                    await _error(send, 409, "A request with this Idempotency-Key is still in progress", retry_after=1)
+                    return
+            if record is not None:
+                if record["fingerprint"] != fingerprint:
+                    store.counters["mismatches"] += 1
+                    await _error(send, 422, "Idempotency-Key was already used for a different request")
+                    return
+                store.counters["replayed"] += 1
+                await _replay(send, record)
+                return
+            if full_key in store._in_flight:
+                continue  # Another request here claimed it first; wait on that one
+            if await store.lock(full_key):
+                break
+            # Claimed by another worker between the checks; wait for it
+
+        await self._execute(store, full_key, fingerprint, scope, body, send)
+
+    async def _wait_for_duplicate(self, store: IdempotencyStore, full_key: str) -> Any:
+        """The result of a concurrent request with the same key, None if there is none (or it was not stored)."""
+        future = store._in_flight.get(full_key)
+        try:
+            if future is not None:
+                store.counters["waited"] += 1
+                return await asyncio.wait_for(asyncio.shield(future), timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT)
+            if store.redis is None:
+                return None
+            try:
+                if not await store.redis.get(f"{full_key}:lock"):
+                    return None
+            except Exception:
+                return None
+            store.counters["waited"] += 1
+            return await store.wait_elsewhere(full_key, settings.IDEMPOTENCY_WAIT_TIMEOUT)
+        except (asyncio.TimeoutError, TimeoutError):
+            return _CONFLICT
+
+    async def _execute(
+        self,
+        store: IdempotencyStore,
+        full_key: str,
+        fingerprint: str,
+        scope: Scope,
+        body: bytes,
+        send: Send,
+    ) -> None:
+        future: "asyncio.Future[Optional[dict]]" = asyncio.get_running_loop().create_future()
+        store._in_flight[full_key] = future
+        store.counters["executed"] += 1
+        response: Dict[str, Any] = {"status": 500, "headers": [], "body": []}
+        record: Optional[dict] = None
+
+        async def receive_body() -> Message:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send_and_capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")] for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+            if is_final_status(response["status"]):
+                record = {
+                    "fingerprint": fingerprint,
+                    "status": response["status"],
+                    "headers": response["headers"],
+                    "body": base64.b64encode(b"".join(response["body"])).decode(),
+                }
+                await store.put(full_key, record)
+        finally:
+            store._in_flight.pop(full_key, None)
+            future.set_result(record)
+            await store.unlock(full_key)
+
+
+# Returned by _wait_for_duplicate when the first request did not finish in time
+_CONFLICT = object()
+
+
+def _user_id(authorization: str) -> Optional[str]:
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    return str(payload["user_id"]) if payload and payload.get("user_id") else None
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _replay(send: Send, record: dict) -> None:
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+    headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+    await send({"type": "http.response.body", "body": base64.b64decode(record["body"])})
+
+
+async def _error(send: Send, status_code: int, detail: str, retry_after: Optional[int] = None) -> None:
+    body = orjson.dumps({"detail": detail})
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(retry_after).encode()))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+# Create a global instance
+idempotency_store = None
+
+
+def get_idempotency_store() -> Optional[IdempotencyStore]:
+    """
+    Get or create the idempotency store (None when IDEMPOTENCY_ENABLED is off)
+    """
+    global idempotency_store
+    if idempotency_store is None and settings.IDEMPOTENCY_ENABLED:
+        idempotency_store = IdempotencyStore(
+            local=LRUCache(settings.IDEMPOTENCY_MAX_ENTRIES),
+            redis=get_redis(),
+            prefix=settings.CACHE_NAMESPACE,
+            ttl=settings.IDEMPOTENCY_TTL,
+            lock_ttl=settings.IDEMPOTENCY_LOCK_TTL,
+        )
+    return idempotency_store
+
+
+def idempotency_metrics() -> Optional[Dict[str, Any]]:
+    """Idempotency-Key counters (None when disabled)."""
+    store = get_idempotency_store()
+    return store.stats() if store is not None else None
@@ -0,0 +1,49 @@
+"""
+The middleware stack, shared by both entrypoints.
+
+main.py (uvicorn) and api/index.py (Vercel, where vercel.json sends every
+request) build their apps separately; both call install_middleware() so
+the desk-write and response guarantees hold however the API is deployed.
+
+Starlette runs the middleware added last outermost. From the inside out:
+
+    AdmissionMiddleware          per-lane concurrency limits (429 when full)
+    IdempotencyMiddleware        replays retried desk writes; outside
+                                 admission, so a replay takes no slot
+    CORSMiddleware               CORS headers, on 429s and replays too
+    ResponseEncodingMiddleware   MessagePack / gzip / brotli negotiation
+    StaleResponseMiddleware      Warning: 110 / X-Data-Stale on responses
+                                 served from last good values in an outage
+"""
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from .admission import AdmissionMiddleware
+from .config import settings
+from .encoding import ResponseEncodingMiddleware
+from .idempotency import IdempotencyMiddleware
+from .resilience import StaleResponseMiddleware
+
+
+def install_middleware(app: FastAPI) -> None:
+    """Add the API's middleware to `app`, innermost first."""
+    # Per-lane concurrency limits (added first: innermost, so CORS headers reach 429s)
+    app.add_middleware(AdmissionMiddleware)
+
+    # Replay responses to retried desk writes (outside admission: replays take no slot)
+    app.add_middleware(IdempotencyMiddleware)
+
+    # CORS Configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS if isinstance(settings.CORS_ORIGINS, list) else [settings.CORS_ORIGINS],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # MessagePack / gzip / brotli response negotiation for every router
+    app.add_middleware(ResponseEncodingMiddleware, minimum_size=settings.RESPONSE_ENCODING_MIN_SIZE)
+
+    # Label responses served from last good values while the database is down
+    app.add_middleware(StaleResponseMiddleware)
@@ -0,0 +1,252 @@
+"""
+In-memory prefix index for typeahead suggestions.
+
+Keys are normalised (case, accents, Arabic diacritics and letter variants
+folded) word-start suffixes of each indexed field, so "pot" finds
+"Harry Potter" and "كتاب" finds "الكتاب". They live in a sorted array split
+into chunks of about CHUNK_SIZE keys, searched with bisect; parallel arrays
+hold 4-byte slot numbers pointing at the (document, field, text) each key
+came from, with equal keys ordered by slot so one entry can be found by
+bisection. Lookups are two binary searches plus a short forward scan, and
+single-document updates shift one chunk rather than the whole array.
+
+Usage:
+    index = PrefixIndex.build(
+        (book['id'], {'title': book['title'], 'author': book['author']})
+        for book in books
+    )
+    index.search("harr", limit=8)  # [(doc_id, field, text), ...]
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import re
+import sys
+import unicodedata
+
+
+# Letter variants that are not combining marks after NFKD
+_ARABIC_FOLD = str.maketrans({
+    'ى': 'ي',  # alef maksura
+    'ة': 'ه',  # teh marbuta
+    'ـ': None,  # tatweel
+})
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_ISBN_CHARS = re.compile(r'[^0-9x]')
+_ISBN_QUERY = re.compile(r'[0-9][0-9\-\s]*x?')
+
+# Words after which a key also starts (bounds keys per field)
+MAX_KEY_WORDS = 4
+
+# Keys are truncated; longer queries are checked against the stored text
+KEY_LENGTH = 24
+
+# Upper bound on entries examined per search, so very short prefixes stay fast
+MAX_SCAN = 512
+
+# Keys per chunk after a build; chunks split at twice this
+CHUNK_SIZE = 1024
+
+Slot = Tuple[str, str, str]  # (doc_id, field, text)
+
+
+def normalize_text(text: str) -> str:
+    """Fold case, accents, Arabic diacritics/letter variants and punctuation."""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        # Strips Latin accents, Arabic harakat and hamza/madda on alef, waw and yeh
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+        text = text.translate(_ARABIC_FOLD)
+    text = text.casefold()
+    return ' '.join(_PUNCTUATION.sub(' ', text).split())
+
+
+def normalize_isbn(text: str) -> str:
+    return _ISBN_CHARS.sub('', text.casefold())
+
+
+def _word_starts(normalized: str) -> Iterator[str]:
+    words = normalized.split(' ')
+    for position in range(min(len(words), MAX_KEY_WORDS)):
+        suffix = ' '.join(words[position:])
+        yield suffix
+        # Arabic definite article: "الكتاب" is also found by "كتاب"
+        if words[position].startswith('ال') and len(words[position]) > 3:
+            yield suffix[2:]
+
+
+def index_keys(field: str, text: str) -> List[str]:
+    """Distinct keys under which `text` is found."""
+    if field == 'isbn':
+        keys = [normalize_isbn(text)]
+    else:
+        keys = [key[:KEY_LENGTH] for key in _word_starts(normalize_text(text))]
+    # Interned, so repeated keys (shared authors, common title words) share memory
+    return [sys.intern(key) for key in dict.fromkeys(keys) if key]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over documents with named text fields."""
+
+    def __init__(self):
+        self._chunks: List[List[str]] = []
+        self._chunk_refs: List[array] = []
+        self._maxes: List[Tuple[str, int]] = []  # Last (key, slot) of each chunk
+        self._size = 0
+        self._slots: List[Optional[Slot]] = []
+        self._free: List[int] = []
+        self._doc_slots: Dict[str, List[int]] = {}
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, Dict[str, Optional[str]]]]) -> "PrefixIndex":
+        """Build an index in one sort (much faster than repeated add())."""
+        index = cls()
+        entries: List[Tuple[str, int]] = []
+        for doc_id, fields in documents:
+            for key, slot in index._register(doc_id, fields):
+                entries.append((key, slot))
+        entries.sort()
+        for start in range(0, len(entries), CHUNK_SIZE):
+            chunk = entries[start:start + CHUNK_SIZE]
+            index._chunks.append([key for key, _ in chunk])
+            index._chunk_refs.append(array('I', (slot for _, slot in chunk)))
+            index._maxes.append(chunk[-1])
+        index._size = len(entries)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._doc_slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_slots
+
+    @property
+    def entry_count(self) -> int:
+        return self._size
+
+    def fields(self, doc_id: str) -> Dict[str, str]:
+        """The indexed texts of a document (empty if it is not indexed)."""
+        return {self._slots[slot][1]: self._slots[slot][2] for slot in self._doc_slots.get(doc_id, ())}
+
+    def add(self, doc_id: str, fields: Dict[str, Optional[str]]) -> None:
+        """Index a document, replacing any previous version of it."""
+        self.remove(doc_id)
+        for key, slot in self._register(doc_id, fields):
+            self._insert(key, slot)
+
+    def remove(self, doc_id: str) -> None:
+        slots = self._doc_slots.pop(doc_id, None)
+        if not slots:
+            return
+        for slot in slots:
+            _, field, text = self._slots[slot]
+            for key in index_keys(field, text):
+                self._delete(key, slot)
+            self._slots[slot] = None
+            self._free.append(slot)
+
+    def search(self, query: str, limit: int = 10) -> List[Slot]:
+        """
+        Documents with a field containing a word starting with `query`.
+
+        Results are distinct by (field, text) and ordered by key.
+        """
+        prefixes = []
+        normalized = normalize_text(query)
+        if normalized:
+            prefixes.append(normalized)
+        if _ISBN_QUERY.fullmatch(query.strip().casefold()):
+            prefixes.append(normalize_isbn(query))
+
+        results: List[Slot] = []
+        seen = set()
+        for prefix in prefixes:
+            key = prefix[:KEY_LENGTH]
+            for scanned, (entry_key, ref) in enumerate(self._scan(key)):
+                if scanned >= MAX_SCAN or not entry_key.startswith(key):
+                    break
+                slot = self._slots[ref]
+                doc_id, field, text = slot
+                if len(prefix) > KEY_LENGTH and prefix not in normalize_text(text):
+                    continue
+                label = (field, text.casefold())
+                if label in seen:
+                    continue
+                seen.add(label)
+                results.append(slot)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _scan(self, key: str) -> Iterator[Tuple[str, int]]:
+        """Entries in key order, starting at the first key >= `key`."""
+        chunk = bisect_left(self._maxes, (key,))
+        if chunk == len(self._chunks):
+            return
+        position = bisect_left(self._chunks[chunk], key)
+        for chunk in range(chunk, len(self._chunks)):
+            keys, refs = self._chunks[chunk], self._chunk_refs[chunk]
+            for index in range(position, len(keys)):
+                yield keys[index], refs[index]
+            position = 0
+
+    def _locate(self, chunk: int, key: str, slot: int) -> int:
+        """Position of (key, slot) within a chunk (where it is or would go)."""
+        keys, refs = self._chunks[chunk], self._chunk_refs[chunk]
+        low = bisect_left(keys, key)
+        high = bisect_right(keys, key, low)
+        return bisect_left(refs, slot, low, high)
+
+    def _insert(self, key: str, slot: int) -> None:
+        if not self._chunks:
+            self._chunks.append([])
+            self._chunk_refs.append(array('I'))
+            self._maxes.append((key, slot))
+
+        chunk = min(bisect_left(self._maxes, (key, slot)), len(self._chunks) - 1)
+        keys, refs = self._chunks[chunk], self._chunk_refs[chunk]
+        position = self._locate(chunk, key, slot)
+        keys.insert(position, key)
+        refs.insert(position, slot)
+        self._maxes[chunk] = (keys[-1], refs[-1])
+        self._size += 1
+
+        if len(keys) > 2 * CHUNK_SIZE:
+            half = len(keys) // 2
+            self._chunks[chunk:chunk + 1] = [keys[:half], keys[half:]]
+            self._chunk_refs[chunk:chunk + 1] = [refs[:half], refs[half:]]
+            self._maxes[chunk:chunk + 1] = [(keys[half - 1], refs[half - 1]), (keys[-1], refs[-1])]
+
+    def _delete(self, key: str, slot: int) -> None:
+        chunk = bisect_left(self._maxes, (key, slot))
+        if chunk == len(self._chunks):
+            return
+        keys, refs = self._chunks[chunk], self._chunk_refs[chunk]
+        position = self._locate(chunk, key, slot)
+        if position == len(keys) or keys[position] != key or refs[position] != slot:
+            return
+        del keys[position]
+        del refs[position]
+        self._size -= 1
+        if keys:
+            self._maxes[chunk] = (keys[-1], refs[-1])
+        else:
+            del self._chunks[chunk], self._chunk_refs[chunk], self._maxes[chunk]
+
+    def _register(self, doc_id: str, fields: Dict[str, Optional[str]]) -> Iterator[Tuple[str, int]]:
+        """Allocate slots for a document's fields and yield (key, slot) entries."""
+        slots = []
+        for field, text in fields.items():
+            if not text:
+                continue
+            slot_value = (doc_id, field, text)
+            if self._free:
+                slot = self._free.pop()
+                self._slots[slot] = slot_value
+            else:
+                slot = len(self._slots)
+                self._slots.append(slot_value)
+            slots.append(slot)
+            for key in index_keys(field, text):
+                yield key, slot
+        self._doc_slots[doc_id] = slots
@@ -0,0 +1,306 @@
+"""
+Deadlines, retries and a circuit breaker for PostgREST calls.
+
+supabase-py waits up to 120 seconds for PostgREST by default, so when
+Supabase stalls (a paused free-tier project, a saturated pooler) every
+request holds a worker for that long. ResilientTransport wraps the httpx
+transport underneath the PostgREST client, so every `.execute()` in the
+code base gets, without changes at the call sites:
+
+- a deadline: each attempt times out after SUPABASE_TIMEOUT seconds and the
+  call as a whole after SUPABASE_DEADLINE
+- bounded retries with jittered exponential backoff: GET/HEAD on timeouts,
+  connection errors and 502/503/504; any method when the connection was
+  never made. Retries come out of a RetryBudget, so an outage cannot
+  multiply the load it is under
+- a circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures
+  calls fail at once with CircuitOpen for CIRCUIT_RESET_TIMEOUT seconds,
+  then a single trial call decides whether to close it again
+
+Reads that are cached (app.core.cache) answer with their last good value
+while PostgREST is unavailable (see is_unavailable()), and
+StaleResponseMiddleware labels those responses with `Warning: 110` and
+`X-Data-Stale` naming the cache namespaces that were served stale.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Set
+import logging
+import random
+import threading
+import time
+
+import httpx
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - optional dependency
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+# Gateway errors that mean "PostgREST or the database is not answering"
+UNAVAILABLE_STATUS = {502, 503, 504}
+
+# APIError codes for the same: gateway statuses (non-JSON error bodies) and
+# PostgREST's own connection and pool errors
+UNAVAILABLE_CODES = {str(status) for status in UNAVAILABLE_STATUS} | {"PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+
+# Exceptions meaning the database could not be reached, on PostgREST or the
+# direct pool (DIRECT_DB_PATHS)
+CONNECTION_ERRORS = (httpx.TransportError, TimeoutError, ConnectionError)
+if asyncpg is not None:
+    CONNECTION_ERRORS += (
+        asyncpg.PostgresConnectionError,
+        asyncpg.InterfaceError,
+        asyncpg.exceptions.CannotConnectNowError,
+        asyncpg.exceptions.TooManyConnectionsError,
+    )
+
+# Methods retried after a failure that may have reached the server
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class CircuitOpen(httpx.TransportError):
+    """Raised instead of calling a service whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead (in half-open state, one trial at a time)."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Circuit '{self.name}' opened after {self.failures} failures; "
+                        f"failing fast for {self.reset_timeout:.0f}s"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "opened_seconds_ago": round(time.monotonic() - self.opened_at, 1)
+            if self.state != self.CLOSED and self.opened_at else None,
+        }
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of calls.
+
+    Every call deposits `ratio` tokens (up to `burst`); every retry spends one.
+    """
+
+    def __init__(self, ratio: float = 0.2, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """httpx transport adding deadlines, budgeted retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        timeout: float = 10.0,
+        deadline: float = 15.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+    ):
+        self._transport = transport
+        self.breaker = breaker
+        self.budget = budget
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpen(f"Circuit '{self.breaker.name}' is open; not calling {request.url.host}", request=request)
+
+        self.budget.deposit()
+        give_up_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            remaining = give_up_at - time.monotonic()
+            request.extensions["timeout"] = httpx.Timeout(min(self.timeout, max(remaining, 0.001))).as_dict()
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                # Not connected means not sent: safe to retry whatever the method
+                retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)) \
+                    or request.method in IDEMPOTENT_METHODS
+                if not self._retry(request, attempt, give_up_at, retryable):
+                    self.breaker.record_failure()
+                    raise
+            except Exception:
+                # Release a half-open trial whatever went wrong
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in UNAVAILABLE_STATUS:
+                    self.breaker.record_success()
+                    return response
+                if not self._retry(request, attempt, give_up_at, request.method in IDEMPOTENT_METHODS):
+                    self.breaker.record_failure()
+                    return response
+                response.close()
+            attempt += 1
+
+    def _retry(self, request: httpx.Request, attempt: int, give_up_at: float, retryable: bool) -> bool:
+        """Sleep before the next attempt; False if there should not be one."""
+        if not retryable or attempt >= self.retries:
+            return False
+        delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        if time.monotonic() + delay >= give_up_at or not self.budget.withdraw():
+            return False
+        logger.info(f"Retrying {request.method} {request.url.path} in {delay * 1000:.0f}ms (attempt {attempt + 2})")
+        time.sleep(delay)
+        return True
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def is_unavailable(error: BaseException) -> bool:
+    """
+    Whether `error` (or an exception it was raised from) means the data
+    source could not be reached, as opposed to a bad query.
+
+    Services re-raise failures as Exception(f"Failed to ...: {e}"), so the
+    original is found on the exception chain.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, CONNECTION_ERRORS):
+            return True
+        if str(getattr(error, "code", None)) in UNAVAILABLE_CODES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    """
+    Get or create the named circuit breaker
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+    return breaker
+
+
+def circuit_metrics() -> Dict[str, Dict[str, Any]]:
+    """State of every circuit breaker."""
+    return {name: breaker.status() for name, breaker in _breakers.items()}
+
+
+# Sources served stale while handling the current request
+_stale_sources: ContextVar[Optional[Set[str]]] = ContextVar("stale_sources", default=None)
+
+
+def mark_stale(source: str) -> None:
+    """Record that the current response includes stale data from `source`."""
+    sources = _stale_sources.get()
+    if sources is not None:
+        sources.add(source)
+
+
+@contextmanager
+def collect_stale() -> Iterator[Set[str]]:
+    """Collect the sources marked stale inside the block (instead of the caller's)."""
+    sources: Set[str] = set()
+    token = _stale_sources.set(sources)
+    try:
+        yield sources
+    finally:
+        _stale_sources.reset(token)
+
+
+class StaleResponseMiddleware:
+    """Labels responses built from last-good values served during an outage."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_labelled(message: Message) -> None:
+            if message["type"] == "http.response.start" and sources:
+                headers = MutableHeaders(scope=message)
+                headers.append("Warning", '110 - "Response is Stale"')
+                headers["X-Data-Stale"] = ", ".join(sorted(sources))
+            await send(message)
+
+        with collect_stale() as sources:
+            await self.app(scope, receive, send_labelled)
@@ -0,0 +1,40 @@
+"""
+Fast JSON responses for trusted, already-shaped data.
+
+FastAPI normally re-validates an endpoint's return value against its
+`response_model`, converts it with `jsonable_encoder` and then serializes
+it, which dominates the cost of large list responses. Endpoints whose
+results are already typed (models validated in bulk by the service) or
+built from trusted database rows can return `FastJSONResponse(result)`
+instead: FastAPI skips response_model processing for Response objects, and
+the body is serialized in one pass by pydantic-core (models) or orjson
+(plain data). Keep `response_model=` on the route for the OpenAPI schema.
+
+Usage:
+    @router.get("/books", response_model=BookListResponse)
+    async def get_books(...):
+        return FastJSONResponse(await books_service.get_books(filters))
+"""
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+from starlette.responses import Response
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with pydantic-core or orjson."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        # orjson handles dict/list/str/UUID/datetime natively; models nested
+        # in plain containers (and Decimal, Enum subclasses) go via pydantic
+        return orjson.dumps(
+            content,
+            default=to_jsonable_python,
+            option=orjson.OPT_NON_STR_KEYS
+        )
@@ -0,0 +1,143 @@
+"""
+Request coalescing (single-flight) for expensive reads.
+
+Concurrent calls with the same key share one in-flight computation and its
+result. The computation runs as its own task, so a caller that times out or
+disconnects does not cancel it for the others.
+
+Usage:
+    stats = await get_singleflight("stats").do(
+        "books:statistics",
+        lambda: run_in_threadpool(self._compute_statistics),
+        timeout=settings.SINGLEFLIGHT_TIMEOUT,
+    )
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+
+
+class FlightTimeout(TimeoutError):
+    """Raised when a caller gives up waiting for a shared computation."""
+
+
+@dataclass
+class FlightStats:
+    """Per-key coalescing counters."""
+    calls: int = 0  # Total do() calls
+    executions: int = 0  # Calls that started the computation
+    shared: int = 0  # Calls that joined an in-flight computation
+    errors: int = 0  # Computations that raised
+    timeouts: int = 0  # Callers that gave up waiting
+    in_flight: bool = False
+    last_duration_ms: Optional[float] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent async computations by key."""
+
+    def __init__(self, name: str, max_tracked_keys: int = 1000):
+        self.name = name
+        self.max_tracked_keys = max_tracked_keys
+        self._tasks: Dict[str, "asyncio.Task[Any]"] = {}
+        self._stats: "OrderedDict[str, FlightStats]" = OrderedDict()
+
+    def _stats_for(self, key: str) -> FlightStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = FlightStats()
+            while len(self._stats) > self.max_tracked_keys:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        return stats
+
+    def _start(self, key: str, fn: Callable[[], Awaitable[Any]], stats: FlightStats) -> "asyncio.Task[Any]":
+        started = time.perf_counter()
+
+        async def run() -> Any:
+            try:
+                return await fn()
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                stats.in_flight = False
+                stats.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+                if self._tasks.get(key) is task:
+                    del self._tasks[key]
+
+        stats.executions += 1
+        stats.in_flight = True
+        task = asyncio.ensure_future(run())
+        # Retrieve the exception so abandoned flights do not log warnings
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._tasks[key] = task
+        return task
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Run `fn` once for all concurrent callers using the same key.
+
+        Args:
+            key: Coalescing key (identical requests must map to the same key)
+            fn: Zero-argument coroutine factory producing the result
+            timeout: Seconds this caller waits before raising FlightTimeout;
+                the shared computation keeps running for other callers
+
+        Returns:
+            The computation's result (shared by every caller)
+        """
+        stats = self._stats_for(key)
+        stats.calls += 1
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._start(key, fn, stats)
+        else:
+            stats.shared += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            if task.done():
+                # The computation itself raised TimeoutError
+                raise
+            stats.timeouts += 1
+            raise FlightTimeout(f"Timed out after {timeout}s waiting for '{key}'")
+
+    def forget(self, key: str) -> None:
+        """
+        Make later calls for `key` start a new computation instead of joining
+        the one in flight (which still completes for its current callers).
+        """
+        self._tasks.pop(key, None)
+
+    def metrics(self) -> Dict[str, dict]:
+        """Snapshot of per-key counters."""
+        return {key: asdict(stats) for key, stats in self._stats.items()}
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """
+    Get or create the named single-flight group
+    """
+    group = _groups.get(name)
+    if group is None:
+        group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def singleflight_metrics() -> Dict[str, Dict[str, dict]]:
+    """Per-key metrics for every single-flight group."""
+    return {name: group.metrics() for name, group in _groups.items()}
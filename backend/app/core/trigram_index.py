@@ -0,0 +1,219 @@
+"""
+Trigram index over a word vocabulary, for "did you mean" corrections.
+
+Words of indexed texts (normalised like the prefix index) are counted into a
+vocabulary; each word's padded trigrams ("  m", " ma", "mah", ...) point back
+at it. A misspelled query word is corrected to the vocabulary words with the
+highest trigram similarity (shared / union, as pg_trgm's `similarity`).
+
+Candidates are generated from the query's rarest trigrams only: a word with
+similarity >= t to an m-trigram query shares at least ceil(t * m) of its
+trigrams, so it must contain one of any m - ceil(t * m) + 1 of them. This
+keeps very common trigrams (" al", "the") from dominating lookup time.
+
+Suggestions are returned in the spelling found in the indexed texts
+("O'Brien", "مدرسة"), not their normalised form ("o brien", "مدرسه"), so
+they can be searched for as typed: each whitespace-separated token is
+remembered under its normalised form, the first spelling seen standing for
+all of them.
+
+Usage:
+    index = TrigramIndex.build(book['author'] for book in books)
+    index.suggest("naguib mahfuz")  # ["Naguib Mahfouz"]
+"""
+from array import array
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import re
+
+from .prefix_index import normalize_text
+
+# Shorter words are not corrected (too few trigrams to tell candidates apart)
+MIN_WORD_LENGTH = 3
+
+# Tokens normalising to more words than this ("a-b-c-d-e") keep no spelling
+MAX_TOKEN_WORDS = 4
+
+# Postings are rebuilt once removed words outnumber live ones (and this many)
+COMPACT_MIN_DEAD = 1024
+
+_EDGE_PUNCTUATION = re.compile(r'^[^\w]+|[^\w]+$')
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Vocabulary of words (with occurrence counts) searchable by trigram similarity."""
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+        self._words: List[Optional[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._counts: List[int] = []
+        self._postings: Dict[str, array] = {}
+        self._dead = 0
+        # Normalised token -> [spelling, texts containing it]
+        self._spellings: Dict[str, list] = {}
+
+    @classmethod
+    def build(cls, texts: Iterable[Optional[str]], threshold: float = 0.3) -> "TrigramIndex":
+        index = cls(threshold)
+        for text in texts:
+            index.add(text)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._ids
+
+    def _insert(self, word: str, count: int = 0) -> int:
+        word_id = len(self._words)
+        self._ids[word] = word_id
+        self._words.append(word)
+        self._counts.append(count)
+        for gram in trigrams(word):
+            self._postings.setdefault(gram, array('I')).append(word_id)
+        return word_id
+
+    def add(self, text: Optional[str]) -> None:
+        words, spellings = self._split(text)
+        for word in words:
+            word_id = self._ids.get(word)
+            if word_id is None:
+                word_id = self._insert(word)
+            self._counts[word_id] += 1
+        for key, spelling in spellings.items():
+            entry = self._spellings.get(key)
+            if entry is None:
+                self._spellings[key] = [spelling, 1]
+            else:
+                entry[1] += 1
+
+    def remove(self, text: Optional[str]) -> None:
+        words, spellings = self._split(text)
+        for word in words:
+            word_id = self._ids.get(word)
+            if word_id is None:
+                continue
+            self._counts[word_id] -= 1
+            if self._counts[word_id] <= 0:
+                # Postings keep the id until the next compaction; lookups skip dead words
+                del self._ids[word]
+                self._words[word_id] = None
+                self._dead += 1
+        for key in spellings:
+            entry = self._spellings.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._spellings[key]
+        if self._dead > max(COMPACT_MIN_DEAD, len(self._ids)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live words and rebuild postings without the dead ids."""
+        live = [(word, count) for word, count in zip(self._words, self._counts) if word is not None]
+        self._words, self._ids, self._counts, self._postings = [], {}, [], {}
+        for word, count in live:
+            self._insert(word, count)
+        self._dead = 0
+
+    def similar(self, word: str, limit: int = 3) -> List[Tuple[str, float]]:
+        """Vocabulary words most similar to `word`, best first (ties: more frequent first)."""
+        query = trigrams(word)
+        required = max(1, ceil(self.threshold * len(query)))
+        rarest = sorted(query, key=lambda gram: len(self._postings.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(query) - required + 1]:
+            candidates.update(self._postings.get(gram, ()))
+
+        # A word has len + 1 trigrams at most; similarity >= t bounds the ratio of counts
+        shortest, longest = self.threshold * len(query) - 1, len(query) / self.threshold - 1
+        scored = []
+        for word_id in candidates:
+            candidate = self._words[word_id]
+            if candidate is None or candidate == word or not shortest <= len(candidate) <= longest:
+                continue
+            grams = trigrams(candidate)
+            shared = len(query & grams)
+            score = shared / (len(query) + len(grams) - shared)
+            if score >= self.threshold:
+                scored.append((score, self._counts[word_id], candidate))
+        scored.sort(reverse=True)
+        return [(candidate, score) for score, _, candidate in scored[:limit]]
+
+    def suggest(self, query: str, limit: int = 3) -> List[str]:
+        """
+        Corrected versions of `query`, best first.
+
+        Words already in the vocabulary (or too short) are kept; each other
+        word is replaced by its closest match. Alternatives swap in the
+        runner-up matches. Empty if nothing could be corrected.
+        """
+        words = normalize_text(query).split(' ')
+        options = []
+        for word in words:
+            if len(word) < MIN_WORD_LENGTH or word in self._ids or word.isdigit():
+                options.append([word])
+            else:
+                options.append([candidate for candidate, _ in self.similar(word, limit)] or [word])
+
+        best = [choices[0] for choices in options]
+        suggestions = [' '.join(best)]
+        for position, choices in enumerate(options):
+            for alternative in choices[1:]:
+                suggestions.append(' '.join(best[:position] + [alternative] + best[position + 1:]))
+
+        original = ' '.join(words)
+        corrected = [s for s in dict.fromkeys(suggestions) if s != original][:limit]
+        return list(dict.fromkeys(self._spelled(suggestion) for suggestion in corrected))
+
+    def _spelled(self, normalized: str) -> str:
+        """`normalized` with each run of words replaced by the token spelling it came from."""
+        words = normalized.split(' ')
+        spelled = []
+        position = 0
+        while position < len(words):
+            for size in range(min(MAX_TOKEN_WORDS, len(words) - position), 0, -1):
+                entry = self._spellings.get(' '.join(words[position:position + size]))
+                if entry is not None:
+                    spelled.append(entry[0])
+                    position += size
+                    break
+            else:
+                spelled.append(words[position])
+                position += 1
+        return ' '.join(spelled)
+
+    @staticmethod
+    def _split(text: Optional[str]) -> Tuple[Set[str], Dict[str, str]]:
+        """
+        Normalised words of `text` worth correcting, and the spelling of each
+        token by its normalised form (edge punctuation dropped).
+        """
+        words: Set[str] = set()
+        spellings: Dict[str, str] = {}
+        if not text:
+            return words, spellings
+        for token in text.split():
+            if token.isascii() and token.isalnum():
+                spelling, key = token, token.casefold()
+            else:
+                spelling = _EDGE_PUNCTUATION.sub('', token)
+                key = normalize_text(spelling) if spelling else ''
+                if not key:
+                    continue
+            if ' ' in key:
+                parts = key.split(' ')
+                words.update(word for word in parts if len(word) >= MIN_WORD_LENGTH)
+                if len(parts) > MAX_TOKEN_WORDS:
+                    continue
+            elif len(key) >= MIN_WORD_LENGTH:
+                words.add(key)
+            spellings.setdefault(key, spelling)
+        return words, spellings
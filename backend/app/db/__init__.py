@@ -1,6 +1,6 @@
 """
 Database package
 """
-from .supabase_client import get_supabase
+from .supabase_client import get_supabase, returning
 
-__all__ = ["get_supabase"]
+__all__ = ["get_supabase", "returning"]
@@ -0,0 +1,136 @@
+"""
+Cold circulation history kept in Parquet files.
+
+Returned, settled loans older than CIRCULATION_RETENTION_DAYS are moved out
+of circulation_records (scripts/archive_circulation.py) into zstd-compressed
+Parquet files under CIRCULATION_ARCHIVE_DIR, one directory per issue year:
+
+    archive/circulation/issue_year=2019/part-201903-20260101T020000.parquet
+
+Files are columnar, so a report that needs three columns of ten years reads
+just those columns, and only the years it asks for. Reads go through
+CirculationHistoryService, which merges them with the live table.
+
+CIRCULATION_ARCHIVE_DIR is a plain filesystem path. Archived rows are gone
+from the database, so every API instance must see the same files: run
+several instances against a shared mount (NFS, EFS, ...), not local disk.
+
+Requires the optional `pyarrow` package.
+"""
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+import logging
+import os
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CirculationArchive:
+    """Year-partitioned Parquet store of archived circulation records."""
+
+    def __init__(self, root: str):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._ds = ds
+        self._pq = pq
+        self.root = Path(root)
+        self.schema = pa.schema([
+            ('id', pa.string()),
+            ('user_id', pa.string()),
+            ('book_id', pa.string()),
+            ('issue_date', pa.date32()),
+            ('due_date', pa.date32()),
+            ('return_date', pa.date32()),
+            ('book_condition', pa.string()),
+            ('fine_amount', pa.decimal128(10, 3)),
+            ('fine_paid', pa.bool_()),
+            ('notes', pa.string()),
+            ('created_at', pa.timestamp('us', tz='UTC')),
+            ('updated_at', pa.timestamp('us', tz='UTC')),
+            ('renewal_count', pa.int32()),
+        ])
+
+    @property
+    def columns(self) -> List[str]:
+        return self.schema.names
+
+    def _year_dir(self, year: int) -> Path:
+        return self.root / f"issue_year={year}"
+
+    def years(self) -> List[int]:
+        """Issue years with archived records."""
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            int(path.name.split('=', 1)[1])
+            for path in self.root.glob('issue_year=*')
+            if any(path.glob('*.parquet'))
+        )
+
+    def write(self, year: int, label: str, rows: Sequence[Mapping[str, Any]]) -> Path:
+        """
+        Write rows of one issue year as a new file (atomically: a reader
+        never sees a partial file). `label` goes into the file name.
+        """
+        table = self._pa.Table.from_pylist(
+            [{name: row.get(name) for name in self.schema.names} for row in rows],
+            schema=self.schema,
+        )
+        directory = self._year_dir(year)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        path = directory / f"part-{label}-{stamp}.parquet"
+        partial = directory / f".{path.name}.tmp"
+        self._pq.write_table(table, partial, compression='zstd')
+        os.replace(partial, path)
+        return path
+
+    def read(self, start: date, end: date, columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Archived records issued between `start` and `end` (inclusive)."""
+        files = [
+            str(path)
+            for year in self.years() if start.year <= year <= end.year
+            for path in sorted(self._year_dir(year).glob('*.parquet'))
+        ]
+        if not files:
+            return []
+        dataset = self._ds.dataset(files, schema=self.schema, format='parquet')
+        issued = self._ds.field('issue_date')
+        table = dataset.to_table(
+            columns=list(columns) if columns else None,
+            filter=(issued >= start) & (issued <= end),
+        )
+        return table.to_pylist()
+
+
+def get_circulation_archive_client() -> Optional[CirculationArchive]:
+    """
+    Create the archive from settings, or None if 'pyarrow' is not installed.
+    """
+    try:
+        return CirculationArchive(settings.CIRCULATION_ARCHIVE_DIR)
+    except ImportError:
+        logger.warning("The 'pyarrow' package is not installed; archived circulation history is unavailable")
+        return None
+
+
+# Create a global instance
+circulation_archive = None
+_archive_initialized = False
+
+
+def get_circulation_archive() -> Optional[CirculationArchive]:
+    """
+    Get or create the shared circulation archive (None without pyarrow)
+    """
+    global circulation_archive, _archive_initialized
+    if not _archive_initialized:
+        circulation_archive = get_circulation_archive_client()
+        _archive_initialized = True
+    return circulation_archive
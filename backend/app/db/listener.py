@@ -0,0 +1,212 @@
+"""
+Postgres LISTEN connection for change notifications.
+
+Migration 011's triggers NOTIFY the "cache_invalidation" channel on every
+change to books, categories, users and roles. Each worker holds one
+dedicated asyncpg connection listening on it (LISTEN needs a session of its
+own, so it is not taken from the pool) and hands the decoded payloads, in
+batches, to a handler that evicts cached entries:
+
+    listener = ChangeListener(dsn, "cache_invalidation", apply_changes, resync)
+    task = listener.start()
+
+Notifications sent while the connection is down are lost; `on_connect` is
+told whether it is reconnecting so it can drop whatever may have gone stale.
+The connection is pinged every CACHE_LISTEN_PING_INTERVAL seconds so a
+silently dropped one is noticed, and re-established with backoff.
+
+LISTEN does not work through a transaction-mode pooler (Supavisor on port
+6543); point CACHE_LISTEN_URL at a direct or session-mode connection.
+
+Requires the optional `asyncpg` package.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+import orjson
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Notification channel used by notify_cache_invalidation() (migration 011)
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Most notifications handed to the handler at once
+MAX_BATCH = 1000
+
+
+class ChangeListener:
+    """One LISTEN connection, reconnected on loss, feeding a batch handler."""
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        handler: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        on_connect: Optional[Callable[[bool], Awaitable[None]]] = None,
+        ping_interval: float = 30.0,
+    ):
+        import asyncpg
+
+        self._asyncpg = asyncpg
+        self.dsn = dsn
+        self.channel = channel
+        self._handler = handler
+        self._on_connect = on_connect
+        self.ping_interval = ping_interval
+        self.listening = False
+        self.error: Optional[str] = None
+        self.connected_at: Optional[float] = None
+        self.received = 0
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> asyncio.Task:
+        """Start listening (and dispatching) in the background."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._dispatch())]
+        return self._tasks[0]
+
+    def _notified(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            self._queue.put_nowait(orjson.loads(payload))
+            self.received += 1
+        except orjson.JSONDecodeError:
+            logger.warning(f"Ignoring malformed notification on '{channel}': {payload[:200]}")
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                connection = await self._asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.channel, self._notified)
+
+                self.listening = True
+                self.error = None
+                self.connected_at = time.monotonic()
+                delay = 1.0
+                logger.info(f"Listening for '{self.channel}' notifications")
+                if self._on_connect is not None:
+                    await self._on_connect(reconnecting)
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self.ping_interval)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval("SELECT 1", timeout=self.ping_interval)
+                raise ConnectionError("connection closed")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.listening or not reconnecting:
+                    logger.warning(f"'{self.channel}' listener disconnected, retrying in {delay:.0f}s: {str(e)}")
+                self.error = str(e)
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            reconnecting = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def _dispatch(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._handler(batch)
+            except Exception as e:
+                logger.warning(f"Handling {len(batch)} '{self.channel}' notifications failed: {str(e)}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "listening": self.listening,
+            "channel": self.channel,
+            "received": self.received,
+            "pending": self._queue.qsize(),
+            "error": self.error,
+            "connected_seconds": round(time.monotonic() - self.connected_at, 1)
+            if self.listening and self.connected_at else None,
+        }
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.listening = False
+
+
+def get_change_listener_client(
+    handler: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+    on_connect: Optional[Callable[[bool], Awaitable[None]]] = None,
+) -> Optional[ChangeListener]:
+    """
+    Create the cache invalidation listener from settings, or None if it is
+    disabled, no database URL is configured, or asyncpg is not installed.
+    """
+    dsn = settings.CACHE_LISTEN_URL or settings.DATABASE_URL
+    if not settings.CACHE_LISTEN_ENABLED or not dsn:
+        return None
+    try:
+        return ChangeListener(
+            dsn,
+            CACHE_INVALIDATION_CHANNEL,
+            handler,
+            on_connect=on_connect,
+            ping_interval=settings.CACHE_LISTEN_PING_INTERVAL,
+        )
+    except ImportError:
+        logger.warning("The 'asyncpg' package is not installed; cross-worker cache invalidation disabled")
+        return None
+
+
+# Create a global instance
+change_listener = None
+
+
+def start_change_listener(
+    handler: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+    on_connect: Optional[Callable[[bool], Awaitable[None]]] = None,
+) -> Optional[ChangeListener]:
+    """
+    Create and start the shared listener (None if not configured)
+    """
+    global change_listener
+    if change_listener is None:
+        change_listener = get_change_listener_client(handler, on_connect)
+        if change_listener is not None:
+            change_listener.start()
+    return change_listener
+
+
+def get_change_listener() -> Optional[ChangeListener]:
+    """
+    Get the shared listener, if one was started
+    """
+    return change_listener
+
+
+def change_listener_active() -> bool:
+    """Whether changes are arriving right now (caches may rely on eviction)."""
+    return change_listener is not None and change_listener.listening
+
+
+async def close_change_listener() -> None:
+    """
+    Stop the shared listener, if one was started
+    """
+    global change_listener
+    if change_listener is not None:
+        await change_listener.aclose()
+        change_listener = None
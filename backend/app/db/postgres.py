@@ -0,0 +1,185 @@
+"""
+Direct Postgres access (asyncpg connection pool) for hot paths.
+
+Everything goes through PostgREST (`get_supabase()`) by default. Paths named
+in DIRECT_DB_PATHS (e.g. "auth", "books.list") instead run their query on a
+pooled asyncpg connection, skipping the HTTP hop and PostgREST's per-request
+work. Services keep their interface and pick the backend per call:
+
+    db = direct_db("books.list")
+    if db is not None:
+        rows = await db.fetch("SELECT ... WHERE language = $1", filters.language)
+    else:
+        rows = self.supabase.table('books')...execute().data
+
+asyncpg prepares every statement it runs and keeps the prepared statements
+in a per-connection LRU (POSTGRES_STATEMENT_CACHE_SIZE), so repeated query
+shapes skip parsing and planning. Behind a transaction-mode pooler
+(Supavisor/PgBouncer on port 6543) set the cache size to 0.
+
+Requires the optional `asyncpg` package.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import logging
+
+import orjson
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def _init_connection(connection) -> None:
+    # Return json/jsonb columns (embedded relations, role permissions) as Python objects
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name,
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+            schema="pg_catalog",
+        )
+
+
+class PostgresPool:
+    """Lazily created asyncpg pool with query helpers and usage counters."""
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        statement_cache_size: int = 100,
+        command_timeout: float = 10.0,
+    ):
+        import asyncpg
+
+        self._asyncpg = asyncpg
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.command_timeout = command_timeout
+        self._pool = None
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+        self._queries = 0
+
+    async def _get_pool(self):
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    self._pool = await self._asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        statement_cache_size=self.statement_cache_size,
+                        command_timeout=self.command_timeout,
+                        init=_init_connection,
+                    )
+        return self._pool
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        """Hold one pooled connection (for transactions and COPY)."""
+        pool = await self._get_pool()
+        self._waiting += 1
+        try:
+            connection = await pool.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            yield connection
+        finally:
+            await pool.release(connection)
+
+    async def _run(self, method: str, query: str, *args: Any) -> Any:
+        async with self.connection() as connection:
+            self._queries += 1
+            return await getattr(connection, method)(query, *args)
+
+    async def fetch(self, query: str, *args: Any) -> List[Any]:
+        return await self._run("fetch", query, *args)
+
+    async def fetchrow(self, query: str, *args: Any) -> Optional[Any]:
+        return await self._run("fetchrow", query, *args)
+
+    async def fetchval(self, query: str, *args: Any) -> Any:
+        return await self._run("fetchval", query, *args)
+
+    async def execute(self, query: str, *args: Any) -> str:
+        return await self._run("execute", query, *args)
+
+    def stats(self) -> Dict[str, int]:
+        """Pool size and usage counters (for /health and metrics)."""
+        pool = self._pool
+        size = pool.get_size() if pool is not None else 0
+        idle = pool.get_idle_size() if pool is not None else 0
+        return {
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "waiting": self._waiting,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "queries": self._queries,
+        }
+
+    async def aclose(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def get_postgres_client() -> Optional[PostgresPool]:
+    """
+    Create a pool from settings, or None if DATABASE_URL is not configured.
+    """
+    if not settings.DATABASE_URL:
+        return None
+    try:
+        return PostgresPool(
+            settings.DATABASE_URL,
+            min_size=settings.POSTGRES_POOL_MIN_SIZE,
+            max_size=settings.POSTGRES_POOL_MAX_SIZE,
+            statement_cache_size=settings.POSTGRES_STATEMENT_CACHE_SIZE,
+            command_timeout=settings.POSTGRES_COMMAND_TIMEOUT,
+        )
+    except ImportError:
+        logger.warning("DATABASE_URL is set but the 'asyncpg' package is not installed; direct queries disabled")
+        return None
+
+
+# Create a global instance
+postgres_client = None
+_postgres_initialized = False
+
+
+def get_postgres() -> Optional[PostgresPool]:
+    """
+    Get or create the shared Postgres pool (None when not configured)
+    """
+    global postgres_client, _postgres_initialized
+    if not _postgres_initialized:
+        postgres_client = get_postgres_client()
+        _postgres_initialized = True
+    return postgres_client
+
+
+def direct_db(path: str) -> Optional[PostgresPool]:
+    """The pool if `path` is switched to direct Postgres (DIRECT_DB_PATHS), else None."""
+    if path not in settings.DIRECT_DB_PATHS:
+        return None
+    return get_postgres()
+
+
+async def close_postgres() -> None:
+    """
+    Close the shared Postgres pool, if one was created
+    """
+    global postgres_client, _postgres_initialized
+    if postgres_client is not None:
+        await postgres_client.aclose()
+    postgres_client = None
+    _postgres_initialized = False
@@ -0,0 +1,163 @@
+"""
+Redis client configuration (Upstash REST API or plain Redis protocol)
+"""
+from typing import Any, List, Optional, Sequence
+import logging
+
+import httpx
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisError(Exception):
+    """Raised when Redis rejects a command."""
+
+
+class RedisBackend:
+    """
+    Common command helpers shared by the REST and protocol clients.
+
+    Subclasses only implement `execute` (one command) and `pipeline`
+    (several commands in a single round trip).
+    """
+
+    async def execute(self, *command: Any) -> Any:
+        raise NotImplementedError
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> Any:
+        if ex:
+            return await self.execute("SET", key, value, "EX", int(ex))
+        return await self.execute("SET", key, value)
+
+    async def mget(self, *keys: str) -> List[Optional[str]]:
+        if not keys:
+            return []
+        return await self.execute("MGET", *keys)
+
+    async def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        return await self.execute("DEL", *keys)
+
+    async def incr(self, key: str) -> int:
+        return int(await self.execute("INCR", key))
+
+
+class UpstashRedis(RedisBackend):
+    """
+    Async client for the Upstash Redis REST API.
+
+    Commands are posted as JSON arrays (e.g. ["SET", "key", "value", "EX", 60])
+    and pipelines go to the /pipeline endpoint in one HTTP request.
+    """
+
+    def __init__(self, url: str, token: str, timeout: float = 2.0):
+        self._client = httpx.AsyncClient(
+            base_url=url.rstrip('/'),
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout,
+        )
+
+    @staticmethod
+    def _unwrap(item: dict) -> Any:
+        if 'error' in item:
+            raise RedisError(item['error'])
+        return item.get('result')
+
+    async def execute(self, *command: Any) -> Any:
+        response = await self._client.post("/", json=list(command))
+        return self._unwrap(response.json())
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        if not commands:
+            return []
+        response = await self._client.post("/pipeline", json=[list(c) for c in commands])
+        response.raise_for_status()
+        return [self._unwrap(item) for item in response.json()]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class ProtocolRedis(RedisBackend):
+    """
+    Client for any server speaking the Redis protocol (redis://, rediss://).
+
+    Requires the optional `redis` package; useful for self-hosted Redis and
+    for local stand-ins during development.
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+
+        self._client = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def execute(self, *command: Any) -> Any:
+        return await self._client.execute_command(*command)
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        if not commands:
+            return []
+        async with self._client.pipeline(transaction=False) as pipe:
+            for command in commands:
+                pipe.execute_command(*command)
+            return await pipe.execute()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def get_redis_client() -> Optional[RedisBackend]:
+    """
+    Create a Redis client from settings, or None if Redis is not configured.
+
+    Upstash REST credentials take precedence over REDIS_URL.
+    """
+    if settings.UPSTASH_REDIS_REST_URL and settings.UPSTASH_REDIS_REST_TOKEN:
+        return UpstashRedis(settings.UPSTASH_REDIS_REST_URL, settings.UPSTASH_REDIS_REST_TOKEN)
+
+    if settings.REDIS_URL:
+        try:
+            return ProtocolRedis(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("REDIS_URL is set but the 'redis' package is not installed; shared cache disabled")
+
+    return None
+
+
+# Create a global instance
+redis_client = None
+_redis_initialized = False
+
+
+def get_redis() -> Optional[RedisBackend]:
+    """
+    Get or create the shared Redis client (None when not configured)
+    """
+    global redis_client, _redis_initialized
+    if not _redis_initialized:
+        redis_client = get_redis_client()
+        _redis_initialized = True
+    return redis_client
+
+
+async def close_redis() -> None:
+    """
+    Close the shared Redis client, if one was created
+    """
+    global redis_client, _redis_initialized
+    if redis_client is not None:
+        await redis_client.aclose()
+    redis_client = None
+    _redis_initialized = False
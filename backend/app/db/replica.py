@@ -0,0 +1,234 @@
+"""
+Read-replica routing for reporting and analytics reads.
+
+Everything reads and writes the primary by default. Code that only reads,
+and can live with slightly old data, asks for a reader instead:
+
+    db = read_supabase()                 # replica Client, or the primary's
+    pool = read_db("circulation.stats")  # replica pool, primary pool, or None
+
+or, in an endpoint, `db: Client = Depends(get_read_db)`. Writes, and reads
+that must see a write just made (issue -> loan detail, profile edits), keep
+using get_supabase()/direct_db() and so never touch the replica.
+
+A replica serves reads only while its last check found it reachable and at
+most REPLICA_MAX_LAG seconds behind (migration 009's replication_lag());
+otherwise the primary does. Checks run in the background every
+REPLICA_CHECK_INTERVAL seconds, and a failed replica query marks it down
+until the next one. SUPABASE_REPLICA_URL (Supabase's per-replica API URL)
+routes PostgREST reads; DATABASE_REPLICA_URL routes direct-pool reads.
+
+To try it locally, point the replica settings at a second database loaded
+with the same schema (a server that is not in recovery reports zero lag).
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from supabase import Client, ClientOptions, create_client
+
+from ..core.config import settings
+from .postgres import PostgresPool, direct_db, get_postgres
+from .supabase_client import get_supabase, make_resilient
+
+logger = logging.getLogger(__name__)
+
+REPLICATION_LAG_SQL = "SELECT replication_lag()"
+
+
+class Replica:
+    """A read replica and the outcome of its last lag check."""
+
+    def __init__(self, name: str, client: Any, probe: Callable[[], Awaitable[Optional[float]]]):
+        self.name = name
+        self.client = client
+        self._probe = probe
+        self.available = False
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._check_task: Optional[asyncio.Task] = None
+
+    def usable(self, max_lag: Optional[float] = None) -> bool:
+        """Whether reads may go here; schedules a check if one is due."""
+        self._schedule_check()
+        if max_lag is None:
+            max_lag = settings.REPLICA_MAX_LAG
+        return self.available and self.lag is not None and self.lag <= max_lag
+
+    async def check(self) -> None:
+        """Measure replication lag now."""
+        try:
+            self.lag = await self._probe()
+            self.available = True
+            self.error = None
+        except Exception as e:
+            if self.available or self.checked_at is None:
+                logger.warning(f"Read replica '{self.name}' unavailable, reading from the primary: {str(e)}")
+            self.available = False
+            self.error = str(e)
+        self.checked_at = time.monotonic()
+
+    def mark_failed(self, error: Exception) -> None:
+        """Stop routing reads here until the next check succeeds."""
+        logger.warning(f"Read replica '{self.name}' query failed, reading from the primary: {str(error)}")
+        self.available = False
+        self.error = str(error)
+        self.checked_at = time.monotonic()
+
+    def _schedule_check(self) -> None:
+        due = self.checked_at is None or time.monotonic() - self.checked_at >= settings.REPLICA_CHECK_INTERVAL
+        if not due or (self._check_task is not None and not self._check_task.done()):
+            return
+        try:
+            self._check_task = asyncio.get_running_loop().create_task(self.check())
+        except RuntimeError:
+            # Called outside the event loop (threadpool); the next async caller schedules it
+            pass
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "lag": self.lag,
+            "max_lag": settings.REPLICA_MAX_LAG,
+            "error": self.error,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+        }
+
+
+def get_replica_supabase_client() -> Optional[Replica]:
+    """
+    PostgREST replica from SUPABASE_REPLICA_URL, or None if not configured.
+    """
+    if not settings.SUPABASE_REPLICA_URL:
+        return None
+    client: Client = make_resilient(
+        create_client(
+            settings.SUPABASE_REPLICA_URL,
+            settings.SUPABASE_SERVICE_KEY,
+            options=ClientOptions(postgrest_client_timeout=settings.SUPABASE_TIMEOUT),
+        ),
+        "supabase-replica",
+    )
+
+    async def probe() -> Optional[float]:
+        response = await run_in_threadpool(client.rpc('replication_lag').execute)
+        return response.data
+
+    return Replica("supabase", client, probe)
+
+
+def get_replica_postgres_client() -> Optional[Replica]:
+    """
+    Direct-pool replica from DATABASE_REPLICA_URL, or None if not configured.
+    """
+    if not settings.DATABASE_REPLICA_URL:
+        return None
+    try:
+        pool = PostgresPool(
+            settings.DATABASE_REPLICA_URL,
+            min_size=settings.POSTGRES_POOL_MIN_SIZE,
+            max_size=settings.POSTGRES_POOL_MAX_SIZE,
+            statement_cache_size=settings.POSTGRES_STATEMENT_CACHE_SIZE,
+            command_timeout=settings.POSTGRES_COMMAND_TIMEOUT,
+        )
+    except ImportError:
+        logger.warning("DATABASE_REPLICA_URL is set but the 'asyncpg' package is not installed; replica disabled")
+        return None
+
+    async def probe() -> Optional[float]:
+        return await pool.fetchval(REPLICATION_LAG_SQL)
+
+    return Replica("postgres", pool, probe)
+
+
+# Create global instances
+supabase_replica = None
+postgres_replica = None
+_replicas_initialized = False
+
+
+def get_replicas() -> Dict[str, Replica]:
+    """
+    Get or create the configured replicas, keyed by name
+    """
+    global supabase_replica, postgres_replica, _replicas_initialized
+    if not _replicas_initialized:
+        supabase_replica = get_replica_supabase_client()
+        postgres_replica = get_replica_postgres_client()
+        _replicas_initialized = True
+    return {replica.name: replica for replica in (supabase_replica, postgres_replica) if replica is not None}
+
+
+def read_supabase(max_lag: Optional[float] = None) -> Client:
+    """Client for a lag-tolerant read: the replica's when usable, else the primary's."""
+    replica = get_replicas().get("supabase")
+    if replica is not None and replica.usable(max_lag):
+        return replica.client
+    return get_supabase()
+
+
+def read_db(path: str, max_lag: Optional[float] = None) -> Optional[PostgresPool]:
+    """
+    Pool for a lag-tolerant read on a direct path (None if `path` uses PostgREST).
+
+    Paths not in DIRECT_DB_PATHS stay on PostgREST; use read_supabase() there.
+    """
+    if direct_db(path) is None:
+        return None
+    replica = get_replicas().get("postgres")
+    if replica is not None and replica.usable(max_lag):
+        return replica.client
+    return get_postgres()
+
+
+def replica_failed(client: Any, error: Exception) -> bool:
+    """
+    Report a failed read; True if `client` was a replica (retry on the primary).
+    """
+    for replica in get_replicas().values():
+        if replica.client is client:
+            replica.mark_failed(error)
+            return True
+    return False
+
+
+async def get_read_db() -> AsyncIterator[Client]:
+    """
+    Dependency for read-only endpoints that may be served by the replica.
+
+    Endpoints turn query errors into 500s; one raised while reading the
+    replica takes it out of rotation until its next successful check.
+    """
+    client = read_supabase()
+    try:
+        yield client
+    except Exception as e:
+        if not isinstance(e, HTTPException) or e.status_code >= 500:
+            replica_failed(client, e)
+        raise
+
+
+async def check_replicas() -> None:
+    """Check every configured replica now (at startup)."""
+    await asyncio.gather(*(replica.check() for replica in get_replicas().values()))
+
+
+def replica_status() -> Dict[str, Dict[str, Any]]:
+    """Lag and availability per configured replica (for /health)."""
+    return {name: replica.status() for name, replica in get_replicas().items()}
+
+
+async def close_replicas() -> None:
+    """
+    Close the replica pool, if one was created
+    """
+    global supabase_replica, postgres_replica, _replicas_initialized
+    if postgres_replica is not None:
+        await postgres_replica.client.aclose()
+    supabase_replica = None
+    postgres_replica = None
+    _replicas_initialized = False
@@ -1,8 +1,14 @@
 """
 Supabase client configuration
 """
-from supabase import create_client, Client
+from typing import TypeVar
+import httpx
+from postgrest.utils import SyncClient
+from supabase import create_client, Client, ClientOptions
 from ..core.config import settings
+from ..core.resilience import ResilientTransport, RetryBudget, get_circuit_breaker
+
+WriteBuilder = TypeVar("WriteBuilder")
 
 
 def get_supabase_client() -> Client:
@@ -14,9 +20,40 @@ def get_supabase_client() -> Client:
 
     supabase: Client = create_client(
         settings.SUPABASE_URL,
-        settings.SUPABASE_SERVICE_KEY  # Use service key for backend operations
+        settings.SUPABASE_SERVICE_KEY,  # Use service key for backend operations
+        options=ClientOptions(postgrest_client_timeout=settings.SUPABASE_TIMEOUT),
+    )
+    return make_resilient(supabase, "supabase")
+
+
+def make_resilient(client: Client, name: str) -> Client:
+    """
+    Route the client's PostgREST calls through a ResilientTransport
+    (deadlines, budgeted retries and the circuit breaker called `name`).
+    """
+    postgrest = client.postgrest
+    session = postgrest.session
+    postgrest.session = SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        follow_redirects=True,
+        transport=ResilientTransport(
+            httpx.HTTPTransport(http2=True),
+            breaker=get_circuit_breaker(
+                name,
+                failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+            ),
+            budget=RetryBudget(settings.SUPABASE_RETRY_BUDGET),
+            timeout=settings.SUPABASE_TIMEOUT,
+            deadline=settings.SUPABASE_DEADLINE,
+            retries=settings.SUPABASE_RETRIES,
+            backoff=settings.SUPABASE_RETRY_BACKOFF,
+        ),
     )
-    return supabase
+    session.close()
+    return client
 
 
 # Create a global instance
@@ -30,3 +67,18 @@ def get_supabase() -> Client:
     if supabase_client is None:
         supabase_client = get_supabase_client()
     return supabase_client
+
+
+def returning(builder: WriteBuilder, columns: str) -> WriteBuilder:
+    """
+    Make an insert/update/upsert return `columns` (embeds included).
+
+    PostgREST applies the `select` parameter to the representation of the
+    written rows, so the joined row comes back in the same round trip
+    instead of needing a follow-up read.
+
+    Usage:
+        returning(db.table('books').update(data).eq('id', book_id), '*, category:categories(*)')
+    """
+    builder.params = builder.params.set('select', ''.join(columns.split()))
+    return builder
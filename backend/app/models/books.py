@@ -1,7 +1,7 @@
 """
 Books and Categories models for library catalog management.
 """
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, date
 from uuid import UUID
@@ -84,6 +84,7 @@ class CategoryResponse(CategoryBase):
 class CategoryWithCount(CategoryResponse):
     """Category with book count."""
     book_count: int = 0
+    subtree_book_count: int = Field(0, description="Books in this category and its sub-categories")
 
 
 # =====================================================
@@ -247,6 +248,46 @@ class BookResponse(BookBase):
         from_attributes = True
 
 
+class PublicBookResponse(BaseModel):
+    """Book detail for the anonymous public catalogue (no acquisition or staff fields)."""
+    id: UUID
+    isbn: Optional[str] = None
+    title: str
+    title_ar: Optional[str] = None
+    subtitle: Optional[str] = None
+    subtitle_ar: Optional[str] = None
+    author: str
+    author_ar: Optional[str] = None
+    co_authors: Optional[str] = None
+    co_authors_ar: Optional[str] = None
+    publisher: Optional[str] = None
+    publisher_ar: Optional[str] = None
+    publication_year: Optional[int] = None
+    publication_place: Optional[str] = None
+    edition: Optional[str] = None
+    category_id: Optional[UUID] = None
+    dewey_decimal: Optional[str] = None
+    language: str
+    pages: Optional[int] = None
+    description: Optional[str] = None
+    description_ar: Optional[str] = None
+    table_of_contents: Optional[str] = None
+    table_of_contents_ar: Optional[str] = None
+    subjects: Optional[str] = None
+    subjects_ar: Optional[str] = None
+    keywords: Optional[str] = None
+    cover_image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    available_quantity: int
+    shelf_location: Optional[str] = None
+    status: BookStatus
+    category: Optional[CategoryResponse] = None
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class BookListItem(BaseModel):
     """Simplified book model for list views."""
     id: UUID
@@ -297,6 +338,7 @@ class BookFilters(BaseModel):
 
     # Category filter
     category_id: Optional[UUID] = None
+    include_subcategories: bool = Field(False, description="Also match books in sub-categories")
 
     # Status filters
     status: Optional[BookStatus] = None
@@ -332,10 +374,34 @@ class PaginationMeta(BaseModel):
     has_prev: bool
 
 
+class FacetCount(BaseModel):
+    """Number of matching books for one facet value."""
+    value: Optional[Union[int, str]] = None  # None groups books without a value
+    label: Optional[str] = None
+    count: int
+
+
+class BookFacets(BaseModel):
+    """Facet counts for a search; each facet ignores its own filter."""
+    total: int
+    category: List[FacetCount] = []
+    language: List[FacetCount] = []
+    status: List[FacetCount] = []
+    publication_year: List[FacetCount] = Field(
+        default=[], description="Counts per bucket of FACET_YEAR_BUCKET years, keyed by the first year"
+    )
+
+
 class BookListResponse(BaseModel):
     """Paginated book list response."""
     items: List[BookListItem]
     meta: PaginationMeta
+    did_you_mean: Optional[List[str]] = Field(
+        None, description="Spelling corrections when a search found nothing"
+    )
+    facets: Optional[BookFacets] = Field(
+        None, description="Facet counts (only when requested with facets=true)"
+    )
 
 
 class CategoryListResponse(BaseModel):
@@ -367,6 +433,60 @@ class BulkOperationResponse(BaseModel):
     errors: Optional[List[str]] = None
 
 
+class BookImportProgress(BaseModel):
+    """Progress of a catalogue import, reported after every batch."""
+    records_read: int = 0
+    imported: int = 0
+    updated: int = 0
+    invalid: int = 0
+    duplicates: int = Field(0, description="Repeated ISBN/barcode within the import")
+    existing: int = Field(0, description="Already in the catalogue (skipped)")
+    unresolved_categories: int = 0
+    batches: int = 0
+    resume_from: int = Field(0, description="Records safely loaded; pass as resume_from to continue")
+    done: bool = False
+    errors: List[str] = Field(default_factory=list, description="First IMPORT_MAX_ERRORS problems")
+
+
+# =====================================================
+# Availability Models
+# =====================================================
+
+class BookAvailabilityRequest(BaseModel):
+    """Batch availability request."""
+    book_ids: List[UUID] = Field(..., min_length=1, max_length=100)
+
+
+class BookAvailability(BaseModel):
+    """Compact availability entry for one book."""
+    status: BookStatus
+    available_quantity: int
+    is_available: bool
+
+
+class BookAvailabilityResponse(BaseModel):
+    """Availability keyed by book ID; unknown IDs are listed in `missing`."""
+    items: Dict[str, BookAvailability]
+    missing: List[UUID] = []
+
+
+# =====================================================
+# Suggestion Models
+# =====================================================
+
+class BookSuggestion(BaseModel):
+    """One typeahead suggestion: the matched field's text and a book it came from."""
+    book_id: UUID
+    field: str = Field(..., description="title, title_ar, author, author_ar or isbn")
+    text: str
+
+
+class BookSuggestResponse(BaseModel):
+    """Typeahead suggestions for a query prefix."""
+    query: str
+    items: List[BookSuggestion]
+
+
 # =====================================================
 # Statistics Models
 # =====================================================
@@ -104,6 +104,9 @@ class CirculationStatsResponse(BaseModel):
     average_borrow_duration: float  # in days
     most_borrowed_books: List[dict]  # [{"book_id": UUID, "title": str, "count": int}]
     most_active_users: List[dict]  # [{"user_id": UUID, "name": str, "count": int}]
+    # Fines, duration and rankings cover circulation_records only, not loans
+    # moved to the archive (returned and settled ones past the retention)
+    includes_archived: bool = False
 
 
 class CirculationSearchParams(BaseModel):
@@ -0,0 +1,25 @@
+"""
+Delta-sync models for offline clients (kiosks, mobile apps).
+"""
+from typing import List
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+from .books import CategoryResponse, PublicBookResponse
+
+
+class SyncPage(BaseModel):
+    """One page of a change feed."""
+    deleted: List[UUID] = Field(default_factory=list, description="IDs deleted since the cursor")
+    cursor: str = Field(..., description="Opaque cursor to pass as `since` on the next call")
+    has_more: bool = Field(..., description="More changes are available; call again with `cursor` straight away")
+
+
+class BookSyncPage(SyncPage):
+    """Books added or changed since the cursor (without the embedded category)."""
+    items: List[PublicBookResponse]
+
+
+class CategorySyncPage(SyncPage):
+    """Categories added or changed since the cursor."""
+    items: List[CategoryResponse]
@@ -1,10 +1,21 @@
 """
 Books service for managing library catalog (books and categories).
 """
-from typing import Optional, List, Dict, Any
+import asyncio
+from typing import Optional, List, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime, date, timedelta
-from app.db.supabase_client import get_supabase
+from starlette.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from app.db.supabase_client import get_supabase, returning
+from app.db.postgres import PostgresPool, direct_db
+from app.core.cache import cached, get_cache, invalidate_tags
+from app.core.config import settings
+from app.core.fields import model_columns
+from app.core.singleflight import get_singleflight
+from app.core.category_tree import CategoryTree
+from app.services.search_service import get_search_index
+from app.services.category_tree_service import get_category_tree
 from app.models.books import (
     CategoryCreate,
     CategoryUpdate,
@@ -23,9 +34,62 @@ from app.models.books import (
     BulkBookUpdate,
     BulkBookDelete,
     BulkOperationResponse,
+    BookAvailability,
+    BookFacets,
 )
 
 
+# Book detail representation: every column plus the embedded category
+BOOK_DETAIL_SELECT = '*, category:categories(*)'
+
+# List views only need the BookListItem columns (not descriptions, TOCs, ...)
+BOOK_LIST_COLUMNS = model_columns(BookListItem)
+
+# Columns matched by the free-text `search` filter
+BOOK_SEARCH_COLUMNS = ('title', 'title_ar', 'author', 'author_ar', 'isbn')
+
+# Whole-list validators: one pydantic-core call per page instead of per row
+_book_list_adapter = TypeAdapter(List[BookListItem])
+_category_list_adapter = TypeAdapter(List[CategoryWithCount])
+_availability_adapter = TypeAdapter(BookAvailability)
+
+
+# Version counter embedded in public catalogue cache keys
+CATALOG_VERSION = "catalog"
+
+
+def book_cache_tag(book_id: Any) -> str:
+    """Cache tag carried by every cached entry derived from one book."""
+    return f"book:{book_id}"
+
+
+async def invalidate_catalog(*tags: str) -> None:
+    """Evict tagged entries and bump the public catalogue version."""
+    await invalidate_tags(*tags)
+    await get_cache().bump_version(CATALOG_VERSION)
+
+
+async def invalidate_books(*book_ids: Any) -> None:
+    """Evict cached data derived from the books table after a write."""
+    await invalidate_catalog("books", *(book_cache_tag(book_id) for book_id in book_ids))
+
+
+async def invalidate_categories() -> None:
+    """Evict cached category data and reload category trees after a write."""
+    await invalidate_catalog("categories")
+    await get_category_tree().invalidate()
+
+
+def _facet_key(filters: BookFilters) -> str:
+    """Cache key for facet counts: the filters, minus sorting and pagination."""
+    params = filters.model_dump(
+        mode="json",
+        exclude={'sort_by', 'sort_order', 'page', 'page_size'},
+        exclude_none=True
+    )
+    return ",".join(f"{name}={value}" for name, value in sorted(params.items()))
+
+
 class BooksService:
     """Service for managing books and categories."""
 
@@ -33,16 +97,25 @@ class BooksService:
         """Initialize the books service."""
         self.supabase = get_supabase()
 
+    async def _invalidate_books(self, *book_ids: Any) -> None:
+        """Evict cached data derived from the books table after a write."""
+        await invalidate_books(*book_ids)
+
     # =====================================================
     # Category Operations
     # =====================================================
 
+    @cached(
+        "categories",
+        tags=lambda include_counts: ["categories", "books"] if include_counts else ["categories"]
+    )
     async def get_categories(self, include_counts: bool = False) -> CategoryListResponse:
         """
         Get all categories.
 
         Args:
             include_counts: Whether to include book counts for each category
+                (direct and including sub-categories)
 
         Returns:
             CategoryListResponse with list of categories
@@ -56,32 +129,22 @@ class BooksService:
                 .order('name')\
                 .execute()
 
-            categories = [CategoryResponse(**cat) for cat in response.data]
+            categories = response.data
 
+            counts: Dict[str, int] = {}
+            subtree_counts: Dict[str, int] = {}
             if include_counts:
-                # Get book counts for each category
-                categories_with_counts = []
-                for cat in categories:
-                    count_response = self.supabase.table('books')\
-                        .select('id', count='exact')\
-                        .eq('category_id', str(cat.id))\
-                        .execute()
+                # One grouped query for all categories, then subtree sums in memory
+                count_response = self.supabase.rpc('category_book_counts', {}).execute()
+                counts = {row['category_id']: row['book_count'] for row in count_response.data}
+                subtree_counts = CategoryTree.build(categories).subtree_totals(counts)
 
-                    cat_dict = cat.model_dump()
-                    cat_dict['book_count'] = count_response.count or 0
-                    categories_with_counts.append(CategoryWithCount(**cat_dict))
+            for cat in categories:
+                cat['book_count'] = counts.get(cat['id'], 0)
+                cat['subtree_book_count'] = subtree_counts.get(cat['id'], 0)
 
-                return CategoryListResponse(
-                    items=categories_with_counts,
-                    total=len(categories_with_counts)
-                )
-            else:
-                # Convert to CategoryWithCount with 0 count
-                items = [CategoryWithCount(**cat.model_dump(), book_count=0) for cat in categories]
-                return CategoryListResponse(
-                    items=items,
-                    total=len(items)
-                )
+            items = _category_list_adapter.validate_python(categories)
+            return CategoryListResponse.model_construct(items=items, total=len(items))
 
         except Exception as e:
             raise Exception(f"Failed to fetch categories: {str(e)}")
@@ -137,6 +200,7 @@ class BooksService:
                 .execute()
 
             if response.data and len(response.data) > 0:
+                await invalidate_categories()
                 return CategoryResponse(**response.data[0])
             else:
                 raise Exception("No data returned from insert")
@@ -180,6 +244,7 @@ class BooksService:
                 .execute()
 
             if response.data and len(response.data) > 0:
+                await invalidate_categories()
                 return CategoryResponse(**response.data[0])
             return None
 
@@ -218,6 +283,7 @@ class BooksService:
                 .eq('id', str(category_id))\
                 .execute()
 
+            await invalidate_categories()
             return True
 
         except Exception as e:
@@ -227,75 +293,52 @@ class BooksService:
     # Book Operations
     # =====================================================
 
-    async def get_books(self, filters: BookFilters) -> BookListResponse:
+    async def get_books(
+        self,
+        filters: BookFilters,
+        fields: Optional[List[str]] = None,
+        facets: bool = False
+    ) -> BookListResponse:
         """
         Get books with filtering, sorting, and pagination.
 
         Args:
             filters: BookFilters object with query parameters
+            fields: Optional subset of BookListItem fields to select; items
+                are then partially populated (see app.core.fields)
+            facets: Also return facet counts; the page and the counts are
+                fetched concurrently and the facet total replaces count='exact'
 
         Returns:
-            BookListResponse with paginated results
+            BookListResponse with paginated results (plus `did_you_mean`
+            suggestions when a search matched nothing)
 
         Raises:
             Exception: If failed to fetch books
         """
         try:
-            # Start building the query
-            query = self.supabase.table('books').select('*', count='exact')
-
-            # Apply filters
-            if filters.search:
-                # Search in title, author, and ISBN
-                # Note: Supabase doesn't support OR directly, so we'll do multiple queries
-                search_term = f"%{filters.search}%"
-                query = query.or_(
-                    f"title.ilike.{search_term},"
-                    f"title_ar.ilike.{search_term},"
-                    f"author.ilike.{search_term},"
-                    f"author_ar.ilike.{search_term},"
-                    f"isbn.ilike.{search_term}"
-                )
-
-            if filters.category_id:
-                query = query.eq('category_id', str(filters.category_id))
-
-            if filters.status:
-                query = query.eq('status', filters.status.value)
-
-            if filters.available_only:
-                query = query.gt('available_quantity', 0)
-
-            if filters.language:
-                query = query.eq('language', filters.language)
+            columns = fields or BOOK_LIST_COLUMNS
+            category_ids = await self._category_filter(filters)
 
-            if filters.year_from:
-                query = query.gte('publication_year', filters.year_from)
-
-            if filters.year_to:
-                query = query.lte('publication_year', filters.year_to)
-
-            if filters.acquired_from:
-                query = query.gte('acquisition_date', filters.acquired_from.isoformat())
-
-            if filters.acquired_to:
-                query = query.lte('acquisition_date', filters.acquired_to.isoformat())
-
-            # Apply sorting
-            order_column = filters.sort_by.value
-            ascending = filters.sort_order.value == 'asc'
-            query = query.order(order_column, desc=not ascending)
-
-            # Calculate pagination
-            offset = (filters.page - 1) * filters.page_size
-            query = query.range(offset, offset + filters.page_size - 1)
+            db = direct_db("books.list")
+            if db is not None:
+                select_page = self._select_books_direct(db, filters, columns, category_ids, count=not facets)
+            else:
+                select_page = run_in_threadpool(self._select_books, filters, columns, category_ids, not facets)
 
-            # Execute query
-            response = query.execute()
+            book_facets = None
+            if facets:
+                # The facet total replaces the page query's count
+                (rows, _), book_facets = await asyncio.gather(select_page, self.get_facets(filters))
+                total = book_facets.total
+            else:
+                rows, total = await select_page
 
             # Build response
-            items = [BookListItem(**book) for book in response.data]
-            total = response.count or 0
+            if fields:
+                items = [BookListItem.model_construct(**book) for book in rows]
+            else:
+                items = _book_list_adapter.validate_python(rows)
             total_pages = (total + filters.page_size - 1) // filters.page_size
 
             meta = PaginationMeta(
@@ -307,17 +350,214 @@ class BooksService:
                 has_prev=filters.page > 1
             )
 
-            return BookListResponse(items=items, meta=meta)
+            extra = {}
+            if book_facets is not None:
+                extra['facets'] = book_facets
+            if total == 0 and filters.search:
+                # Usually a typo: offer corrections from the in-memory vocabulary
+                # so the user does not retry blind (each retry is another scan)
+                did_you_mean = get_search_index().did_you_mean(filters.search)
+                if did_you_mean:
+                    extra['did_you_mean'] = did_you_mean
+
+            return BookListResponse.model_construct(items=items, meta=meta, **extra)
 
         except Exception as e:
             raise Exception(f"Failed to fetch books: {str(e)}")
 
-    async def get_book_by_id(self, book_id: UUID) -> Optional[BookResponse]:
+    def _select_books(
+        self,
+        filters: BookFilters,
+        columns: List[str],
+        category_ids: Optional[List[str]],
+        count: bool
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Fetch one page of books through PostgREST (blocking); total is 0 unless `count`."""
+        # Start building the query
+        query = self.supabase.table('books').select(
+            ','.join(columns),
+            count='exact' if count else None
+        )
+
+        # Apply filters
+        if filters.search:
+            # Search in title, author, and ISBN
+            search_term = f"%{filters.search}%"
+            query = query.or_(
+                ",".join(f"{column}.ilike.{search_term}" for column in BOOK_SEARCH_COLUMNS)
+            )
+
+        if category_ids:
+            query = query.in_('category_id', category_ids)
+
+        if filters.status:
+            query = query.eq('status', filters.status.value)
+
+        if filters.available_only:
+            query = query.gt('available_quantity', 0)
+
+        if filters.language:
+            query = query.eq('language', filters.language)
+
+        if filters.year_from:
+            query = query.gte('publication_year', filters.year_from)
+
+        if filters.year_to:
+            query = query.lte('publication_year', filters.year_to)
+
+        if filters.acquired_from:
+            query = query.gte('acquisition_date', filters.acquired_from.isoformat())
+
+        if filters.acquired_to:
+            query = query.lte('acquisition_date', filters.acquired_to.isoformat())
+
+        # Apply sorting
+        order_column = filters.sort_by.value
+        ascending = filters.sort_order.value == 'asc'
+        query = query.order(order_column, desc=not ascending)
+
+        # Calculate pagination
+        offset = (filters.page - 1) * filters.page_size
+        query = query.range(offset, offset + filters.page_size - 1)
+
+        response = query.execute()
+        return response.data, response.count or 0
+
+    async def _select_books_direct(
+        self,
+        db: PostgresPool,
+        filters: BookFilters,
+        columns: List[str],
+        category_ids: Optional[List[str]],
+        count: bool
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch one page of books over the direct Postgres pool.
+
+        Same filters and order as _select_books. The total comes from a
+        window count in the same statement; the SQL text depends only on
+        which filters are set, so each shape is prepared once per connection.
+        """
+        conditions: List[str] = []
+        args: List[Any] = []
+
+        def arg(value: Any) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        if filters.search:
+            term = arg(f"%{filters.search}%")
+            conditions.append("(" + " OR ".join(f"{column} ILIKE {term}" for column in BOOK_SEARCH_COLUMNS) + ")")
+        if category_ids:
+            conditions.append(f"category_id = ANY({arg(category_ids)}::uuid[])")
+        if filters.status:
+            conditions.append(f"status = {arg(filters.status.value)}")
+        if filters.available_only:
+            conditions.append("available_quantity > 0")
+        if filters.language:
+            conditions.append(f"language = {arg(filters.language)}")
+        if filters.year_from:
+            conditions.append(f"publication_year >= {arg(filters.year_from)}")
+        if filters.year_to:
+            conditions.append(f"publication_year <= {arg(filters.year_to)}")
+        if filters.acquired_from:
+            conditions.append(f"acquisition_date >= {arg(filters.acquired_from)}")
+        if filters.acquired_to:
+            conditions.append(f"acquisition_date <= {arg(filters.acquired_to)}")
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        filter_args = list(args)
+        direction = "ASC" if filters.sort_order.value == 'asc' else "DESC"
+        # Columns are model_columns() or the requested `fields=` checked
+        # against them; the sort column is a BookSortField value
+        select_list = ", ".join(columns) + (", count(*) OVER () AS _total" if count else "")
+        offset = (filters.page - 1) * filters.page_size
+        rows = await db.fetch(
+            f"SELECT {select_list} FROM books{where} "
+            f"ORDER BY {filters.sort_by.value} {direction} "
+            f"LIMIT {arg(filters.page_size)} OFFSET {arg(offset)}",
+            *args
+        )
+
+        books = [dict(row) for row in rows]
+        total = 0
+        if count:
+            if books:
+                total = books[0]['_total']
+                for book in books:
+                    del book['_total']
+            elif offset:
+                # Past the last page: the window count had no row to ride on
+                total = await db.fetchval(f"SELECT count(*) FROM books{where}", *filter_args)
+        return books, total
+
+    async def _category_filter(self, filters: BookFilters) -> Optional[List[str]]:
+        """Category ids a book may have to match `filters` (None if unfiltered)."""
+        if not filters.category_id:
+            return None
+        if not filters.include_subcategories:
+            return [str(filters.category_id)]
+        tree = await get_category_tree().get()
+        return tree.subtree(filters.category_id)
+
+    @cached(
+        "book_facets",
+        ttl=settings.FACET_CACHE_TTL,
+        key=lambda filters: _facet_key(filters),
+        # Category labels are part of the result
+        tags=lambda filters: ["books", "categories"]
+    )
+    async def get_facets(self, filters: BookFilters) -> BookFacets:
+        """
+        Get facet counts for a book search in one aggregate query.
+
+        Each facet (category, language, status, publication-year bucket)
+        applies every active filter except its own. Sorting and pagination
+        are ignored.
+
+        Args:
+            filters: BookFilters object with query parameters
+
+        Returns:
+            BookFacets with the total and per-value counts
+
+        Raises:
+            Exception: If failed to compute facets
+        """
+        try:
+            params = {
+                'p_search': filters.search,
+                'p_category_ids': await self._category_filter(filters),
+                'p_status': filters.status.value if filters.status else None,
+                'p_available_only': filters.available_only,
+                'p_language': filters.language,
+                'p_year_from': filters.year_from,
+                'p_year_to': filters.year_to,
+                'p_acquired_from': filters.acquired_from.isoformat() if filters.acquired_from else None,
+                'p_acquired_to': filters.acquired_to.isoformat() if filters.acquired_to else None,
+                'p_year_bucket': settings.FACET_YEAR_BUCKET,
+            }
+            response = await run_in_threadpool(self.supabase.rpc('book_facets', params).execute)
+            return BookFacets.model_validate(response.data)
+
+        except Exception as e:
+            raise Exception(f"Failed to compute facets: {str(e)}")
+
+    async def get_book_by_id(
+        self,
+        book_id: UUID,
+        consistent: bool = False
+    ) -> Optional[BookResponse]:
         """
         Get a specific book by ID with category information.
 
+        Reads are served from the book detail cache unless `consistent` is
+        set; entries are evicted by every write path touching the book.
+
         Args:
             book_id: The book's UUID
+            consistent: Bypass the cache and read the current row (use for
+                read-modify-write and post-write reads)
 
         Returns:
             BookResponse or None if not found
@@ -325,21 +565,41 @@ class BooksService:
         Raises:
             Exception: If failed to fetch book
         """
+        if consistent:
+            return await self._fetch_book(book_id)
+        return await self._get_cached_book(book_id)
+
+    @cached(
+        "book",
+        ttl=settings.BOOK_CACHE_TTL,
+        key=lambda book_id: str(book_id),
+        # The embedded category goes stale when any category changes
+        tags=lambda book_id: [book_cache_tag(book_id), "categories"]
+    )
+    async def _get_cached_book(self, book_id: UUID) -> Optional[BookResponse]:
+        """Cache-aside wrapper around _fetch_book."""
+        return await self._fetch_book(book_id)
+
+    @staticmethod
+    def _to_book_response(book_data: Dict[str, Any]) -> BookResponse:
+        """Build a BookResponse from a row selected with BOOK_DETAIL_SELECT."""
+        # Extract category if exists
+        category_data = book_data.pop('category', None)
+        if category_data:
+            book_data['category'] = CategoryResponse(**category_data)
+
+        return BookResponse(**book_data)
+
+    async def _fetch_book(self, book_id: UUID) -> Optional[BookResponse]:
+        """Load a book with its category from the database."""
         try:
             response = self.supabase.table('books')\
-                .select('*, category:categories(*)')\
+                .select(BOOK_DETAIL_SELECT)\
                 .eq('id', str(book_id))\
                 .execute()
 
             if response.data and len(response.data) > 0:
-                book_data = response.data[0]
-
-                # Extract category if exists
-                category_data = book_data.pop('category', None)
-                if category_data:
-                    book_data['category'] = CategoryResponse(**category_data)
-
-                return BookResponse(**book_data)
+                return self._to_book_response(response.data[0])
             return None
 
         except Exception as e:
@@ -377,13 +637,16 @@ class BooksService:
             if 'status' in book_data and isinstance(book_data['status'], BookStatus):
                 book_data['status'] = book_data['status'].value
 
-            response = self.supabase.table('books')\
-                .insert(book_data)\
-                .execute()
+            # Insert and read back the joined row in one round trip
+            response = returning(
+                self.supabase.table('books').insert(book_data),
+                BOOK_DETAIL_SELECT
+            ).execute()
 
             if response.data and len(response.data) > 0:
-                book_id = response.data[0]['id']
-                return await self.get_book_by_id(UUID(book_id))
+                await self._invalidate_books()
+                get_search_index().add_books(response.data)
+                return self._to_book_response(response.data[0])
             else:
                 raise Exception("No data returned from insert")
 
@@ -432,13 +695,15 @@ class BooksService:
             if 'status' in update_data and isinstance(update_data['status'], BookStatus):
                 update_data['status'] = update_data['status'].value
 
-            response = self.supabase.table('books')\
-                .update(update_data)\
-                .eq('id', str(book_id))\
-                .execute()
+            response = returning(
+                self.supabase.table('books').update(update_data).eq('id', str(book_id)),
+                BOOK_DETAIL_SELECT
+            ).execute()
 
             if response.data and len(response.data) > 0:
-                return await self.get_book_by_id(book_id)
+                await self._invalidate_books(book_id)
+                get_search_index().add_books(response.data)
+                return self._to_book_response(response.data[0])
             return None
 
         except Exception as e:
@@ -465,6 +730,8 @@ class BooksService:
                 .eq('id', str(book_id))\
                 .execute()
 
+            await self._invalidate_books(book_id)
+            get_search_index().remove_books([book_id])
             return True
 
         except Exception as e:
@@ -496,7 +763,7 @@ class BooksService:
         """
         try:
             # Get current book
-            book = await self.get_book_by_id(book_id)
+            book = await self.get_book_by_id(book_id, consistent=True)
             if not book:
                 return None
 
@@ -514,25 +781,32 @@ class BooksService:
                     raise Exception("Available quantity cannot exceed total quantity")
                 update_data['available_quantity'] = new_available
 
-            response = self.supabase.table('books')\
-                .update(update_data)\
-                .eq('id', str(book_id))\
-                .execute()
+            response = returning(
+                self.supabase.table('books').update(update_data).eq('id', str(book_id)),
+                BOOK_DETAIL_SELECT
+            ).execute()
 
             if response.data and len(response.data) > 0:
-                return await self.get_book_by_id(book_id)
+                await self._invalidate_books(book_id)
+                return self._to_book_response(response.data[0])
             return None
 
         except Exception as e:
             raise Exception(f"Failed to update quantity: {str(e)}")
 
-    async def check_availability(self, book_id: UUID, required_quantity: int = 1) -> bool:
+    async def check_availability(
+        self,
+        book_id: UUID,
+        required_quantity: int = 1,
+        consistent: bool = False
+    ) -> bool:
         """
         Check if a book is available in required quantity.
 
         Args:
             book_id: The book's UUID
             required_quantity: Required number of copies
+            consistent: Read the current row instead of the cached detail
 
         Returns:
             True if available, False otherwise
@@ -541,7 +815,7 @@ class BooksService:
             Exception: If failed to check availability
         """
         try:
-            book = await self.get_book_by_id(book_id)
+            book = await self.get_book_by_id(book_id, consistent=consistent)
             if not book:
                 return False
 
@@ -553,6 +827,53 @@ class BooksService:
         except Exception as e:
             raise Exception(f"Failed to check availability: {str(e)}")
 
+    async def get_availability(self, book_ids: List[UUID]) -> Dict[str, BookAvailability]:
+        """
+        Get availability for many books at once.
+
+        Cached entries (short TTL, evicted with the book's cache tag) are
+        served first; all misses are loaded with a single projected query.
+
+        Args:
+            book_ids: Book UUIDs to check
+
+        Returns:
+            Mapping of book ID to BookAvailability (unknown IDs are omitted)
+
+        Raises:
+            Exception: If failed to check availability
+        """
+        try:
+            return await get_cache().get_many(
+                "availability",
+                [str(book_id) for book_id in book_ids],
+                self._load_availability,
+                adapter=_availability_adapter,
+                ttl=settings.AVAILABILITY_CACHE_TTL,
+                tags=lambda book_id: [book_cache_tag(book_id)]
+            )
+        except Exception as e:
+            raise Exception(f"Failed to check availability: {str(e)}")
+
+    async def _load_availability(self, book_ids: List[str]) -> Dict[str, BookAvailability]:
+        """Load availability for the given IDs with one projected query."""
+        response = self.supabase.table('books')\
+            .select('id, status, available_quantity')\
+            .in_('id', book_ids)\
+            .execute()
+
+        return {
+            row['id']: BookAvailability(
+                status=row['status'],
+                available_quantity=row['available_quantity'] or 0,
+                is_available=(
+                    row['status'] == BookStatus.AVAILABLE.value and
+                    (row['available_quantity'] or 0) > 0
+                )
+            )
+            for row in response.data
+        }
+
     # =====================================================
     # Bulk Operations
     # =====================================================
@@ -593,6 +914,7 @@ class BooksService:
             # Update books one by one (Supabase doesn't support bulk updates with IN clause)
             affected_count = 0
             errors = []
+            updated_rows = []
 
             for book_id in bulk_update.book_ids:
                 try:
@@ -603,9 +925,14 @@ class BooksService:
 
                     if response.data and len(response.data) > 0:
                         affected_count += 1
+                        updated_rows.extend(response.data)
                 except Exception as e:
                     errors.append(f"Book {book_id}: {str(e)}")
 
+            if affected_count:
+                await self._invalidate_books(*bulk_update.book_ids)
+                get_search_index().add_books(updated_rows)
+
             return BulkOperationResponse(
                 success=len(errors) == 0,
                 affected_count=affected_count,
@@ -643,6 +970,10 @@ class BooksService:
                 except Exception as e:
                     errors.append(f"Book {book_id}: {str(e)}")
 
+            if affected_count:
+                await self._invalidate_books(*bulk_delete.book_ids)
+                get_search_index().remove_books(bulk_delete.book_ids)
+
             return BulkOperationResponse(
                 success=len(errors) == 0,
                 affected_count=affected_count,
@@ -661,15 +992,28 @@ class BooksService:
         """
         Get book statistics.
 
+        Concurrent callers share one computation, which runs in the
+        threadpool so the blocking queries do not stall the event loop.
+
         Returns:
             BookStatistics object
 
         Raises:
             Exception: If failed to fetch statistics
         """
+        return await get_singleflight("stats").do(
+            "books:statistics",
+            lambda: run_in_threadpool(self._compute_statistics),
+            timeout=settings.SINGLEFLIGHT_TIMEOUT,
+        )
+
+    def _compute_statistics(self) -> BookStatistics:
+        """Compute book statistics (blocking)."""
         try:
             # Get total books and copies
-            all_books = self.supabase.table('books').select('*').execute()
+            all_books = self.supabase.table('books')\
+                .select('quantity, available_quantity, status, category_id, language')\
+                .execute()
             books_data = all_books.data
 
             total_books = len(books_data)
@@ -0,0 +1,127 @@
+"""
+Cross-worker cache invalidation driven by database change notifications.
+
+A write made by one worker evicts that worker's L1 entries and the shared
+Redis tier, but every other worker keeps its L1 copy for up to
+CACHE_L1_TTL seconds. Writes made outside the API (scripts, the Supabase
+dashboard) evict nothing at all. Migrations 011 and 012 make Postgres
+announce every change to books, categories, users, roles and
+circulation records; each worker's listener (app.db.listener) passes them
+here and the matching entries are evicted everywhere within milliseconds
+of the commit. Loan changes also feed the live circulation events.
+
+Each worker evicts only its own copies: its L1 entries, its memoized
+version counters and its category tree. The shared tier (Redis tag sets
+and the version counters behind catalogue keys and ETags) is cleared once
+per writing transaction, by the worker that claims the transaction's id
+(SET NX), so N workers do not repeat the same deletes and bumps.
+"""
+from typing import Any, Dict, Iterable, List, Set, Tuple
+import logging
+
+from app.core.cache import get_cache, invalidate_tags
+from app.core.dependencies import AUTH_USERS_TAG, user_cache_tag
+from app.db.listener import start_change_listener
+from app.services.books_service import CATALOG_VERSION, book_cache_tag, invalidate_books, invalidate_categories
+from app.services.category_tree_service import CATEGORY_TREE_VERSION, get_category_tree
+from app.services.circulation_feed_service import get_circulation_feed
+from app.services.search_service import get_search_index
+
+logger = logging.getLogger(__name__)
+
+# Seconds a worker's claim on a transaction's shared evictions is kept
+CLAIM_TTL = 60
+
+
+def _evictions(changes: Iterable[Dict[str, Any]]) -> Tuple[Set[str], Set[str]]:
+    """Cache tags and version counters made stale by the changed rows."""
+    tags: Set[str] = set()
+    versions: Set[str] = set()
+    for change in changes:
+        table, row_id = change.get('table'), str(change.get('id'))
+        if table == 'books':
+            tags.update(('books', book_cache_tag(row_id)))
+            versions.add(CATALOG_VERSION)
+        elif table == 'categories':
+            tags.add('categories')
+            versions.update((CATALOG_VERSION, CATEGORY_TREE_VERSION))
+        elif table == 'users':
+            tags.add(user_cache_tag(row_id))
+        elif table == 'roles':
+            tags.add(AUTH_USERS_TAG)
+        elif table == 'circulation_records':
+            # Loans drive the availability shown with each book
+            tags.update(book_cache_tag(row['book_id']) for row in (change.get('old'), change.get('new')) if row)
+    return tags, versions
+
+
+async def _claim(changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    The changes whose shared evictions fall to this worker: those of the
+    transactions it claims first. All of them without Redis (versions are
+    then per worker) or when the claim fails; payloads without a txid
+    (triggers older than it) are handled by every worker.
+    """
+    cache = get_cache()
+    if cache.redis is None:
+        return changes
+    txids = sorted({str(change['txid']) for change in changes if change.get('txid') is not None})
+    try:
+        replies = await cache.redis.pipeline([
+            ["SET", f"{cache.prefix}:invalidation:{txid}", "1", "NX", "EX", CLAIM_TTL] for txid in txids
+        ])
+    except Exception as e:
+        logger.warning(f"Invalidation claim failed, evicting the shared tier here: {str(e)}")
+        return changes
+    won = {txid for txid, reply in zip(txids, replies) if reply is not None}
+    return [change for change in changes if change.get('txid') is None or str(change['txid']) in won]
+
+
+async def apply_changes(changes: List[Dict[str, Any]]) -> None:
+    """Evict cached data derived from the changed rows (one batch of notifications)."""
+    tables: Set[str] = set()
+    for change in changes:
+        tables.add(change.get('table'))
+        if change.get('table') == 'circulation_records':
+            get_circulation_feed().publish(change['op'], change.get('old'), change.get('new'))
+
+    if 'books' in tables:
+        get_search_index().mark_stale()
+    if 'categories' in tables:
+        get_category_tree().reset()
+
+    # This worker's copies, on every worker
+    cache = get_cache()
+    tags, versions = _evictions(changes)
+    cache.evict_local(*tags)
+    for name in versions:
+        cache.forget_version(name)
+
+    # The shared tier, once per transaction (versions first: catalogue keys embed them)
+    shared_tags, shared_versions = _evictions(await _claim(changes))
+    for name in shared_versions:
+        await cache.bump_version(name)
+    await cache.invalidate_shared(*shared_tags)
+
+    logger.debug(f"Evicted cached entries for {len(changes)} changes to {', '.join(sorted(map(str, tables)))}")
+
+
+async def resync(reconnected: bool) -> None:
+    """
+    Drop what may have changed while no notifications were arriving.
+
+    Users are only cached while the listener is connected, so their entries
+    are cleared on every connect. After a reconnect this worker's L1 is
+    cleared and the catalogue evicted as well.
+    """
+    await invalidate_tags(AUTH_USERS_TAG)
+    if reconnected:
+        get_cache().clear_local()
+        await invalidate_books()
+        await invalidate_categories()
+        get_search_index().mark_stale()
+
+
+def start_cache_invalidation() -> None:
+    """Start this worker's listener (no-op unless DATABASE_URL/CACHE_LISTEN_URL is set)."""
+    start_change_listener(apply_changes, on_connect=resync)
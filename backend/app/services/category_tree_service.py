@@ -0,0 +1,69 @@
+"""
+Category hierarchy held in process memory.
+
+The categories table is small and rarely written, so each worker keeps a
+CategoryTree of it and reloads it only when the shared "category_tree"
+version counter moves. BooksService bumps the counter on every category
+create, update and delete; other workers notice within CACHE_VERSION_TTL
+seconds (the version is memoized in the L1 cache for that long).
+"""
+from typing import Optional
+import asyncio
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import get_cache
+from app.core.category_tree import CategoryTree
+from app.db.supabase_client import get_supabase
+
+# Version counter bumped by category writes
+CATEGORY_TREE_VERSION = "category_tree"
+
+
+class CategoryTreeCache:
+    """Per-process CategoryTree, reloaded when the category version changes."""
+
+    def __init__(self):
+        self.tree: Optional[CategoryTree] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> CategoryTree:
+        """The current tree, loading it on first use or after a category write."""
+        version = await get_cache().get_version(CATEGORY_TREE_VERSION)
+        if self.tree is not None and self.tree.version == version:
+            return self.tree
+
+        async with self._lock:
+            if self.tree is None or self.tree.version != version:
+                self.tree = await self._load(version)
+            return self.tree
+
+    async def invalidate(self) -> None:
+        """Drop this worker's tree and tell the others to reload theirs."""
+        self.reset()
+        await get_cache().bump_version(CATEGORY_TREE_VERSION)
+
+    def reset(self) -> None:
+        """Drop this worker's tree; the next get() reloads it."""
+        self.tree = None
+
+    async def _load(self, version: int) -> CategoryTree:
+        try:
+            response = await run_in_threadpool(
+                get_supabase().table('categories').select('id,parent_id').execute
+            )
+            return CategoryTree.build(response.data, version=version)
+
+        except Exception as e:
+            raise Exception(f"Failed to load category tree: {str(e)}")
+
+
+_category_tree: Optional[CategoryTreeCache] = None
+
+
+def get_category_tree() -> CategoryTreeCache:
+    """Process-wide category tree cache."""
+    global _category_tree
+    if _category_tree is None:
+        _category_tree = CategoryTreeCache()
+    return _category_tree
@@ -0,0 +1,207 @@
+"""
+Live circulation feed for staff dashboards (GET /circulation/events).
+
+Every issue, return, renewal, fine payment and deletion becomes an event
+carrying the loan and the change it makes to the circulation counters
+(active_issues, overdue_books, returned_today, total_fines,
+total_fines_paid). Events come from database notifications (migration
+012) when the change listener is running, so writes from every worker and
+from scripts are seen; otherwise from this worker's CirculationService
+write paths.
+
+Each worker keeps one copy of the counters, loaded through
+get_circulation_stats() and moved along by the deltas, and fans events out
+to its open streams in process. A new stream starts from that copy, so
+dashboards connecting or staying open add no database reads. The counters
+are reloaded (and re-sent to every stream as a "snapshot") every
+CIRCULATION_FEED_REFRESH_INTERVAL seconds and when the day changes, which
+also picks up loans that became overdue with no write at all.
+"""
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Optional
+import logging
+import time
+
+from app.core.config import settings
+from app.core.events import RESYNC, SSE_HEARTBEAT, get_event_broker, sse_event
+from app.core.singleflight import get_singleflight
+from app.db.listener import change_listener_active
+
+logger = logging.getLogger(__name__)
+
+# Circulation statistics kept current by event deltas
+FEED_COUNTERS = ('active_issues', 'overdue_books', 'returned_today', 'total_fines', 'total_fines_paid')
+
+# Loan fields sent with every event
+EVENT_FIELDS = ('book_id', 'user_id', 'issue_date', 'due_date', 'return_date', 'fine_amount', 'fine_paid')
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    # Dates, or timestamps from rows written with datetime.isoformat()
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).date()
+
+
+def loan_counters(loan: Optional[Dict[str, Any]], today: date) -> Dict[str, float]:
+    """A loan's contribution to each counter (as counted by CIRCULATION_TOTALS_SQL)."""
+    if not loan:
+        return dict.fromkeys(FEED_COUNTERS, 0)
+    due = _as_date(loan.get('due_date'))
+    returned = _as_date(loan.get('return_date'))
+    fine = float(loan.get('fine_amount') or 0)
+    return {
+        'active_issues': int(returned is None and (due is None or due >= today)),
+        'overdue_books': int(returned is None and due is not None and due < today),
+        'returned_today': int(returned == today),
+        'total_fines': fine,
+        'total_fines_paid': fine if loan.get('fine_paid') else 0.0,
+    }
+
+
+def loan_event(op: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> str:
+    """Event name for a change to one circulation record."""
+    if op == 'INSERT':
+        return 'loan.issued'
+    if op == 'DELETE':
+        return 'loan.deleted'
+    if old and new:
+        if not old.get('return_date') and new.get('return_date'):
+            return 'loan.returned'
+        if not old.get('fine_paid') and new.get('fine_paid'):
+            return 'fine.paid'
+        if (new.get('renewal_count') or 0) > (old.get('renewal_count') or 0):
+            return 'loan.renewed'
+    return 'loan.updated'
+
+
+class CirculationFeed:
+    """This worker's circulation counters and event fan-out."""
+
+    def __init__(self):
+        self.broker = get_event_broker("circulation", settings.EVENTS_QUEUE_SIZE)
+        self.totals: Optional[Dict[str, float]] = None
+        self.refreshed_at = 0.0
+        self._day: Optional[date] = None
+        self._stale = False
+
+    def publish(self, op: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """
+        Publish a change to one circulation record.
+
+        `old` and `new` are the row before and after (None for an insert or
+        a delete). An update without `old` carries no deltas; the counters
+        are reloaded instead.
+        """
+        loan = new or old or {}
+        today = date.today()
+        deltas: Dict[str, float] = {}
+        if op == 'UPDATE' and old is None:
+            self._stale = True
+        else:
+            before, after = loan_counters(old, today), loan_counters(new, today)
+            deltas = {
+                name: round(after[name] - before[name], 3)
+                for name in FEED_COUNTERS if after[name] != before[name]
+            }
+            if self.totals is not None and self._day == today:
+                for name, delta in deltas.items():
+                    self.totals[name] = round(self.totals[name] + delta, 3)
+
+        self.broker.publish(loan_event(op, old, new), {
+            'record_id': str(loan.get('id')),
+            **{field: loan.get(field) for field in EVENT_FIELDS},
+            'deltas': deltas,
+        })
+
+    def _due(self) -> bool:
+        return (
+            self.totals is None
+            or self._stale
+            or self._day != date.today()
+            or time.monotonic() - self.refreshed_at >= settings.CIRCULATION_FEED_REFRESH_INTERVAL
+        )
+
+    async def refresh(self) -> Dict[str, float]:
+        """Reload the counters and send them to every stream as a snapshot."""
+        return await get_singleflight("stats").do(
+            "circulation:feed",
+            self._load,
+            timeout=settings.SINGLEFLIGHT_TIMEOUT,
+        )
+
+    async def _load(self) -> Dict[str, float]:
+        # Imported here: circulation_service publishes through this module
+        from app.services.circulation_service import CirculationService
+
+        today = date.today()
+        self._stale = False
+        try:
+            stats = await CirculationService().get_circulation_stats()
+        except Exception:
+            # Back off until the next interval instead of retrying per event
+            self.refreshed_at = time.monotonic()
+            raise
+        self.totals = {name: stats[name] for name in FEED_COUNTERS}
+        self._day = today
+        self.refreshed_at = time.monotonic()
+        self.broker.publish("snapshot", dict(self.totals))
+        return self.totals
+
+    async def load(self) -> Dict[str, float]:
+        """The counters, reloaded first if due (raises if they cannot be loaded)."""
+        if self._due():
+            try:
+                return await self.refresh()
+            except Exception:
+                if self.totals is None:
+                    raise
+        return self.totals
+
+    async def _refresh_if_due(self) -> None:
+        if self._due():
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Circulation feed refresh failed: {str(e)}")
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """
+        Server-sent events for one client: a snapshot of the counters, then
+        events as they happen. Call load() first.
+        """
+        async with self.broker.subscribe() as subscription:
+            yield sse_event("snapshot", dict(self.totals))
+
+            while True:
+                item = await subscription.next(timeout=settings.EVENTS_HEARTBEAT_INTERVAL)
+                if item is None:
+                    yield SSE_HEARTBEAT
+                elif item[0] == RESYNC:
+                    # Events were dropped for this client; start it over from the counters
+                    yield sse_event("snapshot", dict(self.totals))
+                else:
+                    yield sse_event(*item)
+                await self._refresh_if_due()
+
+
+_circulation_feed: Optional[CirculationFeed] = None
+
+
+def get_circulation_feed() -> CirculationFeed:
+    """Process-wide circulation feed."""
+    global _circulation_feed
+    if _circulation_feed is None:
+        _circulation_feed = CirculationFeed()
+    return _circulation_feed
+
+
+def publish_loan_change(op: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+    """
+    Publish a circulation write made by this worker.
+
+    Skipped while the change listener is connected: the database
+    notification for the same write reaches every worker, this one included.
+    """
+    if not change_listener_active():
+        get_circulation_feed().publish(op, old, new)
@@ -0,0 +1,188 @@
+"""
+Circulation history across the live table and the Parquet archive.
+
+circulation_records is partitioned by issue year (migration 010). Once
+loans were returned more than CIRCULATION_RETENTION_DAYS ago and have no
+unpaid fine, archive_returned_loans() moves them, a month of issue dates at
+a time, into the archive (app.db.archive) and deletes them from the table.
+get_records() answers a date range from both, so reports read archived
+years transparently.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..db.archive import get_circulation_archive
+from ..db.postgres import get_postgres
+from ..db.replica import read_supabase, replica_failed
+from ..db.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+# Loans issued in [$1, $2), returned before $3 with nothing left to collect.
+# The issue_date bounds (a loan is returned after it is issued, so
+# issue_date < $3 too) keep the scan to one partition. Locked so a late
+# fine or edit cannot slip in between export and delete.
+ARCHIVABLE_LOANS_SQL = """
+    SELECT id::text AS id, user_id::text AS user_id, book_id::text AS book_id,
+           issue_date, due_date, return_date, book_condition, fine_amount, fine_paid,
+           notes, created_at, updated_at, renewal_count
+    FROM circulation_records
+    WHERE issue_date >= $1 AND issue_date < $2 AND issue_date < $3
+      AND return_date < $3
+      AND (fine_paid OR COALESCE(fine_amount, 0) = 0)
+    ORDER BY issue_date, id
+    FOR UPDATE
+"""
+
+# Live rows per PostgREST request (at most the API's max-rows, 1000 by default)
+LIVE_PAGE_SIZE = 1000
+
+DELETE_ARCHIVED_SQL = """
+    DELETE FROM circulation_records
+    WHERE issue_date >= $1 AND issue_date < $2 AND id = ANY($3::uuid[])
+"""
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _as_json(row: Dict[str, Any]) -> Dict[str, Any]:
+    """An archived row shaped like PostgREST's JSON (ISO dates, numbers)."""
+    for key, value in row.items():
+        if isinstance(value, date):
+            row[key] = value.isoformat()
+        elif isinstance(value, Decimal):
+            row[key] = float(value)
+    return row
+
+
+class CirculationHistoryService:
+    """Date-range reads and archival of circulation records."""
+
+    def __init__(self):
+        """Initialize the circulation history service."""
+        self.supabase = get_supabase()
+
+    async def get_records(self, start: date, end: date, columns: Sequence[str]) -> List[Dict]:
+        """
+        Loans issued between `start` and `end` (inclusive), live and archived.
+
+        Args:
+            start: First issue date
+            end: Last issue date
+            columns: circulation_records columns to return
+
+        Returns:
+            Rows as PostgREST returns them (archived ones in the same shape)
+
+        Raises:
+            Exception: If failed to read circulation history
+        """
+        try:
+            rows = await self._live_records(start, end, columns)
+
+            archive = get_circulation_archive()
+            if archive is not None:
+                # Lists the year directories and reads only those in range
+                archived = await run_in_threadpool(archive.read, start, end, columns)
+                rows.extend(_as_json(row) for row in archived)
+            return rows
+
+        except Exception as e:
+            raise Exception(f"Failed to fetch circulation history: {str(e)}")
+
+    async def _live_records(self, start: date, end: date, columns: Sequence[str]) -> List[Dict]:
+        def select(db):
+            # Paged: PostgREST truncates a larger response to max-rows
+            rows = []
+            while True:
+                page = db.table('circulation_records')\
+                    .select(','.join(columns))\
+                    .gte('issue_date', start.isoformat())\
+                    .lte('issue_date', end.isoformat())\
+                    .order('issue_date').order('id')\
+                    .range(len(rows), len(rows) + LIVE_PAGE_SIZE - 1)\
+                    .execute().data or []
+                rows.extend(page)
+                if len(page) < LIVE_PAGE_SIZE:
+                    return rows
+
+        db = read_supabase()
+        try:
+            return await run_in_threadpool(select, db)
+        except Exception as e:
+            if not replica_failed(db, e):
+                raise
+        return await run_in_threadpool(select, self.supabase)
+
+    async def archive_returned_loans(self, before: Optional[date] = None) -> Dict[str, int]:
+        """
+        Move settled loans returned before `before` to the archive.
+
+        The cut-off is on the return date, so a long loan returned today
+        stays in the table (returned_today, live history) for the whole
+        retention window however long ago it was issued.
+
+        Each month is exported and deleted in one transaction; if the delete
+        or the commit fails the file is removed again, so a record is never
+        in both places.
+
+        Args:
+            before: Cut-off return date (default: CIRCULATION_RETENTION_DAYS ago)
+
+        Returns:
+            Records archived per month ("YYYY-MM")
+
+        Raises:
+            Exception: If DATABASE_URL or pyarrow is missing, or archiving fails
+        """
+        db = get_postgres()
+        archive = get_circulation_archive()
+        if db is None or archive is None:
+            raise Exception("Archiving circulation history needs DATABASE_URL and the 'pyarrow' package")
+        if before is None:
+            before = date.today() - timedelta(days=settings.CIRCULATION_RETENTION_DAYS)
+
+        archived: Dict[str, int] = {}
+        try:
+            first = await db.fetchval(
+                "SELECT MIN(issue_date) FROM circulation_records WHERE issue_date < $1 AND return_date < $1",
+                before
+            )
+            month = date(first.year, first.month, 1) if first else before
+            while month < before:
+                following = _next_month(month)
+                count = await self._archive_month(db, archive, month, following, before)
+                if count:
+                    archived[month.strftime('%Y-%m')] = count
+                    logger.info(f"Archived {count} circulation records issued in {month:%Y-%m}")
+                month = following
+
+            # Partitions for this year and next, so new loans never land in the default partition
+            await db.fetchval("SELECT ensure_circulation_partitions($1, $2)", date.today().year, date.today().year + 1)
+            return archived
+
+        except Exception as e:
+            raise Exception(f"Failed to archive circulation history: {str(e)}")
+
+    async def _archive_month(self, db, archive, month: date, following: date, before: date) -> int:
+        path = None
+        try:
+            async with db.connection() as connection, connection.transaction():
+                rows = [dict(row) for row in await connection.fetch(ARCHIVABLE_LOANS_SQL, month, following, before)]
+                if not rows:
+                    return 0
+                path = await run_in_threadpool(archive.write, month.year, month.strftime('%Y%m'), rows)
+                await connection.execute(DELETE_ARCHIVED_SQL, month, following, [row['id'] for row in rows])
+        except BaseException:
+            # The rows are still in the table; drop the copy
+            if path is not None:
+                path.unlink(missing_ok=True)
+            raise
+        return len(rows)
@@ -4,10 +4,102 @@ Circulation service - Business logic for circulation management
 from typing import Optional, Dict, List
 from datetime import datetime, date, timedelta
 from uuid import UUID
-from ..db import get_supabase
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+from ..db import get_supabase, returning
+from ..db.postgres import PostgresPool, direct_db
+from ..db.replica import read_db, read_supabase, replica_failed
+from ..core.cache import invalidate_tags
+from ..core.config import settings
+from ..core.fields import pick
+from ..core.singleflight import get_singleflight
+from .books_service import book_cache_tag
+from .circulation_feed_service import publish_loan_change
+import asyncio
 import math
 
 
+# Single-record representation with the borrower and book joined in.
+# books has no category text column: the category is embedded as
+# `category: {name}` (null without one)
+CIRCULATION_RECORD_SELECT = """
+    id, user_id, book_id, issue_date, due_date, return_date,
+    book_condition, fine_amount, fine_paid, notes, created_at, updated_at,
+    users(id, full_name, email, phone, user_type, roles(name)),
+    books(id, title, isbn, author, publisher, publication_year, shelf_location, category:categories(name))
+"""
+
+# Direct-Postgres issue: insert and return the row shaped like
+# CIRCULATION_RECORD_SELECT (dates as text, relations as JSON objects).
+ISSUE_BOOK_SQL = """
+    WITH inserted AS (
+        INSERT INTO circulation_records (user_id, book_id, issue_date, due_date, notes)
+        VALUES ($1::uuid, $2::uuid, $3::date, $4::date, $5)
+        RETURNING *
+    )
+    SELECT i.id::text AS id, i.user_id::text AS user_id, i.book_id::text AS book_id,
+           i.issue_date::text AS issue_date, i.due_date::text AS due_date,
+           i.return_date::text AS return_date, i.book_condition,
+           i.fine_amount::float8 AS fine_amount, i.fine_paid, i.notes,
+           i.created_at, i.updated_at,
+           jsonb_build_object(
+               'id', u.id, 'full_name', u.full_name, 'email', u.email, 'phone', u.phone,
+               'user_type', u.user_type,
+               'roles', (SELECT jsonb_build_object('name', r.name) FROM roles r WHERE r.id = u.role_id)
+           ) AS users,
+           jsonb_build_object(
+               'id', b.id, 'title', b.title, 'isbn', b.isbn, 'author', b.author,
+               'publisher', b.publisher, 'publication_year', b.publication_year,
+               'shelf_location', b.shelf_location,
+               'category', CASE WHEN c.id IS NULL THEN NULL ELSE jsonb_build_object('name', c.name) END
+           ) AS books
+    FROM inserted i
+    JOIN users u ON u.id = i.user_id
+    JOIN books b ON b.id = i.book_id
+    LEFT JOIN categories c ON c.id = b.category_id
+"""
+
+# Direct-Postgres stats: the same figures as _compute_circulation_stats,
+# aggregated in the database ($1 is today's date). Live table only, like
+# the Python path; archived loans are not included.
+CIRCULATION_TOTALS_SQL = """
+    SELECT
+        count(*) FILTER (WHERE return_date IS NULL AND due_date >= $1) AS active_issues,
+        count(*) FILTER (WHERE return_date IS NULL AND due_date < $1) AS overdue_books,
+        count(*) FILTER (WHERE return_date = $1) AS returned_today,
+        coalesce(sum(fine_amount), 0)::float8 AS total_fines,
+        coalesce(sum(fine_amount) FILTER (WHERE fine_paid), 0)::float8 AS total_fines_paid,
+        coalesce(avg(return_date - issue_date) FILTER (WHERE return_date IS NOT NULL), 0)::float8
+            AS average_borrow_duration
+    FROM circulation_records
+"""
+MOST_BORROWED_SQL = """
+    SELECT b.id::text AS book_id, coalesce(b.title, 'Unknown') AS title, count(*) AS count
+    FROM circulation_records cr
+    JOIN books b ON b.id = cr.book_id
+    GROUP BY b.id
+    ORDER BY count DESC
+    LIMIT 5
+"""
+MOST_ACTIVE_SQL = """
+    SELECT u.id::text AS user_id, coalesce(u.full_name, 'Unknown') AS name, count(*) AS count
+    FROM circulation_records cr
+    JOIN users u ON u.id = cr.user_id
+    GROUP BY u.id
+    ORDER BY count DESC
+    LIMIT 5
+"""
+
+
+def _category_name(book: Dict) -> Optional[str]:
+    """Name from a book's embedded `category` ({name} or null)."""
+    return (book.get('category') or {}).get('name')
+
+
+def _as_date(value) -> date:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
 class CirculationService:
     """Circulation service for book issue/return operations"""
 
@@ -127,10 +219,15 @@ class CirculationService:
         user_type: Optional[str] = None,
         due_date_filter: Optional[str] = None,
         sort_by: str = "issue_date",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        user_id: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> Dict:
         """
         Get paginated list of circulation records with filtering and sorting
+
+        Status, days left and fines are derived from several columns, so
+        `fields` trims the returned items rather than the selected columns.
         """
         try:
             # Build query with joins
@@ -139,7 +236,7 @@ class CirculationService:
                 id, user_id, book_id, issue_date, due_date, return_date,
                 book_condition, fine_amount, fine_paid, notes, created_at, updated_at,
                 users(id, full_name, user_type, roles(name)),
-                books(id, title, isbn, category, shelf_location)
+                books(id, title, isbn, shelf_location, category:categories(name))
                 """,
                 count="exact"
             )
@@ -150,6 +247,10 @@ class CirculationService:
                 # We'll need to filter in memory for complex searches
                 pass
 
+            # Restrict to one borrower (patrons only see their own loans)
+            if user_id:
+                query = query.eq('user_id', user_id)
+
             # Apply due date filter
             if due_date_filter:
                 today = date.today()
@@ -237,7 +338,7 @@ class CirculationService:
                     'book_id': record['book_id'],
                     'book_title': book.get('title', 'Unknown'),
                     'book_isbn': book.get('isbn'),
-                    'category': book.get('category'),
+                    'category': _category_name(book),
                     'shelf_location': book.get('shelf_location'),
                     'issue_date': record['issue_date'],
                     'due_date': record['due_date'],
@@ -256,7 +357,7 @@ class CirculationService:
                 if fine_breakdown:
                     record_data['fine_breakdown'] = fine_breakdown
 
-                records.append(record_data)
+                records.append(pick(record_data, fields) if fields else record_data)
 
             # Calculate pagination
             actual_total = len(records)
@@ -280,60 +381,58 @@ class CirculationService:
         """
         try:
             response = self.supabase.table('circulation_records').select(
-                """
-                id, user_id, book_id, issue_date, due_date, return_date,
-                book_condition, fine_amount, fine_paid, notes, created_at, updated_at,
-                users(id, full_name, email, phone, user_type, roles(name)),
-                books(id, title, isbn, author, publisher, publication_year, category, shelf_location)
-                """
+                CIRCULATION_RECORD_SELECT
             ).eq('id', record_id).single().execute()
 
             if not response.data:
                 return None
 
-            record = response.data
-            user = record.get('users', {})
-            book = record.get('books', {})
-
-            days_left = self._calculate_days_left(record['due_date'])
-            status = self._determine_status(record['due_date'], record.get('return_date'))
-
-            fine_amount = record.get('fine_amount')
-            if fine_amount is None and status == 'overdue':
-                fine_amount = self._calculate_fine(record['due_date'])
-
-            return {
-                'id': record['id'],
-                'user_id': record['user_id'],
-                'user_name': user.get('full_name', 'Unknown'),
-                'user_email': user.get('email'),
-                'user_phone': user.get('phone'),
-                'user_role': user.get('roles', {}).get('name', 'Patron') if user.get('roles') else 'Patron',
-                'book_id': record['book_id'],
-                'book_title': book.get('title', 'Unknown'),
-                'book_isbn': book.get('isbn'),
-                'book_author': book.get('author'),
-                'book_publisher': book.get('publisher'),
-                'book_year': book.get('publication_year'),
-                'category': book.get('category'),
-                'shelf_location': book.get('shelf_location'),
-                'issue_date': record['issue_date'],
-                'due_date': record['due_date'],
-                'return_date': record.get('return_date'),
-                'status': status,
-                'book_condition': record.get('book_condition'),
-                'fine_amount': fine_amount,
-                'fine_paid': record.get('fine_paid', False),
-                'days_left': days_left,
-                'notes': record.get('notes'),
-                'created_at': record['created_at'],
-                'updated_at': record['updated_at']
-            }
+            return self._format_record(response.data)
 
         except Exception as e:
             print(f"Error fetching circulation record: {str(e)}")
             return None
 
+    def _format_record(self, record: Dict) -> Dict:
+        """Shape a row selected with CIRCULATION_RECORD_SELECT for the API"""
+        user = record.get('users', {})
+        book = record.get('books', {})
+
+        days_left = self._calculate_days_left(record['due_date'])
+        status = self._determine_status(record['due_date'], record.get('return_date'))
+
+        fine_amount = record.get('fine_amount')
+        if fine_amount is None and status == 'overdue':
+            fine_amount = self._calculate_fine(record['due_date'])
+
+        return {
+            'id': record['id'],
+            'user_id': record['user_id'],
+            'user_name': user.get('full_name', 'Unknown'),
+            'user_email': user.get('email'),
+            'user_phone': user.get('phone'),
+            'user_role': user.get('roles', {}).get('name', 'Patron') if user.get('roles') else 'Patron',
+            'book_id': record['book_id'],
+            'book_title': book.get('title', 'Unknown'),
+            'book_isbn': book.get('isbn'),
+            'book_author': book.get('author'),
+            'book_publisher': book.get('publisher'),
+            'book_year': book.get('publication_year'),
+            'category': _category_name(book),
+            'shelf_location': book.get('shelf_location'),
+            'issue_date': record['issue_date'],
+            'due_date': record['due_date'],
+            'return_date': record.get('return_date'),
+            'status': status,
+            'book_condition': record.get('book_condition'),
+            'fine_amount': fine_amount,
+            'fine_paid': record.get('fine_paid', False),
+            'days_left': days_left,
+            'notes': record.get('notes'),
+            'created_at': record['created_at'],
+            'updated_at': record['updated_at']
+        }
+
     async def issue_book(self, circulation_data: Dict) -> Dict:
         """
         Issue a book to a user
@@ -351,16 +450,34 @@ class CirculationService:
             }
 
             # Insert circulation record
-            response = self.supabase.table('circulation_records').insert(new_record).execute()
+            db = direct_db("circulation.issue")
+            if db is not None:
+                row = await db.fetchrow(
+                    ISSUE_BOOK_SQL,
+                    new_record['user_id'],
+                    new_record['book_id'],
+                    _as_date(new_record['issue_date']),
+                    _as_date(new_record['due_date']),
+                    new_record['notes']
+                )
+                rows = [dict(row)] if row else []
+            else:
+                rows = returning(
+                    self.supabase.table('circulation_records').insert(new_record),
+                    CIRCULATION_RECORD_SELECT
+                ).execute().data
 
-            if not response.data:
+            if not rows:
                 raise Exception("Failed to issue book")
 
             # TODO: Send email notification if requested
             # TODO: Update book status to "borrowed"
 
-            # Fetch created record
-            return await self.get_circulation_record(response.data[0]['id'])
+            # Cached book detail reflects loan-driven availability
+            await invalidate_tags(book_cache_tag(new_record['book_id']))
+            publish_loan_change('INSERT', None, rows[0])
+
+            return self._format_record(rows[0])
 
         except Exception as e:
             print(f"Error issuing book: {str(e)}")
@@ -394,15 +511,20 @@ class CirculationService:
             }
 
             # Update circulation record
-            response = self.supabase.table('circulation_records').update(update_data).eq('id', record_id).execute()
+            response = returning(
+                self.supabase.table('circulation_records').update(update_data).eq('id', record_id),
+                CIRCULATION_RECORD_SELECT
+            ).execute()
 
             if not response.data:
                 raise Exception("Failed to process return")
 
             # TODO: Update book status to "available" or "damaged" based on condition
 
-            # Fetch updated record
-            return await self.get_circulation_record(record_id)
+            await invalidate_tags(book_cache_tag(existing['book_id']))
+            publish_loan_change('UPDATE', existing, response.data[0])
+
+            return self._format_record(response.data[0])
 
         except Exception as e:
             print(f"Error processing return: {str(e)}")
@@ -430,13 +552,17 @@ class CirculationService:
                 data['notes'] = update_data['notes']
 
             # Update record
-            response = self.supabase.table('circulation_records').update(data).eq('id', record_id).execute()
+            response = returning(
+                self.supabase.table('circulation_records').update(data).eq('id', record_id),
+                CIRCULATION_RECORD_SELECT
+            ).execute()
 
             if not response.data:
                 raise Exception("Circulation record not found or update failed")
 
-            # Fetch updated record
-            return await self.get_circulation_record(record_id)
+            publish_loan_change('UPDATE', None, response.data[0])
+
+            return self._format_record(response.data[0])
 
         except Exception as e:
             print(f"Error updating circulation record: {str(e)}")
@@ -448,6 +574,8 @@ class CirculationService:
         """
         try:
             response = self.supabase.table('circulation_records').delete().eq('id', record_id).execute()
+            for row in response.data or []:
+                publish_loan_change('DELETE', row, None)
             return True
 
         except Exception as e:
@@ -457,10 +585,70 @@ class CirculationService:
     async def get_circulation_stats(self) -> Dict:
         """
         Get circulation statistics
+
+        Concurrent callers share one computation, run in the threadpool
+        (or aggregated in the database on the direct Postgres path). It
+        reads from the read replica when one is configured and current.
+
+        Both paths read circulation_records only: archived loans (returned,
+        settled, past CIRCULATION_RETENTION_DAYS) are not in the all-time
+        figures. Date-ranged reads go through CirculationHistoryService.
+        """
+        return await get_singleflight("stats").do(
+            "circulation:stats",
+            self._load_circulation_stats,
+            timeout=settings.SINGLEFLIGHT_TIMEOUT,
+        )
+
+    async def _load_circulation_stats(self) -> Dict:
+        db = read_db("circulation.stats")
+        source = db if db is not None else read_supabase()
+        try:
+            return await self._compute_circulation_stats_from(source)
+        except Exception as e:
+            if not replica_failed(source, e):
+                raise
+
+        # The replica failed mid-read; the primary answers instead
+        db = direct_db("circulation.stats")
+        return await self._compute_circulation_stats_from(db if db is not None else self.supabase)
+
+    async def _compute_circulation_stats_from(self, source) -> Dict:
+        if isinstance(source, PostgresPool):
+            return await self._compute_circulation_stats_direct(source)
+        return await run_in_threadpool(self._compute_circulation_stats, source)
+
+    async def _compute_circulation_stats_direct(self, db: PostgresPool) -> Dict:
+        """
+        Compute circulation statistics with three aggregate queries
+        """
+        try:
+            totals, most_borrowed, most_active = await asyncio.gather(
+                db.fetchrow(CIRCULATION_TOTALS_SQL, date.today()),
+                db.fetch(MOST_BORROWED_SQL),
+                db.fetch(MOST_ACTIVE_SQL),
+            )
+            return {
+                **dict(totals),
+                'reserved_books': 0,  # TODO: Implement reservations
+                'most_borrowed_books': [dict(row) for row in most_borrowed],
+                'most_active_users': [dict(row) for row in most_active]
+            }
+
+        except Exception as e:
+            print(f"Error getting circulation stats: {str(e)}")
+            raise Exception(f"Failed to get circulation stats: {str(e)}")
+
+    def _compute_circulation_stats(self, db: Optional[Client] = None) -> Dict:
+        """
+        Compute circulation statistics (blocking)
+
+        Args:
+            db: Client to read from (default: the primary)
         """
         try:
             # Get all circulation records
-            all_records = self.supabase.table('circulation_records').select(
+            all_records = (db or self.supabase).table('circulation_records').select(
                 """
                 id, issue_date, due_date, return_date, fine_amount, fine_paid,
                 users(id, full_name),
@@ -601,6 +789,8 @@ class CirculationService:
                     'fine_paid': True,
                     'updated_at': datetime.utcnow().isoformat()
                 }).eq('id', record_id).execute()
+            for record in records:
+                publish_loan_change('UPDATE', record, {**record, 'fine_paid': True})
 
             return {
                 'user_id': user_id,
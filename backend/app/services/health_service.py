@@ -0,0 +1,183 @@
+"""
+Database health prober behind GET /health.
+
+/health used to query Supabase on the event loop for every probe, so
+frequent load-balancer checks added database load and a slow database
+stalled every request on the worker. One background prober now measures
+the database instead, and /health answers from its last result (with its
+age) without any I/O.
+
+The prober runs once per deployment: every HEALTH_PROBE_INTERVAL seconds
+each worker tries to claim that round in Redis (SET NX); the winner runs
+the probe in the threadpool and publishes the result, and the others read
+it. Without Redis every worker probes for itself. The probe doubles as
+the keep-alive that stops Supabase pausing an idle project.
+
+GET /health/deep probes on request, at most once per
+HEALTH_DEEP_MIN_INTERVAL seconds per worker; calls inside that window get
+the previous deep result.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.singleflight import get_singleflight
+from app.db.postgres import get_postgres
+from app.db.redis import get_redis
+from app.db.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _probe_supabase() -> None:
+    """Lightweight PostgREST round trip (blocking)."""
+    get_supabase().table('roles').select('id').limit(1).execute()
+
+
+async def measure() -> Dict[str, Any]:
+    """Probe PostgREST (and the direct pool, if configured) once."""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {
+        "status": "healthy",
+        "error": None,
+        "checked_at": datetime.now().isoformat(),
+        "checked_at_epoch": time.time(),
+        "probed_by": WORKER_ID,
+    }
+    try:
+        await run_in_threadpool(_probe_supabase)
+    except Exception as e:
+        result["status"] = "unhealthy"
+        result["error"] = str(e)
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    postgres = get_postgres()
+    if postgres is not None:
+        started = time.perf_counter()
+        try:
+            await postgres.fetchval("SELECT 1")
+            result["pool_latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        except Exception as e:
+            result["status"] = "unhealthy"
+            result["pool_error"] = str(e)
+    return result
+
+
+class HealthProber:
+    """This worker's view of database health, refreshed in the background."""
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.result: Optional[Dict[str, Any]] = None
+        self.probes = 0
+        self._deep: Optional[Dict[str, Any]] = None
+        self._deep_at: Optional[float] = None
+
+    def _key(self, name: str) -> str:
+        return f"{settings.CACHE_NAMESPACE}:health:{name}"
+
+    async def _claim_round(self) -> bool:
+        """Whether this worker probes this round (always, without Redis)."""
+        if self.redis is None:
+            return True
+        try:
+            ttl = max(1, int(settings.HEALTH_PROBE_INTERVAL * 0.9))
+            return await self.redis.execute("SET", self._key("prober"), WORKER_ID, "NX", "EX", ttl) is not None
+        except Exception as e:
+            logger.warning(f"Health probe claim failed, probing locally: {str(e)}")
+            return True
+
+    async def _publish(self, result: Dict[str, Any]) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                self._key("database"),
+                orjson.dumps(result).decode(),
+                ex=int(settings.HEALTH_PROBE_INTERVAL * 3),
+            )
+        except Exception as e:
+            logger.warning(f"Health result publish failed: {str(e)}")
+
+    async def _read_shared(self) -> None:
+        try:
+            payload = await self.redis.get(self._key("database"))
+        except Exception as e:
+            logger.warning(f"Health result read failed: {str(e)}")
+            return
+        if payload is not None:
+            self.result = orjson.loads(payload)
+
+    async def refresh(self) -> None:
+        """Probe if this worker won the round, else pick up the winner's result."""
+        if await self._claim_round():
+            result = await measure()
+            self.probes += 1
+            self.result = result
+            await self._publish(result)
+            if result["status"] == "healthy":
+                logger.info(f"✅ Database probe: {result['latency_ms']}ms")
+            else:
+                logger.error(f"❌ Database probe failed: {result['error'] or result.get('pool_error')}")
+        else:
+            await self._read_shared()
+
+    async def run(self) -> None:
+        """Refresh every HEALTH_PROBE_INTERVAL seconds until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Health prober error: {str(e)}")
+            await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last probe, whichever worker ran it."""
+        if self.result is None:
+            return None
+        return round(max(0.0, time.time() - self.result["checked_at_epoch"]), 1)
+
+    def status(self) -> Dict[str, Any]:
+        """The last result and its age; "unknown" once it is three intervals old."""
+        if self.result is None:
+            return {"status": "unknown", "error": "No database probe has completed yet", "age_seconds": None}
+        age = self.age()
+        status = dict(self.result)
+        if age > settings.HEALTH_PROBE_INTERVAL * 3:
+            status["status"] = "unknown"
+            status["error"] = f"Last database probe is {age:.0f}s old"
+        status["age_seconds"] = age
+        return status
+
+    async def deep(self) -> Dict[str, Any]:
+        """Probe now, unless a deep probe ran within HEALTH_DEEP_MIN_INTERVAL."""
+        if self._deep_at is not None and time.monotonic() - self._deep_at < settings.HEALTH_DEEP_MIN_INTERVAL:
+            return {**self._deep, "cached": True, "age_seconds": round(time.monotonic() - self._deep_at, 1)}
+        return await get_singleflight("health").do("deep", self._deep_probe, timeout=settings.SINGLEFLIGHT_TIMEOUT)
+
+    async def _deep_probe(self) -> Dict[str, Any]:
+        result = await measure()
+        self.result = result
+        self._deep, self._deep_at = result, time.monotonic()
+        return {**result, "cached": False, "age_seconds": 0.0}
+
+
+_health_prober: Optional[HealthProber] = None
+
+
+def get_health_prober() -> HealthProber:
+    """Process-wide health prober."""
+    global _health_prober
+    if _health_prober is None:
+        _health_prober = HealthProber()
+    return _health_prober
@@ -0,0 +1,393 @@
+"""
+Bulk catalogue import: validate, deduplicate and load books in batches.
+
+Records come from app.core.catalog_formats (CSV, JSON lines, MARC 21) and
+are taken IMPORT_BATCH_SIZE at a time:
+
+- each is validated with BookCreate (unknown columns are ignored);
+- its category is resolved from an in-memory map of the categories table:
+  a `category` column may hold a name, Arabic name or Dewey number, and
+  without one the book's own dewey_decimal picks the most specific class;
+- ISBN (digits only) and barcode are checked against the identifiers
+  already in the catalogue, read once up front, and against earlier records
+  of the same import.
+
+Each batch is then loaded in one statement per kind of write. When
+"books.import" is in DIRECT_DB_PATHS the batch is COPYed into a temporary
+table on the asyncpg pool and merged with INSERT ... ON CONFLICT DO NOTHING
+(and UPDATE ... FROM for on_duplicate="update"), all in one transaction.
+Otherwise it goes through PostgREST as one multi-row insert and one
+multi-row upsert, falling back to row-by-row writes to isolate a bad row.
+
+Progress is reported after every batch. `resume_from` counts the source
+records whose batch has been committed; passing it back to a new run on the
+same file skips them.
+"""
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import re
+
+from postgrest.types import ReturnMethod
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.postgres import PostgresPool, direct_db
+from app.db.supabase_client import get_supabase
+from app.models.books import BookCreate, BookImportProgress
+from app.services.books_service import invalidate_books
+
+logger = logging.getLogger(__name__)
+
+ON_DUPLICATE = ('skip', 'update')
+
+# Every BookCreate field is a books column
+IMPORT_COLUMNS = tuple(BookCreate.model_fields)
+
+# Re-imports refresh the bibliographic record; inventory stays as circulation left it
+IMPORT_UPDATE_COLUMNS = tuple(
+    column for column in IMPORT_COLUMNS
+    if column not in ('quantity', 'available_quantity', 'status')
+)
+
+_NOT_ISBN = re.compile(r'[^0-9X]')
+_NOT_DIGIT = re.compile(r'\D')
+
+
+def _identifiers(isbn: Optional[str], barcode: Optional[str]) -> List[Tuple[str, str]]:
+    """Dedupe keys for a book: normalised ISBN ("978-0-19-..." == "978019...") and barcode."""
+    keys = []
+    if isbn:
+        digits = _NOT_ISBN.sub('', isbn.upper())
+        if digits:
+            keys.append(('isbn', digits))
+    if barcode and barcode.strip():
+        keys.append(('barcode', barcode.strip()))
+    return keys
+
+
+def _dewey_key(code: Any) -> str:
+    """
+    Dewey number as a class prefix.
+
+    Trailing zeros of a whole number only mark the level of the class, so
+    "900" (History & Geography) becomes "9", "950" "95", and "953.5" "9535";
+    a book matches the category whose key is its longest prefix.
+    """
+    whole, _, fraction = str(code).strip().partition('.')
+    whole = _NOT_DIGIT.sub('', whole)
+    fraction = _NOT_DIGIT.sub('', fraction)
+    if not whole:
+        return ''
+    if fraction:
+        return whole + fraction
+    return whole.rstrip('0') or '0'
+
+
+class CategoryResolver:
+    """Category lookup by name, Arabic name or Dewey class, built once per import."""
+
+    def __init__(self, categories: Iterable[Dict[str, Any]]):
+        self._by_name: Dict[str, str] = {}
+        self._by_dewey: Dict[str, str] = {}
+        for category in categories:
+            category_id = str(category['id'])
+            for name in (category.get('name'), category.get('name_ar')):
+                if name:
+                    self._by_name.setdefault(name.strip().casefold(), category_id)
+            key = _dewey_key(category.get('dewey_decimal') or '')
+            if key:
+                self._by_dewey.setdefault(key, category_id)
+
+    def by_dewey(self, code: Any) -> Optional[str]:
+        """Most specific category whose Dewey class contains `code`."""
+        key = _dewey_key(code)
+        for length in range(len(key), 0, -1):
+            category_id = self._by_dewey.get(key[:length])
+            if category_id:
+                return category_id
+        return None
+
+    def resolve(self, record: Dict[str, Any]) -> bool:
+        """
+        Set record['category_id'] from its `category` or dewey_decimal.
+
+        Returns False if a `category` was given but matched nothing.
+        """
+        category = record.pop('category', None)
+        if record.get('category_id'):
+            return True
+        if category:
+            category_id = self._by_name.get(str(category).strip().casefold()) or self.by_dewey(category)
+            if category_id is None:
+                return False
+        elif record.get('dewey_decimal'):
+            category_id = self.by_dewey(record['dewey_decimal'])
+        else:
+            return True
+        if category_id:
+            record['category_id'] = category_id
+        return True
+
+
+class CatalogImportService:
+    """Streaming import of a catalogue file into the books table."""
+
+    def __init__(self, on_duplicate: str = 'skip', batch_size: Optional[int] = None):
+        """
+        Args:
+            on_duplicate: 'skip' books already in the catalogue (by ISBN or
+                barcode), or 'update' their bibliographic fields
+            batch_size: Records per batch (default IMPORT_BATCH_SIZE)
+        """
+        if on_duplicate not in ON_DUPLICATE:
+            raise ValueError(f"on_duplicate must be one of {', '.join(ON_DUPLICATE)}")
+        self.supabase = get_supabase()
+        self.on_duplicate = on_duplicate
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self._resolver: Optional[CategoryResolver] = None
+        self._existing: Dict[Tuple[str, str], str] = {}
+        self._seen: set = set()
+
+    async def run(
+        self,
+        records: Iterable[Dict[str, Any]],
+        resume_from: int = 0
+    ) -> AsyncIterator[BookImportProgress]:
+        """
+        Import `records`, yielding progress after each batch.
+
+        Args:
+            records: Raw records (see app.core.catalog_formats.read_records)
+            resume_from: Leading records to skip (from an earlier run's progress)
+
+        Yields:
+            BookImportProgress after every batch; the last one has done=True
+
+        Raises:
+            Exception: If the catalogue cannot be read or a batch cannot be loaded
+        """
+        db = direct_db("books.import")
+        progress = BookImportProgress(records_read=resume_from, resume_from=resume_from)
+        loaded_any = False
+        try:
+            await self._prepare(db)
+            pending = islice(iter(records), resume_from, None)
+            while not progress.done:
+                new_books, updates, consumed = await run_in_threadpool(self._validate_batch, pending, progress)
+                if consumed:
+                    if db is not None:
+                        imported, updated = await self._load_direct(db, new_books, updates)
+                        # Rows that appeared since the identifiers were read
+                        progress.existing += len(new_books) - imported
+                    else:
+                        imported, updated = await run_in_threadpool(
+                            self._load_postgrest, new_books, updates, progress
+                        )
+                    loaded_any = loaded_any or bool(imported or updated)
+                    progress.imported += imported
+                    progress.updated += updated
+                    progress.batches += 1
+                    progress.resume_from = progress.records_read
+                progress.done = consumed < self.batch_size
+                yield progress
+
+        except Exception as e:
+            raise Exception(f"Failed to import books: {str(e)}")
+
+        finally:
+            if loaded_any:
+                # One eviction for the whole import; the search index catches up on its own
+                await invalidate_books()
+
+    # =====================================================
+    # Preparation
+    # =====================================================
+
+    async def _prepare(self, db: Optional[PostgresPool]) -> None:
+        """Load the category map and the identifiers already in the catalogue."""
+        if db is not None:
+            categories = await db.fetch("SELECT id::text, name, name_ar, dewey_decimal FROM categories")
+            rows = await db.fetch(
+                "SELECT id::text, isbn, barcode FROM books WHERE isbn IS NOT NULL OR barcode IS NOT NULL"
+            )
+            categories = [dict(row) for row in categories]
+        else:
+            categories, rows = await run_in_threadpool(self._read_catalogue)
+
+        self._resolver = CategoryResolver(categories)
+        self._existing = {}
+        for row in rows:
+            for key in _identifiers(row['isbn'], row['barcode']):
+                self._existing.setdefault(key, row['id'])
+        self._seen = set()
+
+    def _read_catalogue(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        categories = self.supabase.table('categories')\
+            .select('id,name,name_ar,dewey_decimal')\
+            .execute().data
+
+        rows: List[Dict[str, Any]] = []
+        last_id = None
+        while True:
+            query = self.supabase.table('books').select('id,isbn,barcode').order('id')
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            page = query.limit(settings.SYNC_MAX_PAGE_SIZE).execute().data
+            rows.extend(row for row in page if row.get('isbn') or row.get('barcode'))
+            if len(page) < settings.SYNC_MAX_PAGE_SIZE:
+                return categories, rows
+            last_id = page[-1]['id']
+
+    @staticmethod
+    def _error(progress: BookImportProgress, message: str) -> None:
+        if len(progress.errors) < settings.IMPORT_MAX_ERRORS:
+            progress.errors.append(message)
+
+    def _validate_batch(
+        self,
+        records: Iterator[Dict[str, Any]],
+        progress: BookImportProgress
+    ) -> Tuple[List[BookCreate], List[Tuple[str, BookCreate]], int]:
+        """
+        Read and check up to batch_size records (blocking: reads the source).
+
+        Returns:
+            (new books, (existing id, book) updates, records consumed)
+        """
+        new_books: List[BookCreate] = []
+        updates: List[Tuple[str, BookCreate]] = []
+        consumed = 0
+        for record in islice(records, self.batch_size):
+            consumed += 1
+            progress.records_read += 1
+            number = progress.records_read
+
+            error = record.pop('_error', None)
+            if error:
+                progress.invalid += 1
+                self._error(progress, f"record {number}: {error}")
+                continue
+            if not self._resolver.resolve(record):
+                progress.unresolved_categories += 1
+
+            try:
+                book = BookCreate.model_validate(record)
+            except ValidationError as e:
+                progress.invalid += 1
+                self._error(progress, f"record {number}: " + "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}"
+                    for err in e.errors()
+                ))
+                continue
+
+            keys = _identifiers(book.isbn, book.barcode)
+            if any(key in self._seen for key in keys):
+                progress.duplicates += 1
+                continue
+            self._seen.update(keys)
+
+            existing_id = next((self._existing[key] for key in keys if key in self._existing), None)
+            if existing_id is None:
+                new_books.append(book)
+            elif self.on_duplicate == 'update':
+                updates.append((existing_id, book))
+            else:
+                progress.existing += 1
+        return new_books, updates, consumed
+
+    # =====================================================
+    # Loading
+    # =====================================================
+
+    @staticmethod
+    def _copy_row(book: BookCreate, columns: Tuple[str, ...], book_id: Optional[str] = None) -> tuple:
+        data = book.model_dump()
+        data['status'] = book.status.value
+        values = tuple(data[column] for column in columns)
+        return values if book_id is None else (book_id, *values)
+
+    async def _load_direct(
+        self,
+        db: PostgresPool,
+        new_books: List[BookCreate],
+        updates: List[Tuple[str, BookCreate]]
+    ) -> Tuple[int, int]:
+        """COPY the batch into temporary tables and merge it in one transaction."""
+        imported = updated = 0
+        async with db.connection() as connection, connection.transaction():
+            if new_books:
+                columns = ', '.join(IMPORT_COLUMNS)
+                await connection.execute(
+                    "CREATE TEMP TABLE book_import (LIKE books INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await connection.copy_records_to_table(
+                    'book_import',
+                    records=[self._copy_row(book, IMPORT_COLUMNS) for book in new_books],
+                    columns=IMPORT_COLUMNS,
+                )
+                status = await connection.execute(
+                    f"INSERT INTO books ({columns}) SELECT {columns} FROM book_import ON CONFLICT DO NOTHING"
+                )
+                imported = int(status.split()[-1])
+
+            if updates:
+                await connection.execute(
+                    "CREATE TEMP TABLE book_import_update (LIKE books INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await connection.copy_records_to_table(
+                    'book_import_update',
+                    records=[self._copy_row(book, IMPORT_UPDATE_COLUMNS, book_id) for book_id, book in updates],
+                    columns=('id', *IMPORT_UPDATE_COLUMNS),
+                )
+                assignments = ', '.join(f"{column} = s.{column}" for column in IMPORT_UPDATE_COLUMNS)
+                status = await connection.execute(
+                    f"UPDATE books b SET {assignments} FROM book_import_update s WHERE b.id = s.id"
+                )
+                updated = int(status.split()[-1])
+        return imported, updated
+
+    def _load_postgrest(
+        self,
+        new_books: List[BookCreate],
+        updates: List[Tuple[str, BookCreate]],
+        progress: BookImportProgress
+    ) -> Tuple[int, int]:
+        """Multi-row insert and upsert; a failing batch is retried row by row."""
+        rows = [book.model_dump(mode='json') for book in new_books]
+        upserts = [
+            {'id': book_id, **book.model_dump(mode='json', include=set(IMPORT_UPDATE_COLUMNS))}
+            for book_id, book in updates
+        ]
+        imported = self._write_rows(
+            rows,
+            progress,
+            lambda batch: self.supabase.table('books').insert(batch, returning=ReturnMethod.minimal)
+        )
+        updated = self._write_rows(
+            upserts,
+            progress,
+            lambda batch: self.supabase.table('books').upsert(batch, returning=ReturnMethod.minimal, on_conflict='id')
+        )
+        return imported, updated
+
+    def _write_rows(self, rows: List[Dict[str, Any]], progress: BookImportProgress, write) -> int:
+        if not rows:
+            return 0
+        try:
+            write(rows).execute()
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Import batch rejected ({str(e)}); retrying row by row")
+
+        written = 0
+        for row in rows:
+            try:
+                write(row).execute()
+                written += 1
+            except Exception as e:
+                progress.invalid += 1
+                label = row.get('isbn') or row.get('barcode') or row.get('title')
+                self._error(progress, f"batch ending at record {progress.records_read}, {label}: {str(e)}")
+        return written
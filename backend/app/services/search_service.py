@@ -0,0 +1,180 @@
+"""
+Catalogue search index: typeahead suggestions served from process memory.
+
+Each worker holds a PrefixIndex over book titles, authors and ISBNs (for
+typeahead) and a TrigramIndex over the words of titles and authors (for
+"did you mean" corrections when a search finds nothing). Both are
+built from the books change feed (SyncService) at startup or on first use,
+updated in place by this worker's BooksService write paths, and caught up
+with other workers' writes by re-reading the feed from its cursor at most
+every SUGGEST_REFRESH_INTERVAL seconds, or on the next request after a
+book change notification (cache_invalidation_service). The catch-up runs in the
+background, so once built, suggestions never wait on the database.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.prefix_index import PrefixIndex
+from app.core.trigram_index import TrigramIndex
+from app.services.sync_service import SyncService, SyncCursorExpired
+
+logger = logging.getLogger(__name__)
+
+# Book fields searchable by prefix
+SUGGEST_FIELDS = ('title', 'title_ar', 'author', 'author_ar', 'isbn')
+SUGGEST_COLUMNS = ','.join(('id', *SUGGEST_FIELDS, 'updated_at'))
+
+# Book fields whose words feed spelling corrections
+FUZZY_FIELDS = ('title', 'title_ar', 'author', 'author_ar')
+
+
+def _document(row: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    return {field: row.get(field) for field in SUGGEST_FIELDS}
+
+
+def _build(documents: Dict[str, Dict[str, Optional[str]]]) -> Tuple[PrefixIndex, TrigramIndex]:
+    index = PrefixIndex.build(documents.items())
+    fuzzy = TrigramIndex.build(
+        document.get(field) for document in documents.values() for field in FUZZY_FIELDS
+    )
+    return index, fuzzy
+
+
+class CatalogSearchIndex:
+    """Per-process search index over the books table."""
+
+    def __init__(self):
+        self.index = PrefixIndex()
+        self.fuzzy = TrigramIndex()
+        self.ready = False
+        self.cursor: Optional[str] = None
+        self.refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def ensure_ready(self) -> None:
+        """Build the index if needed; schedule a catch-up if it is due."""
+        if not self.ready:
+            async with self._lock:
+                if not self.ready:
+                    await self._rebuild()
+            return
+
+        due = time.monotonic() - self.refreshed_at >= settings.SUGGEST_REFRESH_INTERVAL
+        if due and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_quietly())
+
+    async def refresh(self) -> None:
+        """Apply changes made since the last build or refresh."""
+        async with self._lock:
+            if not self.ready:
+                await self._rebuild()
+                return
+            try:
+                async for page in self._pages(self.cursor):
+                    for row in page['items']:
+                        self._add(row['id'], _document(row))
+                    for book_id in page['deleted']:
+                        self._remove(book_id)
+                    self.cursor = page['cursor']
+            except SyncCursorExpired:
+                await self._rebuild()
+                return
+            self.refreshed_at = time.monotonic()
+
+    def mark_stale(self) -> None:
+        """Catch up on the next request instead of waiting for the interval."""
+        self.refreshed_at = 0.0
+
+    def add_books(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Index rows written by this process (ignored until the index is built)."""
+        if self.ready:
+            for row in rows:
+                self._add(str(row['id']), _document(row))
+
+    def remove_books(self, book_ids: Iterable[Any]) -> None:
+        if self.ready:
+            for book_id in book_ids:
+                self._remove(str(book_id))
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict[str, str]]:
+        return [
+            {'book_id': doc_id, 'field': field, 'text': text}
+            for doc_id, field, text in self.index.search(query, limit=limit)
+        ]
+
+    def did_you_mean(self, query: str, limit: int = 3) -> Optional[List[str]]:
+        """Spelling corrections for a search that found nothing (None until built)."""
+        if not self.ready:
+            return None
+        return self.fuzzy.suggest(query, limit=limit)
+
+    def _add(self, book_id: str, document: Dict[str, Optional[str]]) -> None:
+        self._remove(book_id)
+        self.index.add(book_id, document)
+        for field in FUZZY_FIELDS:
+            self.fuzzy.add(document.get(field))
+
+    def _remove(self, book_id: str) -> None:
+        previous = self.index.fields(book_id)
+        for field in FUZZY_FIELDS:
+            self.fuzzy.remove(previous.get(field))
+        self.index.remove(book_id)
+
+    async def _rebuild(self) -> None:
+        documents: Dict[str, Dict[str, Optional[str]]] = {}
+        cursor = None
+        async for page in self._pages(None):
+            for row in page['items']:
+                documents[row['id']] = _document(row)
+            for book_id in page['deleted']:
+                documents.pop(book_id, None)
+            cursor = page['cursor']
+
+        # Sorting a large catalogue takes a while; keep it off the event loop
+        self.index, self.fuzzy = await run_in_threadpool(_build, documents)
+        self.cursor = cursor
+        self.ready = True
+        self.refreshed_at = time.monotonic()
+        logger.info(
+            f"Search index built: {len(self.index)} books, {self.index.entry_count} keys, "
+            f"{len(self.fuzzy)} words"
+        )
+
+    async def _pages(self, since: Optional[str]):
+        sync_service = SyncService()
+        while True:
+            page = await sync_service.get_changes(
+                'books',
+                since=since,
+                limit=settings.SYNC_MAX_PAGE_SIZE,
+                columns=SUGGEST_COLUMNS
+            )
+            yield page
+            if not page['has_more']:
+                return
+            since = page['cursor']
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Back off until the next interval instead of retrying per request
+            self.refreshed_at = time.monotonic()
+            logger.warning(f"Search index refresh failed: {str(e)}")
+
+
+_search_index: Optional[CatalogSearchIndex] = None
+
+
+def get_search_index() -> CatalogSearchIndex:
+    """Process-wide catalogue search index."""
+    global _search_index
+    if _search_index is None:
+        _search_index = CatalogSearchIndex()
+    return _search_index
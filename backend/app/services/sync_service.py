@@ -0,0 +1,178 @@
+"""
+Delta-sync service: change feeds of books and categories for offline clients.
+
+A client holds a local copy of a table and calls the feed with the cursor
+from its previous call. Each page carries the rows whose `updated_at` moved
+past the cursor (keyset-paginated on `(updated_at, id)`) and the IDs deleted
+since, read from the `deleted_records` log that migration 006 fills by
+trigger. A call without a cursor starts a full sync.
+
+Rows younger than SYNC_SAFETY_WINDOW are held back until the next call:
+`updated_at` is the writing transaction's start time, so a slow transaction
+can commit a row stamped earlier than rows already sent. Holding back the
+newest few seconds keeps such rows ahead of the cursor.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import binascii
+import json
+
+from starlette.concurrency import run_in_threadpool
+
+from app.db.supabase_client import get_supabase
+from app.core.config import settings
+from app.core.fields import model_columns
+from app.models.books import CategoryResponse, PublicBookResponse
+
+
+# Tables with a change feed, and the columns each feed returns
+SYNC_COLUMNS: Dict[str, str] = {
+    'books': ','.join(model_columns(PublicBookResponse, exclude={'category'})),
+    'categories': ','.join(model_columns(CategoryResponse)),
+}
+
+
+class SyncCursorExpired(Exception):
+    """The cursor predates the tombstone retention period; a full sync is needed."""
+
+
+@dataclass(frozen=True)
+class SyncCursor:
+    """Position in a change feed: last row and last tombstone sent."""
+    changed: Optional[Tuple[str, str]] = None  # (updated_at, id)
+    deleted: Optional[Tuple[str, int]] = None  # (deleted_at, deleted_records.id)
+
+    def encode(self) -> str:
+        payload = json.dumps({'c': self.changed, 'd': self.deleted}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, token: str) -> "SyncCursor":
+        """
+        Raises:
+            ValueError: If the token is not a cursor issued by this service
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            changed, deleted = payload['c'], payload['d']
+            if changed is not None:
+                changed = (_timestamp(changed[0]).isoformat(), str(changed[1]))
+            if deleted is not None:
+                deleted = (_timestamp(deleted[0]).isoformat(), int(deleted[1]))
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError,
+                KeyError, IndexError, TypeError, ValueError):
+            raise ValueError("Invalid sync cursor")
+        return cls(changed=changed, deleted=deleted)
+
+
+def _timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _after(column: str, position: Tuple[str, Any]) -> str:
+    """PostgREST `or` filter for `(column, id) > position`."""
+    value, row_id = position
+    return f'{column}.gt."{value}",and({column}.eq."{value}",id.gt.{row_id})'
+
+
+class SyncService:
+    """Service for delta-sync change feeds."""
+
+    def __init__(self):
+        self.supabase = get_supabase()
+
+    async def get_changes(
+        self,
+        table: str,
+        since: Optional[str] = None,
+        limit: int = settings.SYNC_PAGE_SIZE,
+        columns: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of changes to `table` after the `since` cursor.
+
+        Args:
+            table: Table with a change feed (see SYNC_COLUMNS)
+            since: Cursor returned by the previous call; None for a full sync
+            limit: Maximum rows (and, separately, tombstones) per page
+            columns: Columns to return instead of the feed's defaults
+                (must include id and updated_at)
+
+        Returns:
+            Dict with `items`, `deleted`, `cursor` and `has_more`
+
+        Raises:
+            ValueError: If the cursor is invalid
+            SyncCursorExpired: If tombstones after the cursor may have been pruned
+        """
+        now = datetime.now(timezone.utc)
+        horizon = (now - timedelta(seconds=settings.SYNC_SAFETY_WINDOW)).isoformat()
+
+        if since:
+            cursor = SyncCursor.decode(since)
+            retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+            if cursor.deleted is None or _timestamp(cursor.deleted[0]) < now - retention:
+                raise SyncCursorExpired("Sync cursor has expired; start a full sync")
+        else:
+            # A full sync returns every live row, so earlier deletions are irrelevant
+            cursor = SyncCursor(deleted=(horizon, 0))
+
+        try:
+            # Blocking PostgREST reads: run them off the event loop
+            rows = await run_in_threadpool(
+                self._fetch_changed, table, columns or SYNC_COLUMNS[table], cursor.changed, horizon, limit + 1
+            )
+            tombstones = await run_in_threadpool(self._fetch_deleted, table, cursor.deleted, horizon, limit + 1)
+        except Exception as e:
+            raise Exception(f"Failed to fetch {table} changes: {str(e)}")
+
+        has_more = len(rows) > limit or len(tombstones) > limit
+        rows, tombstones = rows[:limit], tombstones[:limit]
+
+        changed = cursor.changed
+        if rows:
+            changed = (rows[-1]['updated_at'], rows[-1]['id'])
+
+        if len(tombstones) == limit:
+            deleted = (tombstones[-1]['deleted_at'], tombstones[-1]['id'])
+        else:
+            # Caught up: move to the horizon so an idle log never looks expired
+            deleted = (horizon, 0)
+
+        return {
+            'items': rows,
+            'deleted': [tombstone['record_id'] for tombstone in tombstones],
+            'cursor': SyncCursor(changed=changed, deleted=deleted).encode(),
+            'has_more': has_more,
+        }
+
+    def _fetch_changed(
+        self,
+        table: str,
+        columns: str,
+        after: Optional[Tuple[str, str]],
+        horizon: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        query = self.supabase.table(table).select(columns).lte('updated_at', horizon)
+        if after is not None:
+            query = query.or_(_after('updated_at', after))
+        return query.order('updated_at').order('id').limit(limit).execute().data or []
+
+    def _fetch_deleted(
+        self,
+        table: str,
+        after: Tuple[str, int],
+        horizon: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        query = self.supabase.table('deleted_records').select('id, record_id, deleted_at')\
+            .eq('table_name', table)\
+            .lte('deleted_at', horizon)\
+            .or_(_after('deleted_at', after))
+        return query.order('deleted_at').order('id').limit(limit).execute().data or []
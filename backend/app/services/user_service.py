@@ -6,8 +6,25 @@ from datetime import datetime, timedelta
 from uuid import UUID
 from ..db import get_supabase
 from ..core.security import get_password_hash
+from ..core.fields import pick
 import math
 
+# Columns behind each UserResponse field (role comes from the roles join)
+USER_LIST_COLUMNS = {
+    'id': 'id',
+    'email': 'email',
+    'full_name': 'full_name',
+    'arabic_name': 'arabic_name',
+    'user_type': 'user_type',
+    'role': 'roles(name)',
+    'is_active': 'is_active',
+    'phone': 'phone',
+    'address': 'address',
+    'last_login': 'last_login',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
 
 class UserService:
     """User service for CRUD operations"""
@@ -23,17 +40,18 @@ class UserService:
         role: Optional[str] = None,
         is_active: Optional[bool] = None,
         sort_by: str = "created_at",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        fields: Optional[List[str]] = None
     ) -> Dict:
         """
         Get paginated list of users with filtering and sorting
+
+        `fields` limits both the selected columns and the returned item keys.
         """
         try:
             # Build query
-            query = self.supabase.table('users').select(
-                "id, email, full_name, arabic_name, user_type, is_active, phone, address, last_login, created_at, updated_at, roles(name)",
-                count="exact"
-            )
+            columns = [USER_LIST_COLUMNS[name] for name in (fields or USER_LIST_COLUMNS)]
+            query = self.supabase.table('users').select(", ".join(columns), count="exact")
 
             # Apply search filter
             if search:
@@ -69,20 +87,21 @@ class UserService:
             # Transform data
             users = []
             for user in response.data:
-                users.append({
-                    'id': user['id'],
-                    'email': user['email'],
-                    'full_name': user['full_name'],
+                item = {
+                    'id': user.get('id'),
+                    'email': user.get('email'),
+                    'full_name': user.get('full_name'),
                     'arabic_name': user.get('arabic_name'),
-                    'user_type': user['user_type'],
+                    'user_type': user.get('user_type'),
                     'role': user.get('roles', {}).get('name', 'Patron') if user.get('roles') else 'Patron',
-                    'is_active': user['is_active'],
+                    'is_active': user.get('is_active'),
                     'phone': user.get('phone'),
                     'address': user.get('address'),
                     'last_login': user.get('last_login'),
-                    'created_at': user['created_at'],
-                    'updated_at': user['updated_at']
-                })
+                    'created_at': user.get('created_at'),
+                    'updated_at': user.get('updated_at')
+                }
+                users.append(pick(item, fields) if fields else item)
 
             # Calculate pagination
             total_pages = math.ceil(total / page_size) if total > 0 else 0
@@ -99,6 +118,28 @@ class UserService:
             print(f"Error fetching users: {str(e)}")
             raise Exception(f"Failed to fetch users: {str(e)}")
 
+    async def get_user_version(self, user_id: str) -> Optional[Dict]:
+        """
+        Get the fields a user's representation changes with (cheap version check)
+        """
+        try:
+            response = self.supabase.table('users').select(
+                "id, updated_at, roles(name)"
+            ).eq('id', user_id).limit(1).execute()
+
+            if not response.data:
+                return None
+
+            user = response.data[0]
+            return {
+                'id': user['id'],
+                'updated_at': user['updated_at'],
+                'role': user.get('roles', {}).get('name', 'Patron') if user.get('roles') else 'Patron'
+            }
+
+        except Exception as e:
+            raise Exception(f"Failed to fetch user version: {str(e)}")
+
     async def get_user(self, user_id: str) -> Optional[Dict]:
         """
         Get single user by ID
@@ -106,12 +147,12 @@ class UserService:
         try:
             response = self.supabase.table('users').select(
                 "id, email, full_name, arabic_name, user_type, is_active, phone, address, last_login, created_at, updated_at, roles(name)"
-            ).eq('id', user_id).single().execute()
+            ).eq('id', user_id).limit(1).execute()
 
             if not response.data:
                 return None
 
-            user = response.data
+            user = response.data[0]
             return {
                 'id': user['id'],
                 'email': user['email'],
@@ -128,8 +169,7 @@ class UserService:
             }
 
         except Exception as e:
-            print(f"Error fetching user: {str(e)}")
-            return None
+            raise Exception(f"Failed to fetch user: {str(e)}")
 
     async def create_user(self, user_data: Dict) -> Dict:
         """
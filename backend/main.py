@@ -1,5 +1,4 @@
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 import asyncio
@@ -7,7 +6,15 @@ from datetime import datetime
 
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.db.supabase_client import get_supabase
+from app.db.redis import close_redis
+from app.db.postgres import close_postgres, get_postgres
+from app.db.replica import check_replicas, close_replicas, replica_status
+from app.db.listener import close_change_listener, get_change_listener
+from app.core.middleware import install_middleware
+from app.core.resilience import circuit_metrics
+from app.services.search_service import get_search_index
+from app.services.cache_invalidation_service import start_cache_invalidation
+from app.services.health_service import HealthProber, get_health_prober
 
 # Configure logging
 logging.basicConfig(
@@ -16,36 +23,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global variable to track last database ping
-last_db_ping = {"timestamp": None, "status": "not_started"}
-
-
-async def database_keep_alive():
+async def build_search_index():
     """
-    Background task to keep Supabase connection active.
-    Executes a lightweight query every 5 minutes to prevent database auto-pause.
+    Background task to build the typeahead index at startup.
+    Requests build it on demand if this has not finished (or failed).
     """
-    global last_db_ping
-
-    while True:
-        try:
-            # Execute a lightweight query to keep the database active
-            supabase = get_supabase()
-            result = supabase.table('roles').select('id').limit(1).execute()
-
-            # Update last ping status
-            last_db_ping["timestamp"] = datetime.now()
-            last_db_ping["status"] = "healthy"
-
-            logger.info(f"✅ Database keep-alive ping successful at {last_db_ping['timestamp']}")
-
-        except Exception as e:
-            last_db_ping["timestamp"] = datetime.now()
-            last_db_ping["status"] = f"error: {str(e)}"
-            logger.error(f"❌ Database keep-alive ping failed: {str(e)}")
-
-        # Wait 5 minutes before next ping (300 seconds)
-        await asyncio.sleep(300)
+    try:
+        await get_search_index().ensure_ready()
+    except Exception as e:
+        logger.error(f"❌ Search index build failed: {str(e)}")
 
 
 @asynccontextmanager
@@ -58,22 +44,44 @@ async def lifespan(app: FastAPI):
     logger.info(f"📦 Environment: {settings.ENVIRONMENT}")
     logger.info(f"🔗 API Docs: http://localhost:8000/docs")
 
-    # Start database keep-alive background task
-    logger.info("🔄 Starting database keep-alive task...")
-    keep_alive_task = asyncio.create_task(database_keep_alive())
+    # Probe the database in the background (also keeps Supabase from pausing)
+    logger.info("🔄 Starting database health prober...")
+    health_task = asyncio.create_task(get_health_prober().run())
+
+    logger.info("🔎 Building search index...")
+    search_index_task = asyncio.create_task(build_search_index())
+
+    # Measure replica lag up front so reporting reads can use it from the start
+    replica_check_task = asyncio.create_task(check_replicas())
+
+    # Evict cached entries when books, categories, users or roles change anywhere
+    start_cache_invalidation()
 
     yield
 
     # Shutdown
     logger.info("👋 Shutting down NAWRA Library Management System...")
 
-    # Cancel the keep-alive task
-    logger.info("🛑 Stopping database keep-alive task...")
-    keep_alive_task.cancel()
+    # Cancel the health prober
+    logger.info("🛑 Stopping database health prober...")
+    health_task.cancel()
     try:
-        await keep_alive_task
+        await health_task
     except asyncio.CancelledError:
-        logger.info("✅ Database keep-alive task stopped successfully")
+        logger.info("✅ Database health prober stopped successfully")
+
+    search_index_task.cancel()
+    replica_check_task.cancel()
+
+    # Stop listening for change notifications
+    await close_change_listener()
+
+    # Close the shared cache connection
+    await close_redis()
+
+    # Close the direct Postgres pool and the replica pool
+    await close_postgres()
+    await close_replicas()
 
 
 # Initialize FastAPI app
@@ -86,14 +94,8 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS Configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Admission, idempotency, CORS, response encoding and stale labels (shared with api/index.py)
+install_middleware(app)
 
 # Include API router
 app.include_router(api_router, prefix="/api")
@@ -115,39 +117,63 @@ async def root():
 @app.get("/health")
 async def health_check():
     """
-    Enhanced health check endpoint with database connection verification
+    Health check served from the background database prober (no I/O here)
+
+    `database.age_seconds` is how old the last probe is; probes run every
+    HEALTH_PROBE_INTERVAL seconds, once per deployment.
     """
-    global last_db_ping
+    prober = get_health_prober()
+    database = prober.status()
+    return _health_response(database, prober)
 
-    # Check database connection
-    db_status = "unknown"
-    db_error = None
 
-    try:
-        supabase = get_supabase()
-        # Perform a lightweight query to verify connection
-        result = supabase.table('roles').select('id').limit(1).execute()
-        db_status = "healthy"
-    except Exception as e:
-        db_status = "unhealthy"
-        db_error = str(e)
-        logger.error(f"❌ Database health check failed: {str(e)}")
+@app.get("/health/deep")
+async def deep_health_check():
+    """
+    Health check that probes the database now
+
+    Runs at most once per HEALTH_DEEP_MIN_INTERVAL seconds per worker;
+    calls in between get the previous result (`cached: true`).
+    """
+    prober = get_health_prober()
+    database = await prober.deep()
+    return _health_response(database, prober)
+
 
-    # Prepare response
+def _health_response(database: dict, prober: HealthProber) -> dict:
+    last_probe = prober.result or {}
     response = {
-        "status": "healthy" if db_status == "healthy" else "degraded",
+        "status": "healthy" if database["status"] == "healthy" else "degraded",
         "environment": settings.ENVIRONMENT,
         "timestamp": datetime.now().isoformat(),
-        "database": {
-            "status": db_status,
-            "error": db_error,
-        },
+        "database": database,
         "keep_alive": {
-            "status": last_db_ping["status"],
-            "last_ping": last_db_ping["timestamp"].isoformat() if last_db_ping["timestamp"] else None,
+            "status": last_probe.get("status", "not_started"),
+            "last_ping": last_probe.get("checked_at"),
         }
     }
 
+    # Direct Postgres pool usage (hot paths in DIRECT_DB_PATHS)
+    postgres = get_postgres()
+    if postgres is not None:
+        response["database"]["pool"] = {
+            **postgres.stats(),
+            "direct_paths": settings.DIRECT_DB_PATHS,
+        }
+
+    # PostgREST circuit breakers (open: failing fast, cached reads served stale)
+    response["database"]["circuits"] = circuit_metrics()
+
+    # Change notifications evicting cached entries across workers
+    listener = get_change_listener()
+    if listener is not None:
+        response["database"]["listener"] = listener.status()
+
+    # Read replicas (reports, analytics, circulation statistics)
+    replicas = replica_status()
+    if replicas:
+        response["database"]["replicas"] = replicas
+
     return response
 
 
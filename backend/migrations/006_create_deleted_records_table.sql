@@ -0,0 +1,109 @@
+-- =====================================================
+-- Migration: Create Deleted Records Log
+-- Description: Tombstones for the delta-sync API (/sync/books, /sync/categories)
+-- Version: 006
+-- Author: NAWRA Development Team
+-- =====================================================
+
+-- Books and categories are hard-deleted. Sync clients (kiosks, mobile apps)
+-- hold a local copy and need to learn about deletions, so every delete is
+-- recorded here by trigger, including bulk deletes and deletes made outside
+-- the API.
+
+-- =====================================================
+-- Deleted Records Table
+-- =====================================================
+CREATE TABLE IF NOT EXISTS deleted_records (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(63) NOT NULL,
+    record_id UUID NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- =====================================================
+-- Indexes for Performance
+-- =====================================================
+
+-- Keyset scans: WHERE table_name = ? AND (deleted_at, id) > (?, ?) ORDER BY deleted_at, id
+CREATE INDEX IF NOT EXISTS idx_deleted_records_table_deleted_at
+    ON deleted_records(table_name, deleted_at, id);
+
+-- Change feeds: WHERE (updated_at, id) > (?, ?) ORDER BY updated_at, id
+CREATE INDEX IF NOT EXISTS idx_books_updated_at ON books(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_categories_updated_at ON categories(updated_at, id);
+
+-- =====================================================
+-- Triggers
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION log_deleted_record()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO deleted_records (table_name, record_id)
+    VALUES (TG_TABLE_NAME, OLD.id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS log_books_deleted ON books;
+CREATE TRIGGER log_books_deleted
+    AFTER DELETE ON books
+    FOR EACH ROW
+    EXECUTE FUNCTION log_deleted_record();
+
+DROP TRIGGER IF EXISTS log_categories_deleted ON categories;
+CREATE TRIGGER log_categories_deleted
+    AFTER DELETE ON categories
+    FOR EACH ROW
+    EXECUTE FUNCTION log_deleted_record();
+
+-- =====================================================
+-- Helper Functions
+-- =====================================================
+
+-- Drop tombstones older than the retention period (clients with an older
+-- cursor get 410 Gone and must run a full sync). Run periodically.
+CREATE OR REPLACE FUNCTION prune_deleted_records(retention INTERVAL DEFAULT INTERVAL '90 days')
+RETURNS INTEGER AS $$
+DECLARE
+    deleted_count INTEGER;
+BEGIN
+    DELETE FROM deleted_records
+    WHERE deleted_at < NOW() - retention;
+
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- Comments for Documentation
+-- =====================================================
+
+COMMENT ON TABLE deleted_records IS 'Tombstones of hard-deleted rows, read by the delta-sync API';
+COMMENT ON COLUMN deleted_records.table_name IS 'Table the row was deleted from (books, categories)';
+COMMENT ON COLUMN deleted_records.record_id IS 'Primary key of the deleted row';
+COMMENT ON COLUMN deleted_records.deleted_at IS 'When the row was deleted';
+
+-- =====================================================
+-- Grant Permissions
+-- =====================================================
+
+GRANT ALL ON deleted_records TO service_role;
+GRANT USAGE, SELECT ON SEQUENCE deleted_records_id_seq TO service_role;
+
+-- =====================================================
+-- Rollback Script (if needed)
+-- =====================================================
+
+-- DROP TRIGGER IF EXISTS log_books_deleted ON books;
+-- DROP TRIGGER IF EXISTS log_categories_deleted ON categories;
+-- DROP FUNCTION IF EXISTS log_deleted_record();
+-- DROP FUNCTION IF EXISTS prune_deleted_records(INTERVAL);
+-- DROP TABLE IF EXISTS deleted_records;
+-- DROP INDEX IF EXISTS idx_books_updated_at;
+-- DROP INDEX IF EXISTS idx_categories_updated_at;
+
+-- =====================================================
+-- Migration Complete!
+-- =====================================================
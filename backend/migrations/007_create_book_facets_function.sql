@@ -0,0 +1,120 @@
+-- =====================================================
+-- Migration: Create Book Facets Function
+-- Description: Facet counts for catalogue search in one aggregate query
+-- Version: 007
+-- Author: NAWRA Development Team
+-- =====================================================
+
+-- Returns the total match count plus counts per category, language, status
+-- and publication-year bucket for a book search. Called by
+-- BooksService.get_books(..., facets=True) via PostgREST RPC.
+--
+-- Each facet applies every active filter except its own, so the sidebar can
+-- show how many books each alternative value would give ("disjunctive"
+-- faceting). The matching rows are scanned once (the CTE is referenced
+-- several times, so PostgreSQL materialises it).
+--
+-- Arguments mirror BookFilters; NULL means "not filtered".
+
+CREATE OR REPLACE FUNCTION book_facets(
+    p_search TEXT DEFAULT NULL,
+    p_category_id UUID DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_available_only BOOLEAN DEFAULT NULL,
+    p_language TEXT DEFAULT NULL,
+    p_year_from INTEGER DEFAULT NULL,
+    p_year_to INTEGER DEFAULT NULL,
+    p_acquired_from DATE DEFAULT NULL,
+    p_acquired_to DATE DEFAULT NULL,
+    p_year_bucket INTEGER DEFAULT 10
+)
+RETURNS JSONB AS $$
+    WITH matched AS (
+        SELECT
+            b.category_id,
+            c.name AS category_name,
+            b.language,
+            b.status,
+            (b.publication_year / p_year_bucket) * p_year_bucket AS year_bucket,
+            (p_category_id IS NULL OR b.category_id = p_category_id) AS in_category,
+            (p_status IS NULL OR b.status = p_status) AS in_status,
+            (p_language IS NULL OR b.language = p_language) AS in_language,
+            ((p_year_from IS NULL OR b.publication_year >= p_year_from)
+                AND (p_year_to IS NULL OR b.publication_year <= p_year_to)) AS in_years
+        FROM books b
+        LEFT JOIN categories c ON c.id = b.category_id
+        WHERE (p_search IS NULL
+                OR b.title ILIKE '%' || p_search || '%'
+                OR b.title_ar ILIKE '%' || p_search || '%'
+                OR b.author ILIKE '%' || p_search || '%'
+                OR b.author_ar ILIKE '%' || p_search || '%'
+                OR b.isbn ILIKE '%' || p_search || '%')
+            AND (p_available_only IS NOT TRUE OR b.available_quantity > 0)
+            AND (p_acquired_from IS NULL OR b.acquisition_date >= p_acquired_from)
+            AND (p_acquired_to IS NULL OR b.acquisition_date <= p_acquired_to)
+    )
+    SELECT jsonb_build_object(
+        'total', (
+            SELECT COUNT(*) FROM matched
+            WHERE in_category AND in_status AND in_language AND in_years
+        ),
+        'category', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', category_id, 'label', category_name, 'count', n
+            ) ORDER BY n DESC, category_name), '[]'::jsonb)
+            FROM (
+                SELECT category_id, category_name, COUNT(*) AS n FROM matched
+                WHERE in_status AND in_language AND in_years
+                GROUP BY category_id, category_name
+            ) f
+        ),
+        'language', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', language, 'count', n
+            ) ORDER BY n DESC, language), '[]'::jsonb)
+            FROM (
+                SELECT language, COUNT(*) AS n FROM matched
+                WHERE in_category AND in_status AND in_years
+                GROUP BY language
+            ) f
+        ),
+        'status', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', status, 'count', n
+            ) ORDER BY n DESC, status), '[]'::jsonb)
+            FROM (
+                SELECT status, COUNT(*) AS n FROM matched
+                WHERE in_category AND in_language AND in_years
+                GROUP BY status
+            ) f
+        ),
+        'publication_year', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', year_bucket, 'count', n
+            ) ORDER BY year_bucket DESC NULLS LAST), '[]'::jsonb)
+            FROM (
+                SELECT year_bucket, COUNT(*) AS n FROM matched
+                WHERE in_category AND in_status AND in_language
+                GROUP BY year_bucket
+            ) f
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION book_facets IS 'Total and per-facet counts for a book search (each facet ignores its own filter)';
+
+-- =====================================================
+-- Grant Permissions
+-- =====================================================
+
+GRANT EXECUTE ON FUNCTION book_facets TO service_role;
+
+-- =====================================================
+-- Rollback Script (if needed)
+-- =====================================================
+
+-- DROP FUNCTION IF EXISTS book_facets(TEXT, UUID, TEXT, BOOLEAN, TEXT, INTEGER, INTEGER, DATE, DATE, INTEGER);
+
+-- =====================================================
+-- Migration Complete!
+-- =====================================================
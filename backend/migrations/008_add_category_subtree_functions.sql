@@ -0,0 +1,139 @@
+-- =====================================================
+-- Migration: Category Subtree Support
+-- Description: Book counts per category and subtree-aware book facets
+-- Version: 008
+-- Author: NAWRA Development Team
+-- =====================================================
+
+-- Category subtrees are resolved in the API (app.core.category_tree) and
+-- passed down as id lists, so nothing here needs to walk parent_id.
+
+-- =====================================================
+-- Book counts per category
+-- =====================================================
+
+-- One grouped scan instead of a count query per category. Subtree totals
+-- are summed from these in the API.
+CREATE OR REPLACE FUNCTION category_book_counts()
+RETURNS TABLE (category_id UUID, book_count BIGINT) AS $$
+    SELECT b.category_id, COUNT(*)
+    FROM books b
+    WHERE b.category_id IS NOT NULL
+    GROUP BY b.category_id;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION category_book_counts IS 'Number of books directly in each category';
+
+-- =====================================================
+-- Book facets: filter by a set of categories
+-- =====================================================
+
+-- Replaces the single p_category_id argument of migration 007 with
+-- p_category_ids, so "category and its sub-categories" can be faceted.
+DROP FUNCTION IF EXISTS book_facets(TEXT, UUID, TEXT, BOOLEAN, TEXT, INTEGER, INTEGER, DATE, DATE, INTEGER);
+
+CREATE OR REPLACE FUNCTION book_facets(
+    p_search TEXT DEFAULT NULL,
+    p_category_ids UUID[] DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_available_only BOOLEAN DEFAULT NULL,
+    p_language TEXT DEFAULT NULL,
+    p_year_from INTEGER DEFAULT NULL,
+    p_year_to INTEGER DEFAULT NULL,
+    p_acquired_from DATE DEFAULT NULL,
+    p_acquired_to DATE DEFAULT NULL,
+    p_year_bucket INTEGER DEFAULT 10
+)
+RETURNS JSONB AS $$
+    WITH matched AS (
+        SELECT
+            b.category_id,
+            c.name AS category_name,
+            b.language,
+            b.status,
+            (b.publication_year / p_year_bucket) * p_year_bucket AS year_bucket,
+            (p_category_ids IS NULL OR b.category_id = ANY(p_category_ids)) AS in_category,
+            (p_status IS NULL OR b.status = p_status) AS in_status,
+            (p_language IS NULL OR b.language = p_language) AS in_language,
+            ((p_year_from IS NULL OR b.publication_year >= p_year_from)
+                AND (p_year_to IS NULL OR b.publication_year <= p_year_to)) AS in_years
+        FROM books b
+        LEFT JOIN categories c ON c.id = b.category_id
+        WHERE (p_search IS NULL
+                OR b.title ILIKE '%' || p_search || '%'
+                OR b.title_ar ILIKE '%' || p_search || '%'
+                OR b.author ILIKE '%' || p_search || '%'
+                OR b.author_ar ILIKE '%' || p_search || '%'
+                OR b.isbn ILIKE '%' || p_search || '%')
+            AND (p_available_only IS NOT TRUE OR b.available_quantity > 0)
+            AND (p_acquired_from IS NULL OR b.acquisition_date >= p_acquired_from)
+            AND (p_acquired_to IS NULL OR b.acquisition_date <= p_acquired_to)
+    )
+    SELECT jsonb_build_object(
+        'total', (
+            SELECT COUNT(*) FROM matched
+            WHERE in_category AND in_status AND in_language AND in_years
+        ),
+        'category', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', category_id, 'label', category_name, 'count', n
+            ) ORDER BY n DESC, category_name), '[]'::jsonb)
+            FROM (
+                SELECT category_id, category_name, COUNT(*) AS n FROM matched
+                WHERE in_status AND in_language AND in_years
+                GROUP BY category_id, category_name
+            ) f
+        ),
+        'language', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', language, 'count', n
+            ) ORDER BY n DESC, language), '[]'::jsonb)
+            FROM (
+                SELECT language, COUNT(*) AS n FROM matched
+                WHERE in_category AND in_status AND in_years
+                GROUP BY language
+            ) f
+        ),
+        'status', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', status, 'count', n
+            ) ORDER BY n DESC, status), '[]'::jsonb)
+            FROM (
+                SELECT status, COUNT(*) AS n FROM matched
+                WHERE in_category AND in_language AND in_years
+                GROUP BY status
+            ) f
+        ),
+        'publication_year', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                'value', year_bucket, 'count', n
+            ) ORDER BY year_bucket DESC NULLS LAST), '[]'::jsonb)
+            FROM (
+                SELECT year_bucket, COUNT(*) AS n FROM matched
+                WHERE in_category AND in_status AND in_language
+                GROUP BY year_bucket
+            ) f
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION book_facets IS 'Total and per-facet counts for a book search (each facet ignores its own filter)';
+
+-- =====================================================
+-- Grant Permissions
+-- =====================================================
+
+GRANT EXECUTE ON FUNCTION category_book_counts TO service_role;
+GRANT EXECUTE ON FUNCTION book_facets TO service_role;
+
+-- =====================================================
+-- Rollback Script (if needed)
+-- =====================================================
+
+-- DROP FUNCTION IF EXISTS category_book_counts();
+-- DROP FUNCTION IF EXISTS book_facets(TEXT, UUID[], TEXT, BOOLEAN, TEXT, INTEGER, INTEGER, DATE, DATE, INTEGER);
+-- Then re-run 007_create_book_facets_function.sql
+
+-- =====================================================
+-- Migration Complete!
+-- =====================================================
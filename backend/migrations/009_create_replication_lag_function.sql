@@ -0,0 +1,62 @@
+-- =====================================================
+-- Migration: Replication Lag Function
+-- Description: Seconds a read replica is behind its primary
+-- Version: 009
+-- Author: NAWRA Development Team
+-- =====================================================
+
+-- Run on the primary; the function reaches replicas through replication.
+-- The API calls it on the replica (over PostgREST or the direct pool) to
+-- decide whether reporting reads may go there (REPLICA_MAX_LAG).
+
+-- =====================================================
+-- Replication lag
+-- =====================================================
+
+-- 0 on a server that is not in recovery (a primary, or a standalone copy
+-- used as a stand-in replica) and on a replica that is streaming from its
+-- primary and has replayed all the WAL it received; otherwise the age of
+-- the last replayed transaction. Using the replay timestamp alone would
+-- report an idle but up-to-date replica as lagging.
+--
+-- "Replayed all it received" also holds for a replica cut off from its
+-- primary, so 0 additionally requires the WAL receiver to be streaming and
+-- to have heard from the primary within wal_receiver_timeout (the receiver
+-- pings an idle primary after half of it). A disconnected replica falls
+-- back to the replay timestamp, whose age grows until it exceeds
+-- REPLICA_MAX_LAG. NULL if the replica has not replayed anything yet.
+--
+-- SECURITY DEFINER: pg_stat_wal_receiver hides its columns from roles
+-- without pg_read_all_stats, such as service_role.
+CREATE OR REPLACE FUNCTION replication_lag()
+RETURNS DOUBLE PRECISION AS $$
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() AND EXISTS (
+            SELECT 1
+            FROM pg_stat_wal_receiver
+            WHERE status = 'streaming'
+              AND (current_setting('wal_receiver_timeout')::interval = interval '0'
+                   OR last_msg_receipt_time > now() - current_setting('wal_receiver_timeout')::interval)
+        ) THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END::DOUBLE PRECISION;
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER SET search_path = pg_catalog;
+
+COMMENT ON FUNCTION replication_lag IS 'Seconds this server lags its primary (0 when not a lagging replica)';
+
+-- =====================================================
+-- Grant Permissions
+-- =====================================================
+
+GRANT EXECUTE ON FUNCTION replication_lag TO service_role;
+
+-- =====================================================
+-- Rollback Script (if needed)
+-- =====================================================
+
+-- DROP FUNCTION IF EXISTS replication_lag();
+
+-- =====================================================
+-- Migration Complete!
+-- =====================================================
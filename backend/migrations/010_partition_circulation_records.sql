@@ -0,0 +1,256 @@
+-- =====================================================
+-- Migration: Partition Circulation Records by Year
+-- Description: Range-partition circulation_records on issue_date (one
+--              partition per year) and move the existing rows across
+-- Version: 010
+-- Author: NAWRA Development Team
+-- =====================================================
+
+-- Scans bounded by issue_date (reports, analytics, the archive job) only
+-- touch the years they ask for, and each year's indexes stay the size of
+-- that year. Loans returned more than CIRCULATION_RETENTION_DAYS ago are moved
+-- out to Parquet files by scripts/archive_circulation.py.
+--
+-- A partitioned table's primary key must include the partition key, so the
+-- key becomes (id, issue_date); ids are still generated UUIDs and lookups by
+-- id alone use the per-partition key index.
+--
+-- Runs in one transaction and holds an exclusive lock on the table while the
+-- rows are copied; run it in a maintenance window.
+
+BEGIN;
+
+-- =====================================================
+-- Set the current table aside
+-- =====================================================
+
+-- Views over the table are recreated below against the new one
+DROP VIEW IF EXISTS overdue_loans;
+DROP VIEW IF EXISTS active_loans;
+DROP VIEW IF EXISTS user_fines_summary;
+
+ALTER TABLE circulation_records RENAME TO circulation_records_unpartitioned;
+ALTER INDEX circulation_records_pkey RENAME TO circulation_records_unpartitioned_pkey;
+
+-- =====================================================
+-- Partitioned Circulation Records Table
+-- =====================================================
+CREATE TABLE circulation_records (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+
+    -- Foreign Keys
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    book_id UUID NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+
+    -- Circulation Dates
+    issue_date DATE NOT NULL,
+    due_date DATE NOT NULL,
+    return_date DATE,
+
+    -- Book Condition
+    book_condition VARCHAR(20) CHECK (book_condition IN ('good', 'fair', 'damaged')),
+
+    -- Fines
+    fine_amount DECIMAL(10, 3) DEFAULT 0.000,
+    fine_paid BOOLEAN DEFAULT FALSE,
+
+    -- Additional Information
+    notes TEXT,
+
+    -- Timestamps
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    -- Renewals (migration 001)
+    renewal_count INTEGER DEFAULT 0,
+
+    -- Constraints
+    CONSTRAINT circulation_records_pkey PRIMARY KEY (id, issue_date),
+    CONSTRAINT check_dates CHECK (due_date >= issue_date),
+    CONSTRAINT check_return_date CHECK (return_date IS NULL OR return_date >= issue_date),
+    CONSTRAINT check_fine_amount CHECK (fine_amount >= 0)
+) PARTITION BY RANGE (issue_date);
+
+-- Catches any issue_date without a yearly partition, so inserts never fail
+CREATE TABLE circulation_records_default PARTITION OF circulation_records DEFAULT;
+
+-- =====================================================
+-- Yearly partitions
+-- =====================================================
+
+-- Create circulation_records_yYYYY for each year in the range that lacks
+-- one. Rows of that year already sitting in the default partition are
+-- moved into the new partition. Returns the number of partitions created.
+CREATE OR REPLACE FUNCTION ensure_circulation_partitions(p_from_year INTEGER, p_to_year INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_year INTEGER;
+    v_name TEXT;
+    v_from DATE;
+    v_to DATE;
+    v_created INTEGER := 0;
+BEGIN
+    FOR v_year IN p_from_year..p_to_year LOOP
+        v_name := format('circulation_records_y%s', v_year);
+        CONTINUE WHEN to_regclass(v_name) IS NOT NULL;
+
+        v_from := make_date(v_year, 1, 1);
+        v_to := make_date(v_year + 1, 1, 1);
+
+        EXECUTE format('CREATE TABLE %I (LIKE circulation_records INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM circulation_records_default WHERE issue_date >= $1 AND issue_date < $2 RETURNING *)
+             INSERT INTO %I SELECT * FROM moved',
+            v_name
+        ) USING v_from, v_to;
+        EXECUTE format(
+            'ALTER TABLE circulation_records ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            v_name, v_from, v_to
+        );
+        v_created := v_created + 1;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION ensure_circulation_partitions IS 'Create yearly circulation_records partitions for a range of years';
+
+-- One partition per year with loans, through next year
+SELECT ensure_circulation_partitions(
+    COALESCE((SELECT EXTRACT(YEAR FROM MIN(issue_date))::INTEGER FROM circulation_records_unpartitioned),
+             EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER),
+    EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1
+);
+
+-- =====================================================
+-- Move the existing rows
+-- =====================================================
+
+INSERT INTO circulation_records (
+    id, user_id, book_id, issue_date, due_date, return_date, book_condition,
+    fine_amount, fine_paid, notes, created_at, updated_at, renewal_count
+)
+SELECT
+    id, user_id, book_id, issue_date, due_date, return_date, book_condition,
+    fine_amount, fine_paid, notes, created_at, updated_at, renewal_count
+FROM circulation_records_unpartitioned;
+
+DROP TABLE circulation_records_unpartitioned;
+
+-- =====================================================
+-- Indexes (created on every partition)
+-- =====================================================
+
+CREATE INDEX idx_circulation_user_id ON circulation_records(user_id);
+CREATE INDEX idx_circulation_book_id ON circulation_records(book_id);
+CREATE INDEX idx_circulation_issue_date ON circulation_records(issue_date DESC);
+CREATE INDEX idx_circulation_due_date ON circulation_records(due_date);
+CREATE INDEX idx_circulation_return_date ON circulation_records(return_date) WHERE return_date IS NOT NULL;
+CREATE INDEX idx_circulation_unreturned ON circulation_records(user_id, due_date) WHERE return_date IS NULL;
+CREATE INDEX idx_circulation_overdue ON circulation_records(due_date) WHERE return_date IS NULL;
+CREATE INDEX idx_circulation_unpaid_fines ON circulation_records(user_id, fine_amount) WHERE fine_paid = FALSE AND fine_amount > 0;
+CREATE INDEX idx_circulation_fine_paid ON circulation_records(fine_paid);
+CREATE INDEX idx_circulation_user_status ON circulation_records(user_id, return_date, due_date);
+CREATE INDEX idx_circulation_book_status ON circulation_records(book_id, return_date);
+
+-- =====================================================
+-- Trigger for Updated At
+-- =====================================================
+
+CREATE TRIGGER update_circulation_records_updated_at
+    BEFORE UPDATE ON circulation_records
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- =====================================================
+-- Views (as in migration 003)
+-- =====================================================
+
+CREATE OR REPLACE VIEW active_loans AS
+SELECT
+    cr.id,
+    cr.user_id,
+    u.full_name AS user_name,
+    u.email AS user_email,
+    cr.book_id,
+    b.title AS book_title,
+    b.author AS book_author,
+    b.isbn,
+    cr.issue_date,
+    cr.due_date,
+    CURRENT_DATE - cr.due_date AS days_overdue,
+    calculate_fine_amount(cr.due_date, NULL) AS current_fine,
+    cr.fine_amount,
+    cr.fine_paid,
+    CASE
+        WHEN cr.due_date < CURRENT_DATE THEN 'overdue'
+        WHEN cr.due_date = CURRENT_DATE THEN 'due_today'
+        ELSE 'active'
+    END AS status
+FROM circulation_records cr
+JOIN users u ON cr.user_id = u.id
+JOIN books b ON cr.book_id = b.id
+WHERE cr.return_date IS NULL;
+
+CREATE OR REPLACE VIEW overdue_loans AS
+SELECT *
+FROM active_loans
+WHERE status = 'overdue';
+
+CREATE OR REPLACE VIEW user_fines_summary AS
+SELECT
+    u.id AS user_id,
+    u.full_name,
+    u.email,
+    COUNT(cr.id) AS total_loans,
+    COUNT(cr.id) FILTER (WHERE cr.return_date IS NULL) AS active_loans,
+    COUNT(cr.id) FILTER (WHERE cr.return_date IS NULL AND cr.due_date < CURRENT_DATE) AS overdue_loans,
+    COALESCE(SUM(cr.fine_amount) FILTER (WHERE cr.fine_paid = FALSE), 0.000) AS unpaid_fines,
+    COALESCE(SUM(cr.fine_amount) FILTER (WHERE cr.fine_paid = TRUE), 0.000) AS paid_fines,
+    COALESCE(SUM(cr.fine_amount), 0.000) AS total_fines
+FROM users u
+LEFT JOIN circulation_records cr ON u.id = cr.user_id
+WHERE u.user_type = 'patron'
+GROUP BY u.id, u.full_name, u.email;
+
+-- =====================================================
+-- Comments for Documentation
+-- =====================================================
+
+COMMENT ON TABLE circulation_records IS 'Records of book checkouts, returns, and associated fines (partitioned by issue_date year)';
+COMMENT ON COLUMN circulation_records.issue_date IS 'Date when book was checked out (partition key)';
+COMMENT ON COLUMN circulation_records.due_date IS 'Date when book should be returned';
+COMMENT ON COLUMN circulation_records.return_date IS 'Actual date when book was returned (NULL if not yet returned)';
+COMMENT ON COLUMN circulation_records.fine_amount IS 'Fine amount in OMR for overdue return';
+COMMENT ON COLUMN circulation_records.fine_paid IS 'Whether the fine has been paid';
+
+-- =====================================================
+-- Grant Permissions
+-- =====================================================
+
+GRANT ALL ON circulation_records TO service_role;
+GRANT EXECUTE ON FUNCTION ensure_circulation_partitions TO service_role;
+
+COMMIT;
+
+-- =====================================================
+-- Rollback Script (if needed)
+-- =====================================================
+
+-- Archived years (Parquet files) are not restored by this.
+-- BEGIN;
+-- DROP VIEW IF EXISTS overdue_loans;
+-- DROP VIEW IF EXISTS active_loans;
+-- DROP VIEW IF EXISTS user_fines_summary;
+-- ALTER TABLE circulation_records RENAME TO circulation_records_partitioned;
+-- ALTER INDEX circulation_records_pkey RENAME TO circulation_records_partitioned_pkey;
+-- Re-run the table, index and trigger sections of 003 and 001, then:
+-- INSERT INTO circulation_records SELECT * FROM circulation_records_partitioned;
+-- DROP TABLE circulation_records_partitioned CASCADE;
+-- DROP FUNCTION IF EXISTS ensure_circulation_partitions(INTEGER, INTEGER);
+-- Re-create the views from 003.
+-- COMMIT;
+
+-- =====================================================
+-- Migration Complete!
+-- =====================================================
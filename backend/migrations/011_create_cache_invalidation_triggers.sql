@@ -0,0 +1,78 @@
+-- =====================================================
+-- Migration: Cache Invalidation Notifications
+-- Description: NOTIFY the API of every change to books, categories, users
+--              and roles, so each worker evicts its cached copies
+-- Version: 011
+-- Author: NAWRA Development Team
+-- =====================================================
+
+-- Every API worker keeps a LISTEN connection on the "cache_invalidation"
+-- channel (app/db/listener.py). Changes are announced whatever made them:
+-- the API, scripts such as update_book_status.py, or the Supabase dashboard.
+--
+-- Notifications are sent when the transaction commits, and identical ones
+-- within a transaction are sent once. A bulk write sends one per row; the
+-- API coalesces them into a single eviction per batch. `txid` identifies
+-- the writing transaction: every worker evicts its own copies, and one
+-- worker per transaction (claimed in Redis) clears the shared tier.
+
+-- =====================================================
+-- Notification trigger
+-- =====================================================
+
+-- Payload: {"table": "books", "op": "UPDATE", "id": "<uuid>", "txid": 1234}
+CREATE OR REPLACE FUNCTION notify_cache_invalidation()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'cache_invalidation',
+        json_build_object(
+            'table', TG_TABLE_NAME,
+            'op', TG_OP,
+            'id', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+            'txid', txid_current()
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION notify_cache_invalidation IS 'Announce a row change on the cache_invalidation channel';
+
+DROP TRIGGER IF EXISTS notify_books_changed ON books;
+CREATE TRIGGER notify_books_changed
+    AFTER INSERT OR UPDATE OR DELETE ON books
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS notify_categories_changed ON categories;
+CREATE TRIGGER notify_categories_changed
+    AFTER INSERT OR UPDATE OR DELETE ON categories
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS notify_users_changed ON users;
+CREATE TRIGGER notify_users_changed
+    AFTER INSERT OR UPDATE OR DELETE ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS notify_roles_changed ON roles;
+CREATE TRIGGER notify_roles_changed
+    AFTER INSERT OR UPDATE OR DELETE ON roles
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_cache_invalidation();
+
+-- =====================================================
+-- Rollback Script (if needed)
+-- =====================================================
+
+-- DROP TRIGGER IF EXISTS notify_books_changed ON books;
+-- DROP TRIGGER IF EXISTS notify_categories_changed ON categories;
+-- DROP TRIGGER IF EXISTS notify_users_changed ON users;
+-- DROP TRIGGER IF EXISTS notify_roles_changed ON roles;
+-- DROP FUNCTION IF EXISTS notify_cache_invalidation();
+
+-- =====================================================
+-- Migration Complete!
+-- =====================================================
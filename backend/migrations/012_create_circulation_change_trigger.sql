@@ -0,0 +1,76 @@
+-- =====================================================
+-- Migration: Circulation Change Notifications
+-- Description: NOTIFY the API of every change to circulation_records, with
+--              the loan before and after, for the live circulation feed
+-- Version: 012
+-- Author: NAWRA Development Team
+-- =====================================================
+
+-- Sent on the "cache_invalidation" channel of migration 011, which every API
+-- worker already listens on. Workers evict the loaned book's cached
+-- availability and pass the change to the circulation feed
+-- (GET /circulation/events), which turns old -> new into counter deltas.
+--
+-- circulation_records is partitioned (migration 010); the trigger is
+-- created on every partition, so the table name is spelled out rather than
+-- taken from TG_TABLE_NAME.
+
+-- =====================================================
+-- Notification trigger
+-- =====================================================
+
+-- The loan fields the feed needs (no notes: payloads are limited to 8000 bytes)
+CREATE OR REPLACE FUNCTION circulation_change_payload(r circulation_records)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'id', r.id,
+        'book_id', r.book_id,
+        'user_id', r.user_id,
+        'issue_date', r.issue_date,
+        'due_date', r.due_date,
+        'return_date', r.return_date,
+        'fine_amount', r.fine_amount,
+        'fine_paid', r.fine_paid,
+        'renewal_count', r.renewal_count
+    );
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Payload: {"table": "circulation_records", "op": "UPDATE", "id": "<uuid>",
+--           "old": {...} | null, "new": {...} | null}
+CREATE OR REPLACE FUNCTION notify_circulation_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'cache_invalidation',
+        json_build_object(
+            'table', 'circulation_records',
+            'op', TG_OP,
+            'id', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+            'txid', txid_current(),
+            'old', CASE WHEN TG_OP <> 'INSERT' THEN circulation_change_payload(OLD) END,
+            'new', CASE WHEN TG_OP <> 'DELETE' THEN circulation_change_payload(NEW) END
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION notify_circulation_change IS 'Announce a loan change on the cache_invalidation channel';
+
+DROP TRIGGER IF EXISTS notify_circulation_changed ON circulation_records;
+CREATE TRIGGER notify_circulation_changed
+    AFTER INSERT OR UPDATE OR DELETE ON circulation_records
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_circulation_change();
+
+-- =====================================================
+-- Rollback Script (if needed)
+-- =====================================================
+
+-- DROP TRIGGER IF EXISTS notify_circulation_changed ON circulation_records;
+-- DROP FUNCTION IF EXISTS notify_circulation_change();
+-- DROP FUNCTION IF EXISTS circulation_change_payload(circulation_records);
+
+-- =====================================================
+-- Migration Complete!
+-- =====================================================
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Move old circulation history out of the database into Parquet files.
+
+Loans returned more than CIRCULATION_RETENTION_DAYS ago, with no fine left
+to collect, are written to CIRCULATION_ARCHIVE_DIR (one directory per
+issue year, zstd-compressed Parquet) and deleted from circulation_records,
+a month per transaction. Reports keep reading them from the files. The run
+also creates this year's and next year's circulation_records partitions.
+
+Needs DATABASE_URL and the 'pyarrow' package. Run it from cron, e.g. nightly:
+
+    0 2 * * * cd backend && python scripts/archive_circulation.py
+
+Usage:
+    python scripts/archive_circulation.py [--before YYYY-MM-DD]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.postgres import close_postgres
+from app.services.circulation_history_service import CirculationHistoryService
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--before", type=date.fromisoformat,
+                        help="Archive loans returned before this date (default: the retention window)")
+    args = parser.parse_args()
+
+    try:
+        archived = await CirculationHistoryService().archive_returned_loans(before=args.before)
+    finally:
+        await close_postgres()
+
+    for month, count in archived.items():
+        print(f"{month}: {count} records archived")
+    print(f"Total: {sum(archived.values())} records archived")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark negotiated response encodings against plain JSON.
+
+For a catalogue page, a circulation export and an analytics series, reports
+body size and encode/decode CPU time for JSON and MessagePack, each plain,
+gzip- and brotli-compressed, using the same settings as
+ResponseEncodingMiddleware.
+
+Usage:
+    python scripts/benchmark_encoding.py [--rows 1000] [--runs 5]
+"""
+import argparse
+import gzip
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import brotli
+import msgpack
+import orjson
+
+from app.core.encoding import ResponseEncodingMiddleware
+from benchmark_serialization import book_row, circulation_row
+
+middleware = ResponseEncodingMiddleware(app=None)
+
+FORMATS: Dict[str, tuple] = {
+    "json": (orjson.dumps, orjson.loads),
+    "msgpack": (msgpack.packb, msgpack.unpackb),
+}
+
+COMPRESSIONS: Dict[str, tuple] = {
+    "": (lambda body: body, lambda body: body),
+    "+gzip": (lambda body: middleware.compress(body, "gzip"), gzip.decompress),
+    "+br": (lambda body: middleware.compress(body, "br"), brotli.decompress),
+}
+
+
+def payloads(rows: int) -> Dict[str, Any]:
+    today = date.today()
+    return {
+        "catalogue page": {"items": [book_row(i) for i in range(rows)], "meta": {"total": rows}},
+        "circulation export": [circulation_row(i) for i in range(rows)],
+        "analytics series": [
+            {"date": (today - timedelta(days=i)).isoformat(), "checkouts": i % 97, "returns": i % 89}
+            for i in range(rows)
+        ],
+    }
+
+
+def best_ms(fn: Callable[[], Any], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per payload")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    for name, data in payloads(args.rows).items():
+        baseline = len(orjson.dumps(data))
+        print(f"\n{name} ({args.rows} rows)")
+        print(f"  {'encoding':<16} {'bytes':>10} {'vs json':>8} {'encode ms':>10} {'decode ms':>10}")
+        for fmt, (dumps, loads) in FORMATS.items():
+            for suffix, (compress, decompress) in COMPRESSIONS.items():
+                body = compress(dumps(data))
+                encode = best_ms(lambda: compress(dumps(data)), args.runs)
+                decode = best_ms(lambda: loads(decompress(body)), args.runs)
+                print(
+                    f"  {fmt + suffix:<16} {len(body):>10} {len(body) / baseline:>7.0%} "
+                    f"{encode:>10.2f} {decode:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
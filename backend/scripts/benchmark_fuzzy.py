@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark "did you mean" corrections: lookup latency against catalogue size.
+
+Builds the TrigramIndex from synthetic titles and author names (pseudo-words
+drawn with a Zipf-like distribution, so the vocabulary grows with the
+catalogue the way real ones do), then times corrections of misspelled words
+(one random insertion, deletion, substitution or transposition) and reports
+how often the intended word is the top suggestion.
+
+Usage:
+    python scripts/benchmark_fuzzy.py [--sizes 10000,100000,500000] [--queries 2000]
+"""
+import argparse
+from itertools import accumulate
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.trigram_index import TrigramIndex
+
+SYLLABLES = [c + v for c in "bdfhjklmnrstwyz" for v in "aeiou"] + ["al", "sha", "kh", "ou", "ee"]
+
+
+def vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def misspell(rng: random.Random, word: str) -> str:
+    i = rng.randrange(len(word))
+    edit = rng.choice(("insert", "delete", "substitute", "transpose"))
+    if edit == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if edit == "delete" and len(word) > 4:
+        return word[:i] + word[i + 1:]
+    if edit == "transpose" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(string.ascii_lowercase.replace(word[i], '')) + word[i + 1:]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,500000", help="Comma-separated book counts")
+    parser.add_argument("--queries", type=int, default=2000, help="Misspelled lookups per size")
+    args = parser.parse_args()
+
+    print(f"{'books':>8} {'words':>8} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8} {'top-1':>6}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        rng = random.Random(size)
+        words = vocabulary(rng, max(1000, size // 4))
+        cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+        texts = []
+        for _ in range(size):
+            texts.append(' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(2, 6))))  # title
+            texts.append(' '.join(rng.choices(words, cum_weights=cum_weights, k=2)))  # author
+
+        started = time.perf_counter()
+        index = TrigramIndex.build(texts)
+        build_s = time.perf_counter() - started
+
+        targets = [word for word in rng.choices(list(index._ids), k=args.queries) if len(word) >= 5]
+        latencies, hits = [], 0
+        for target in targets:
+            typo = misspell(rng, target)
+            started = time.perf_counter()
+            suggestions = index.suggest(typo, limit=3)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += bool(suggestions) and suggestions[0] == target
+
+        print(
+            f"{size:>8} {len(index):>8} {build_s:>8.1f} {percentile(latencies, 0.5):>8.3f} "
+            f"{percentile(latencies, 0.99):>8.3f} {hits / len(targets):>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
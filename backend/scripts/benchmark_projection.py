@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark column projection on a 100-row books page.
+
+Compares `select('*')` with the BookListItem projection and a sparse
+`fields=id,title,author,available_quantity` subset, reporting payload size
+and median latency against the configured Supabase project.
+
+Usage:
+    python scripts/benchmark_projection.py [--rows 100] [--runs 20]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import get_supabase
+from app.services.books_service import BOOK_LIST_COLUMNS
+
+VARIANTS = {
+    "select *": "*",
+    "BookListItem columns": ",".join(BOOK_LIST_COLUMNS),
+    "fields=id,title,author,available_quantity": "id,title,author,available_quantity",
+}
+
+
+def measure(columns: str, rows: int, runs: int) -> dict:
+    """Fetch one page `runs` times and return payload bytes and latency stats."""
+    supabase = get_supabase()
+    timings = []
+    payload_bytes = 0
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = supabase.table('books')\
+            .select(columns)\
+            .order('created_at', desc=True)\
+            .range(0, rows - 1)\
+            .execute()
+        timings.append((time.perf_counter() - started) * 1000)
+        payload_bytes = len(json.dumps(response.data).encode())
+
+    return {
+        "bytes": payload_bytes,
+        "p50_ms": statistics.median(timings),
+        "min_ms": min(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100, help="Page size")
+    parser.add_argument("--runs", type=int, default=20, help="Requests per variant")
+    args = parser.parse_args()
+
+    # Warm up the connection so the first variant is not penalised
+    measure("id", 1, 2)
+
+    results = {name: measure(columns, args.rows, args.runs) for name, columns in VARIANTS.items()}
+    baseline = results["select *"]
+
+    print(f"{'variant':<45} {'bytes':>10} {'saved':>7} {'p50 ms':>9} {'min ms':>9}")
+    for name, result in results.items():
+        saved = 1 - result["bytes"] / baseline["bytes"] if baseline["bytes"] else 0
+        print(
+            f"{name:<45} {result['bytes']:>10} {saved:>6.0%} "
+            f"{result['p50_ms']:>9.1f} {result['min_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark list-response serialization: default FastAPI path vs fast path.
+
+Default path: per-row model construction, response_model re-validation,
+jsonable_encoder and json.dumps (what FastAPI does for a returned value).
+Fast path: one TypeAdapter call over the page (books) or trusted dict rows
+(users, circulation) rendered by FastJSONResponse.
+
+Rows are synthetic, so no database is needed.
+
+Usage:
+    python scripts/benchmark_serialization.py [--sizes 100,1000,10000] [--runs 5]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.models.books import BookListItem, BookListResponse, PaginationMeta
+from app.models.circulation import CirculationListResponse
+from app.models.user import UserListResponse
+
+NOW = datetime.now(timezone.utc).isoformat()
+
+
+def book_row(i: int) -> Dict[str, Any]:
+    return {
+        'id': str(uuid.uuid4()), 'isbn': f"978{i:010d}", 'barcode': f"BC{i:08d}",
+        'title': f"Book title {i}", 'title_ar': f"عنوان الكتاب {i}",
+        'author': f"Author {i % 500}", 'author_ar': f"المؤلف {i % 500}",
+        'publisher': "Ministry Press", 'publication_year': 1990 + i % 35,
+        'category_id': str(uuid.uuid4()), 'language': 'ar' if i % 2 else 'en',
+        'cover_image_url': None, 'thumbnail_url': None,
+        'quantity': 3, 'available_quantity': i % 4, 'status': 'available', 'created_at': NOW,
+    }
+
+
+def user_row(i: int) -> Dict[str, Any]:
+    return {
+        'id': str(uuid.uuid4()), 'email': f"user{i}@nawra.om", 'full_name': f"User {i}",
+        'arabic_name': f"مستخدم {i}", 'user_type': 'patron', 'role': 'Patron', 'is_active': True,
+        'phone': '+96890000000', 'address': 'Muscat', 'last_login': None,
+        'created_at': NOW, 'updated_at': NOW,
+    }
+
+
+def circulation_row(i: int) -> Dict[str, Any]:
+    due = date.today() + timedelta(days=i % 30 - 10)
+    return {
+        'id': str(uuid.uuid4()), 'user_id': str(uuid.uuid4()), 'user_name': f"User {i}",
+        'user_role': 'Patron', 'book_id': str(uuid.uuid4()), 'book_title': f"Book title {i}",
+        'book_isbn': f"978{i:010d}", 'category': 'Fiction', 'shelf_location': 'A-1',
+        'issue_date': (due - timedelta(days=14)).isoformat(), 'due_date': due.isoformat(),
+        'return_date': None, 'status': 'active', 'book_condition': None, 'fine_amount': None,
+        'fine_paid': False, 'days_left': i % 30 - 10, 'notes': None,
+        'created_at': NOW, 'updated_at': NOW,
+    }
+
+
+def page(items: List[Any], size: int) -> Dict[str, Any]:
+    return {'items': items, 'total': size, 'page': 1, 'page_size': size, 'total_pages': 1}
+
+
+def render_default(model: type, content: Any) -> bytes:
+    """What FastAPI does for `return content` with response_model=model."""
+    field = create_model_field(name="response", type_=model, mode="serialization")
+    data = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(data).body
+
+
+def timed(fn: Callable[[], bytes], runs: int) -> tuple:
+    best = float("inf")
+    body = b""
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated row counts")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    book_list_adapter = TypeAdapter(List[BookListItem])
+
+    print(f"{'resource':<12} {'rows':>6} {'default ms':>11} {'fast ms':>9} {'speedup':>8} {'bytes':>10}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        books = [book_row(i) for i in range(size)]
+        users = [user_row(i) for i in range(size)]
+        loans = [circulation_row(i) for i in range(size)]
+        meta = PaginationMeta(
+            total=size, page=1, page_size=size, total_pages=1, has_next=False, has_prev=False
+        )
+
+        cases = {
+            "books": (
+                lambda: render_default(
+                    BookListResponse,
+                    BookListResponse(items=[BookListItem(**b) for b in books], meta=meta)
+                ),
+                lambda: FastJSONResponse(BookListResponse.model_construct(
+                    items=book_list_adapter.validate_python(books), meta=meta
+                )).body,
+            ),
+            "users": (
+                lambda: render_default(UserListResponse, page(users, size)),
+                lambda: FastJSONResponse(page(users, size)).body,
+            ),
+            "circulation": (
+                lambda: render_default(CirculationListResponse, page(loans, size)),
+                lambda: FastJSONResponse(page(loans, size)).body,
+            ),
+        }
+
+        for name, (default_fn, fast_fn) in cases.items():
+            default_ms, _ = timed(default_fn, args.runs)
+            fast_ms, fast_bytes = timed(fast_fn, args.runs)
+            print(
+                f"{name:<12} {size:>6} {default_ms:>11.2f} {fast_ms:>9.2f} "
+                f"{default_ms / fast_ms:>7.1f}x {fast_bytes:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the typeahead prefix index: build time, memory and lookup latency.
+
+Indexes synthetic books (English and Arabic titles and authors, ISBNs) the
+same way CatalogSearchIndex does, then reports retained memory (tracemalloc)
+and latency percentiles for random 1-8 character prefixes, plus the cost of
+single-book updates.
+
+Usage:
+    python scripts/benchmark_suggest.py [--books 500000] [--queries 20000]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.prefix_index import PrefixIndex
+
+EN_WORDS = (
+    "history of the modern arab world oman sea trade islamic science poetry "
+    "introduction to library information management children stories desert "
+    "river city night garden memory mountain journey knowledge law economics"
+).split()
+AR_WORDS = (
+    "تاريخ عمان الحديث البحر التجارة العلوم الإسلامية الشعر مقدمة في المكتبات "
+    "المعلومات إدارة قصص الأطفال الصحراء النهر المدينة الليل الحديقة الذاكرة "
+    "الجبل رحلة المعرفة القانون الاقتصاد"
+).split()
+FIRST_NAMES = "Ahmed Fatima Said Aisha Naguib Salim Maryam Khalid Layla Hamad".split()
+LAST_NAMES = "Al-Busaidi Mahfouz Al-Harthy Al-Rawahi Al-Kindi Al-Balushi Said Hussein".split()
+AR_NAMES = "أحمد فاطمة سعيد عائشة نجيب سالم مريم خالد ليلى حمد البوسعيدي محفوظ الحارثي الرواحي".split()
+
+
+def book(rng: random.Random, i: int) -> Dict[str, Optional[str]]:
+    return {
+        'title': ' '.join(rng.choices(EN_WORDS, k=rng.randint(2, 7))).title() + f" {i % 97}",
+        'title_ar': ' '.join(rng.choices(AR_WORDS, k=rng.randint(2, 6))) if i % 2 else None,
+        'author': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'author_ar': ' '.join(rng.choices(AR_NAMES, k=2)) if i % 2 else None,
+        'isbn': f"978-{i:010d}",
+    }
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=500_000, help="Books to index")
+    parser.add_argument("--queries", type=int, default=20_000, help="Random prefix lookups")
+    parser.add_argument("--updates", type=int, default=1_000, help="Single-book add/remove operations")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    documents = [(str(uuid.UUID(int=rng.getrandbits(128))), book(rng, i)) for i in range(args.books)]
+
+    started = time.perf_counter()
+    index = PrefixIndex.build(documents)
+    build_s = time.perf_counter() - started
+
+    # Second, traced build for memory (tracing slows the build several times over)
+    del index
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    index = PrefixIndex.build(documents)
+    retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, 'filename'))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"books:            {len(index):,}")
+    print(f"keys:             {index.entry_count:,}")
+    print(f"build:            {build_s:.2f} s")
+    print(f"memory retained:  {retained / 2**20:,.1f} MiB ({retained / len(index):,.0f} B/book)")
+    print(f"memory peak:      {peak / 2**20:,.1f} MiB (during build)")
+
+    vocabulary = EN_WORDS + AR_WORDS + FIRST_NAMES + LAST_NAMES + AR_NAMES + ["978-00001"]
+    queries = [word[:rng.randint(1, min(8, len(word)))] for word in rng.choices(vocabulary, k=args.queries)]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=8)
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(
+        f"lookup (limit 8): p50 {percentile(latencies, 0.5):.3f} ms, "
+        f"p99 {percentile(latencies, 0.99):.3f} ms, max {max(latencies):.3f} ms"
+    )
+
+    started = time.perf_counter()
+    for i in range(args.updates):
+        doc_id, fields = documents[rng.randrange(len(documents))]
+        index.add(doc_id, dict(fields, title=f"Revised {fields['title']}"))
+    update_ms = (time.perf_counter() - started) * 1000 / args.updates
+    started = time.perf_counter()
+    for doc_id, _ in rng.sample(documents, args.updates):
+        index.remove(doc_id)
+    remove_ms = (time.perf_counter() - started) * 1000 / args.updates
+    print(f"update:           {update_ms:.3f} ms/book, remove {remove_ms:.3f} ms/book")
+
+
+if __name__ == "__main__":
+    main()
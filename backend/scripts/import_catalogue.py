@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Import a catalogue file (CSV, JSON lines or MARC 21) into the books table.
+
+Runs the same pipeline as POST /books/import, reading the file straight from
+disk. Progress is checkpointed next to the file after every batch
+(<file>.import-checkpoint.json); if the import is interrupted, run the same
+command with --resume to continue after the last committed batch. The
+checkpoint is ignored if the file has changed since.
+
+For large migrations set DATABASE_URL and DIRECT_DB_PATHS=books.import so
+batches are loaded with COPY instead of PostgREST inserts.
+
+Usage:
+    python scripts/import_catalogue.py legacy.mrc [--format marc]
+                                       [--on-duplicate skip|update]
+                                       [--batch-size 1000] [--resume]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.catalog_formats import FORMATS, read_records, resolve_format
+from app.db.postgres import close_postgres
+from app.services.import_service import ON_DUPLICATE, CatalogImportService
+
+
+def fingerprint(path: Path) -> Dict[str, Any]:
+    stat = path.stat()
+    return {"path": str(path.resolve()), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_checkpoint(checkpoint: Path, source: Path) -> Optional[Dict[str, Any]]:
+    if not checkpoint.exists():
+        return None
+    saved = json.loads(checkpoint.read_text())
+    if saved.get("source") != fingerprint(source):
+        print(f"Ignoring {checkpoint.name}: {source.name} has changed since it was written")
+        return None
+    return saved
+
+
+def save_checkpoint(checkpoint: Path, source: Path, progress) -> None:
+    # Write then rename, so an interrupted write never leaves a torn checkpoint
+    partial = checkpoint.with_suffix(".tmp")
+    partial.write_text(json.dumps({"source": fingerprint(source), "progress": progress.model_dump()}, indent=2))
+    os.replace(partial, checkpoint)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", type=Path, help="Catalogue file to import")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+    parser.add_argument("--on-duplicate", choices=ON_DUPLICATE, default="skip",
+                        help="Skip or update books whose ISBN/barcode is already catalogued")
+    parser.add_argument("--batch-size", type=int, help="Records per batch (default IMPORT_BATCH_SIZE)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint of an earlier run")
+    args = parser.parse_args()
+
+    fmt = args.format or resolve_format(args.file.name)
+    if fmt is None:
+        sys.exit(f"Cannot tell the format of {args.file.name}; pass --format ({', '.join(FORMATS)})")
+
+    checkpoint = args.file.with_name(args.file.name + ".import-checkpoint.json")
+    resume_from = 0
+    if args.resume:
+        saved = load_checkpoint(checkpoint, args.file)
+        if saved:
+            resume_from = saved["progress"]["resume_from"]
+            print(f"Resuming after record {resume_from}")
+
+    import_service = CatalogImportService(on_duplicate=args.on_duplicate, batch_size=args.batch_size)
+    size = args.file.stat().st_size
+    started = time.monotonic()
+    progress = None
+    try:
+        with args.file.open("rb") as stream:
+            async for progress in import_service.run(read_records(stream, fmt), resume_from=resume_from):
+                save_checkpoint(checkpoint, args.file, progress)
+                elapsed = time.monotonic() - started
+                rate = (progress.records_read - resume_from) / elapsed if elapsed else 0
+                position = stream.tell() / size if size else 1
+                eta = elapsed * (1 - position) / position if position else 0
+                print(
+                    f"{progress.records_read:>9} read  {progress.imported:>9} imported  "
+                    f"{progress.updated:>7} updated  {progress.existing:>7} existing  "
+                    f"{progress.duplicates:>6} dup  {progress.invalid:>6} invalid  "
+                    f"{rate:>7.0f} rec/s  ETA {eta:>5.0f}s"
+                )
+    finally:
+        await close_postgres()
+
+    if progress is not None:
+        if progress.unresolved_categories:
+            print(f"{progress.unresolved_categories} records named a category that does not exist")
+        for error in progress.errors:
+            print(f"  {error}")
+        if progress.done:
+            checkpoint.unlink(missing_ok=True)
+            print(f"Done in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Fault-injecting stand-in for Supabase, for exercising the circuit breaker,
+retries and stale fallbacks locally.
+
+Forwards every request to a real upstream (e.g. the `supabase start`
+stack) and injects faults on the way through:
+
+    python scripts/postgrest_fault_proxy.py --upstream http://127.0.0.1:54321 --port 54399
+    SUPABASE_URL=http://127.0.0.1:54399 uvicorn main:app
+
+Faults can be set on the command line or changed while the API runs:
+
+    curl -X POST localhost:54399/__faults -d '{"mode": "error", "rate": 1.0}'
+    curl -X POST localhost:54399/__faults -d '{"mode": "stall"}'
+    curl -X POST localhost:54399/__faults -d '{"mode": "latency", "latency": 2.5}'
+    curl -X POST localhost:54399/__faults -d '{"mode": "off"}'
+    curl localhost:54399/__faults          # current faults and counters
+
+Modes (applied to a `rate` fraction of requests, default all of them):
+    off      forward unchanged
+    latency  wait `latency` seconds, then forward
+    error    answer 503 without forwarding
+    stall    hold the connection open without answering (until `stall` seconds)
+    reset    close the connection without answering
+
+Usage:
+    python scripts/postgrest_fault_proxy.py --upstream URL [--port 54399]
+        [--mode off] [--rate 1.0] [--latency 1.0] [--stall 300]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+MODES = ("off", "latency", "error", "stall", "reset")
+
+# Hop-by-hop headers not copied between the two connections
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "host", "content-encoding"}
+
+
+class Faults:
+    """Current fault settings and counters, shared by all handler threads."""
+
+    def __init__(self, mode: str, rate: float, latency: float, stall: float):
+        self.mode = mode
+        self.rate = rate
+        self.latency = latency
+        self.stall = stall
+        self.counts = {"forwarded": 0, "injected": 0}
+        self._lock = threading.Lock()
+
+    def update(self, changes: dict) -> None:
+        with self._lock:
+            if changes.get("mode", self.mode) not in MODES:
+                raise ValueError(f"mode must be one of {', '.join(MODES)}")
+            for name in ("mode", "rate", "latency", "stall"):
+                if name in changes:
+                    setattr(self, name, changes[name])
+
+    def pick(self) -> str:
+        """The fault for the next request ('off' if none)."""
+        with self._lock:
+            mode = self.mode if self.mode != "off" and random.random() < self.rate else "off"
+            self.counts["forwarded" if mode in ("off", "latency") else "injected"] += 1
+            return mode
+
+    def as_dict(self) -> dict:
+        return {"mode": self.mode, "rate": self.rate, "latency": self.latency, "stall": self.stall, **self.counts}
+
+
+def make_handler(upstream: httpx.Client, faults: Faults):
+    class FaultProxyHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _control(self, body: bytes) -> None:
+            if self.command == "POST":
+                try:
+                    faults.update(json.loads(body or b"{}"))
+                except ValueError as e:
+                    self._reply(400, json.dumps({"error": str(e)}).encode())
+                    return
+            self._reply(200, json.dumps(faults.as_dict()).encode())
+
+        def _handle(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.startswith("/__faults"):
+                self._control(body)
+                return
+
+            mode = faults.pick()
+            if mode == "error":
+                self._reply(503, b'{"message": "injected fault", "code": "PGRST000"}')
+                return
+            if mode == "stall":
+                time.sleep(faults.stall)
+                self.close_connection = True
+                return
+            if mode == "reset":
+                self.close_connection = True
+                return
+            if mode == "latency":
+                time.sleep(faults.latency)
+
+            headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_HEADERS}
+            try:
+                response = upstream.request(self.command, self.path, headers=headers, content=body)
+            except httpx.HTTPError as e:
+                self._reply(502, json.dumps({"message": f"upstream unreachable: {e}"}).encode())
+                return
+            self.send_response(response.status_code)
+            for name, value in response.headers.items():
+                if name.lower() not in HOP_HEADERS:
+                    self.send_header(name, value)
+            self.send_header("Content-Length", str(len(response.content)))
+            self.end_headers()
+            self.wfile.write(response.content)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+        def log_message(self, format, *args):
+            pass
+
+    return FaultProxyHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fault-injecting proxy in front of Supabase/PostgREST")
+    parser.add_argument("--upstream", required=True, help="Real Supabase/PostgREST base URL")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54399)
+    parser.add_argument("--mode", choices=MODES, default="off")
+    parser.add_argument("--rate", type=float, default=1.0, help="Fraction of requests to fault")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds added in latency mode")
+    parser.add_argument("--stall", type=float, default=300.0, help="Seconds held in stall mode")
+    args = parser.parse_args()
+
+    faults = Faults(args.mode, args.rate, args.latency, args.stall)
+    upstream = httpx.Client(base_url=args.upstream, timeout=None)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(upstream, faults))
+    server.daemon_threads = True
+    print(f"Proxying http://{args.host}:{args.port} -> {args.upstream} ({faults.as_dict()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        upstream.close()
+
+
+if __name__ == "__main__":
+    main()
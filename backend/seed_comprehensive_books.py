@@ -3,14 +3,15 @@
 Comprehensive Book Seeding Script
 Populates the database with 12 professional books with cover images
 """
+import asyncio
 import sys
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from supabase import create_client
-from app.core.config import settings
+from app.db.supabase_client import get_supabase
+from app.services.import_service import CatalogImportService
 import logging
 
 # Configure logging
@@ -320,12 +321,12 @@ def get_books_data(categories):
     ]
 
 
-def main():
+async def seed_books():
     """Seed comprehensive book collection"""
     logger.info("📚 Starting comprehensive book seeding...")
 
     # Get Supabase client
-    supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    supabase = get_supabase()
 
     # Fetch category IDs from database
     logger.info("📁 Fetching categories from database...")
@@ -341,51 +342,23 @@ def main():
 
     # Get books data with actual category IDs
     BOOKS = get_books_data(categories)
+    for book_data in BOOKS:
+        logger.info(f"📖 {book_data['title']} ({book_data['title_ar']}) - {book_data['author']}")
 
-    # Check existing books
-    existing_response = supabase.table('books').select('title').execute()
-    existing_count = len(existing_response.data) if existing_response.data else 0
-    logger.info(f"📊 Current books in database: {existing_count}")
-
-    # Seed each book
-    seeded_count = 0
-    failed_count = 0
-
-    for idx, book_data in enumerate(BOOKS, 1):
-        try:
-            logger.info(f"\n📖 [{idx}/{len(BOOKS)}] Seeding: {book_data['title']}")
-            logger.info(f"   Arabic: {book_data['title_ar']}")
-            logger.info(f"   Author: {book_data['author']}")
-            logger.info(f"   Cover: {book_data['cover_image_url']}")
-
-            # Check if book already exists (by ISBN)
-            check_response = supabase.table('books').select('id').eq('isbn', book_data['isbn']).execute()
-
-            if check_response.data and len(check_response.data) > 0:
-                logger.info(f"   ⏭️  Book already exists (ISBN: {book_data['isbn']}), skipping...")
-                continue
-
-            # Insert book
-            insert_response = supabase.table('books').insert(book_data).execute()
-
-            if insert_response.data:
-                seeded_count += 1
-                logger.info(f"   ✅ Successfully seeded!")
-            else:
-                failed_count += 1
-                logger.error(f"   ❌ Failed to seed (no data returned)")
-
-        except Exception as e:
-            failed_count += 1
-            logger.error(f"   ❌ Error seeding book: {str(e)}")
+    # Validate, skip books already present (by ISBN/barcode) and insert the rest in one batch
+    progress = None
+    async for progress in CatalogImportService(on_duplicate='skip').run(BOOKS):
+        pass
 
     # Final summary
     logger.info("\n" + "="*60)
     logger.info("📊 SEEDING SUMMARY")
     logger.info("="*60)
-    logger.info(f"✅ Successfully seeded: {seeded_count} books")
-    logger.info(f"❌ Failed: {failed_count} books")
-    logger.info(f"📚 Total books in database: {existing_count + seeded_count}")
+    logger.info(f"✅ Successfully seeded: {progress.imported} books")
+    logger.info(f"⏭️  Already in database: {progress.existing} books")
+    logger.info(f"❌ Failed: {progress.invalid} books")
+    for error in progress.errors:
+        logger.error(f"   {error}")
     logger.info("="*60)
 
     # Verify final count
@@ -398,5 +371,9 @@ def main():
     logger.info("\n✨ Book seeding complete!")
 
 
+def main():
+    asyncio.run(seed_books())
+
+
 if __name__ == "__main__":
     main()
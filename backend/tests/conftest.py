@@ -0,0 +1,28 @@
+import os
+
+# Settings are read at import time; keep tests off any real services
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ["UPSTASH_REDIS_REST_URL"] = ""
+os.environ["REDIS_URL"] = ""
+os.environ["DATABASE_URL"] = ""
+
+import pytest  # noqa: E402
+
+from tests.fake_redis import FakeRedisServer  # noqa: E402
+
+
+@pytest.fixture
+async def redis_server():
+    server = await FakeRedisServer().start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def redis(redis_server):
+    from app.db.redis import ProtocolRedis
+
+    client = ProtocolRedis(redis_server.url)
+    yield client
+    await client.aclose()
@@ -0,0 +1,136 @@
+"""
+Minimal Redis-protocol (RESP2) server for tests.
+
+Implements the commands the application sends (strings with expiry, SET NX,
+MGET, INCR and the tag sets) in memory, so the ProtocolRedis client and
+redis-py's connection handling are exercised without a real Redis.
+"""
+from typing import Any, Dict, List, Optional, Set, Union
+import asyncio
+import time
+
+
+class FakeRedisServer:
+    """In-memory Redis stand-in listening on 127.0.0.1."""
+
+    def __init__(self):
+        self.data: Dict[str, Union[str, Set[str]]] = {}
+        self.expires: Dict[str, float] = {}
+        self.commands: List[List[str]] = []
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}"
+
+    async def start(self) -> "FakeRedisServer":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def ttl(self, key: str) -> float:
+        """Seconds until `key` expires (-1 without expiry, -2 if missing)."""
+        if self._live(key) is None:
+            return -2
+        if key not in self.expires:
+            return -1
+        return self.expires[key] - time.monotonic()
+
+    def _live(self, key: str) -> Any:
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                self.commands.append(command)
+                writer.write(self._encode(self._run(command)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[str]]:
+        header = await reader.readline()
+        if not header:
+            return None
+        count = int(header[1:].strip())
+        parts = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:].strip())
+            parts.append((await reader.readexactly(length + 2))[:-2].decode())
+        return parts
+
+    def _encode(self, value: Any) -> bytes:
+        if isinstance(value, Exception):
+            return f"-ERR {value}\r\n".encode()
+        if value is None:
+            return b"$-1\r\n"
+        if value is True:
+            return b"+OK\r\n"
+        if isinstance(value, int):
+            return f":{value}\r\n".encode()
+        if isinstance(value, (list, set)):
+            return f"*{len(value)}\r\n".encode() + b"".join(self._encode(item) for item in value)
+        data = str(value).encode()
+        return b"$" + str(len(data)).encode() + b"\r\n" + data + b"\r\n"
+
+    def _run(self, command: List[str]) -> Any:
+        name, args = command[0].upper(), command[1:]
+        if name == "PING":
+            return True
+        if name in ("CLIENT", "SELECT"):
+            return True
+        if name == "GET":
+            value = self._live(args[0])
+            return value if isinstance(value, str) or value is None else Exception("WRONGTYPE")
+        if name == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            if "NX" in options and self._live(key) is not None:
+                return None
+            self.data[key] = value
+            self.expires.pop(key, None)
+            if "EX" in options:
+                self.expires[key] = time.monotonic() + int(args[2 + options.index("EX") + 1])
+            return True
+        if name == "MGET":
+            return [self._live(key) if isinstance(self._live(key), str) else None for key in args]
+        if name == "DEL":
+            removed = 0
+            for key in args:
+                if self._live(key) is not None:
+                    removed += 1
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if name == "INCR":
+            value = int(self._live(args[0]) or 0) + 1
+            self.data[args[0]] = str(value)
+            return value
+        if name == "SADD":
+            members = self._live(args[0])
+            if members is None:
+                members = self.data[args[0]] = set()
+            before = len(members)
+            members.update(args[1:])
+            return len(members) - before
+        if name == "SMEMBERS":
+            return sorted(self._live(args[0]) or ())
+        if name == "EXPIRE":
+            if self._live(args[0]) is None:
+                return 0
+            self.expires[args[0]] = time.monotonic() + int(args[1])
+            return 1
+        return Exception(f"unknown command '{command[0]}'")
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from app.core import dependencies
+from app.core.cache import get_cache
+from app.services.cache_invalidation_service import apply_changes
+
+
+@pytest.fixture
+def load_user(monkeypatch):
+    """Replaces the database read; each call blocks until `release` is set."""
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_load_user(user_id):
+        calls.append(user_id)
+        await release.wait()
+        return {"id": user_id, "is_active": len(calls) > 1, "roles": {"name": "Librarian"}}
+
+    monkeypatch.setattr(dependencies, "_load_user", fake_load_user)
+    get_cache().clear_local()
+    yield calls, release
+    get_cache().clear_local()
+
+
+@pytest.mark.parametrize("change", [
+    {"table": "users", "op": "UPDATE", "id": "u1"},
+    {"table": "roles", "op": "UPDATE", "id": "r1"},
+])
+async def test_user_evicted_during_load_is_not_cached(load_user, change):
+    calls, release = load_user
+    first = asyncio.create_task(dependencies._load_cached_user("u1"))
+    while not calls:
+        await asyncio.sleep(0)
+
+    # The notification lands while the row read before the change is in flight
+    await apply_changes([change])
+    release.set()
+    assert (await first)["is_active"] is False
+
+    assert (await asyncio.wait_for(dependencies._load_cached_user("u1"), timeout=2))["is_active"] is True
+    assert (await dependencies._load_cached_user("u1"))["is_active"] is True
+    assert calls == ["u1", "u1"]
@@ -0,0 +1,220 @@
+import asyncio
+import time
+
+from pydantic import TypeAdapter
+
+from app.core.cache import _MISSING, LRUCache, TwoLevelCache
+
+ADAPTER = TypeAdapter(dict)
+
+
+def make_cache(redis=None, **options) -> TwoLevelCache:
+    options.setdefault("jitter", 0)
+    return TwoLevelCache(l1=LRUCache(64), redis=redis, prefix="test", default_ttl=300, l1_ttl=30, **options)
+
+
+class Loader:
+    """Counts calls; optionally blocks each call until released."""
+
+    def __init__(self, value=None, block: bool = False):
+        self.value = value if value is not None else {"v": 1}
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        if not block:
+            self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return dict(self.value)
+
+
+# LRUCache
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, 60)
+    lru.set("b", 2, 60)
+    lru.get("a")
+    lru.set("c", 3, 60)
+    assert lru.get("b") is _MISSING
+    assert lru.get("a") == 1 and lru.get("c") == 3
+
+
+def test_lru_expires_entries():
+    lru = LRUCache()
+    lru.set("a", 1, ttl=-1)
+    assert lru.get("a") is _MISSING
+
+
+def test_lru_prunes_tags_of_evicted_and_expired_entries():
+    lru = LRUCache(max_entries=10)
+    for i in range(1000):
+        lru.set(f"book:{i}", i, 60, tags=[f"book:{i}", "books"])
+    assert len(lru) == 10
+    assert len(lru._tags) == 11
+    assert lru._tags["books"] == {f"book:{i}" for i in range(990, 1000)}
+
+    lru.set("short", 1, ttl=-1, tags=["short-tag"])
+    assert lru.get("short") is _MISSING
+    assert "short-tag" not in lru._tags
+
+
+def test_lru_overwrite_replaces_tags():
+    lru = LRUCache()
+    lru.set("a", 1, 60, tags=["old"])
+    lru.set("a", 2, 60, tags=["new"])
+    assert "old" not in lru._tags
+    assert lru.invalidate_tag("new") == ["a"]
+    assert lru.get("a") is _MISSING and not lru._tags
+
+
+# TwoLevelCache
+
+async def test_l1_hit_skips_loader():
+    cache = make_cache()
+    loader = Loader()
+    assert await cache.get_or_load("ns", "k", loader, ADAPTER) == {"v": 1}
+    assert await cache.get_or_load("ns", "k", loader, ADAPTER) == {"v": 1}
+    assert loader.calls == 1
+
+
+async def test_l2_is_shared_between_workers(redis, redis_server):
+    worker_a, worker_b = make_cache(redis), make_cache(redis)
+    loader = Loader()
+    await worker_a.get_or_load("ns", "k", loader, ADAPTER)
+    assert redis_server.data["test:ns:k"] == '{"v":1}'
+
+    assert await worker_b.get_or_load("ns", "k", loader, ADAPTER) == {"v": 1}
+    assert loader.calls == 1
+    assert worker_b.l1.get("test:ns:k") == {"v": 1}
+
+
+async def test_ttl_jitter_spreads_expiry(redis, redis_server):
+    cache = make_cache(redis, jitter=0.1)
+    ttls = {cache._jittered(100) for _ in range(200)}
+    assert all(90 <= ttl <= 110 for ttl in ttls)
+    assert len(ttls) > 1
+
+    for i in range(20):
+        await cache.get_or_load("ns", str(i), Loader(), ADAPTER, ttl=100)
+    l2_ttls = [redis_server.ttl(f"test:ns:{i}") for i in range(20)]
+    assert all(88 <= ttl <= 110 for ttl in l2_ttls)
+    assert len({int(ttl) for ttl in l2_ttls}) > 1
+
+
+async def test_concurrent_misses_share_one_load(redis):
+    cache = make_cache(redis)
+    loader = Loader(block=True)
+    calls = [asyncio.create_task(cache.get_or_load("ns", "k", loader, ADAPTER)) for _ in range(10)]
+    await loader.started.wait()
+    loader.release.set()
+    assert await asyncio.gather(*calls) == [{"v": 1}] * 10
+    assert loader.calls == 1
+
+
+async def test_invalidate_tags_evicts_l1_and_l2(redis, redis_server):
+    cache = make_cache(redis)
+    await cache.get_or_load("ns", "a", Loader(), ADAPTER, tags=["books"])
+    await cache.get_or_load("ns", "b", Loader(), ADAPTER, tags=["books", "book:b"])
+    await cache.get_or_load("ns", "c", Loader(), ADAPTER, tags=["categories"])
+    assert redis_server.data["test:tag:books"] == {"test:ns:a", "test:ns:b"}
+
+    await cache.invalidate_tags("books")
+
+    assert cache.l1.get("test:ns:a") is _MISSING and cache.l1.get("test:ns:b") is _MISSING
+    assert "test:ns:a" not in redis_server.data and "test:ns:b" not in redis_server.data
+    assert "test:tag:books" not in redis_server.data
+    assert cache.l1.get("test:ns:c") == {"v": 1} and "test:ns:c" in redis_server.data
+
+
+async def test_load_invalidated_midway_is_not_cached(redis, redis_server):
+    cache = make_cache(redis)
+    before_write = Loader({"title": "old"}, block=True)
+    first = asyncio.create_task(cache.get_or_load("book", "1", before_write, ADAPTER, tags=["book:1"]))
+    await before_write.started.wait()
+
+    await cache.invalidate_tags("book:1")
+    after_write = Loader({"title": "new"})
+    # Arriving after the write: must not join the load that started before it
+    fresh = cache.get_or_load("book", "1", after_write, ADAPTER, tags=["book:1"])
+    assert await asyncio.wait_for(fresh, timeout=2) == {"title": "new"}
+
+    before_write.release.set()
+    assert await first == {"title": "old"}
+    assert cache.l1.get("test:book:1") == {"title": "new"}
+    assert redis_server.data["test:book:1"] == '{"title":"new"}'
+
+
+async def test_load_is_not_cached_after_delete_or_clear():
+    cache = make_cache()
+    for invalidate in (lambda: cache.delete("ns", "k"), cache.clear_local):
+        loader = Loader(block=True)
+        call = asyncio.create_task(cache.get_or_load("ns", "k", loader, ADAPTER))
+        await loader.started.wait()
+        result = invalidate()
+        if asyncio.iscoroutine(result):
+            await result
+        loader.release.set()
+        assert await call == {"v": 1}
+        assert cache.l1.get("test:ns:k") is _MISSING
+
+
+async def test_get_many_batches_and_skips_invalidated_loads(redis):
+    cache = make_cache(redis)
+    batches = []
+
+    async def load(keys):
+        batches.append(list(keys))
+        return {key: {"id": key} for key in keys}
+
+    result = await cache.get_many("avail", ["1", "2"], load, ADAPTER, tags=lambda key: [f"book:{key}"])
+    assert result == {"1": {"id": "1"}, "2": {"id": "2"}}
+    assert await cache.get_many("avail", ["1", "2", "3"], load, ADAPTER) == {
+        "1": {"id": "1"}, "2": {"id": "2"}, "3": {"id": "3"},
+    }
+    assert batches == [["1", "2"], ["3"]]
+
+    release = asyncio.Event()
+
+    async def slow_load(keys):
+        await release.wait()
+        return {key: {"id": key, "stale": True} for key in keys}
+
+    call = asyncio.create_task(cache.get_many("avail", ["9"], slow_load, ADAPTER, tags=lambda key: [f"book:{key}"]))
+    await asyncio.sleep(0.05)
+    await cache.invalidate_tags("book:9")
+    release.set()
+    assert await call == {"9": {"id": "9", "stale": True}}
+    assert cache.l1.get("test:avail:9") is _MISSING
+    assert await redis.get("test:avail:9") is None
+
+
+async def test_unreachable_redis_degrades_to_l1():
+    from app.db.redis import ProtocolRedis
+
+    redis = ProtocolRedis("redis://127.0.0.1:9")
+    cache = make_cache(redis)
+    loader = Loader()
+    started = time.monotonic()
+    assert await cache.get_or_load("ns", "k", loader, ADAPTER, tags=["t"]) == {"v": 1}
+    assert await cache.get_or_load("ns", "k", loader, ADAPTER) == {"v": 1}
+    await cache.invalidate_tags("t")
+    assert loader.calls == 1
+    assert time.monotonic() - started < 5
+    await redis.aclose()
+
+
+async def test_version_counters_are_shared_only_through_redis(redis):
+    worker_a, worker_b = make_cache(redis, version_ttl=0), make_cache(redis, version_ttl=0)
+    await worker_a.bump_version("catalog")
+    assert await worker_b.get_shared_version("catalog") == 1
+    assert await worker_b.get_version("catalog") == 1
+
+    local_a, local_b = make_cache(), make_cache()
+    await local_a.bump_version("catalog")
+    assert await local_a.get_version("catalog") == 1
+    assert await local_b.get_version("catalog") == 0
+    assert await local_a.get_shared_version("catalog") is None
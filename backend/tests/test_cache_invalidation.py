@@ -0,0 +1,57 @@
+import pytest
+
+from app.core.cache import _MISSING
+from app.services import cache_invalidation_service as invalidation
+from app.services.books_service import CATALOG_VERSION
+from tests.test_cache import ADAPTER, Loader, make_cache
+
+BOOK_UPDATE = {"table": "books", "op": "UPDATE", "id": "b1", "txid": 42}
+
+
+async def fill(cache):
+    await cache.get_or_load("book", "b1", Loader(), ADAPTER, tags=["book:b1"])
+    return await cache.get_version(CATALOG_VERSION)
+
+
+async def notify(monkeypatch, cache, changes):
+    monkeypatch.setattr(invalidation, "get_cache", lambda: cache)
+    await invalidation.apply_changes(changes)
+
+
+def count(redis_server, name, key=None):
+    return sum(1 for command in redis_server.commands if command[0].upper() == name and (key is None or key in command))
+
+
+async def test_each_worker_evicts_its_l1_and_one_clears_redis(monkeypatch, redis, redis_server):
+    workers = [make_cache(redis, version_ttl=60) for _ in range(3)]
+    for worker in workers:
+        assert await fill(worker) == 0
+    assert "test:book:b1" in redis_server.data
+
+    for worker in workers:
+        await notify(monkeypatch, worker, [BOOK_UPDATE])
+
+    assert count(redis_server, "INCR", "test:version:catalog") == 1
+    assert count(redis_server, "SMEMBERS", "test:tag:book:b1") == 1
+    assert "test:book:b1" not in redis_server.data
+    for worker in workers:
+        assert worker.l1.get("test:book:b1") is _MISSING
+        # The memoized version was dropped, so the bump is seen at once
+        assert await worker.get_version(CATALOG_VERSION) == 1
+
+
+async def test_payloads_without_txid_are_handled_by_every_worker(monkeypatch, redis, redis_server):
+    workers = [make_cache(redis) for _ in range(2)]
+    legacy = {key: value for key, value in BOOK_UPDATE.items() if key != "txid"}
+    for worker in workers:
+        await notify(monkeypatch, worker, [legacy])
+    assert count(redis_server, "INCR", "test:version:catalog") == 2
+
+
+async def test_without_redis_every_worker_bumps_its_own_version(monkeypatch):
+    workers = [make_cache(), make_cache()]
+    for worker in workers:
+        await fill(worker)
+        await notify(monkeypatch, worker, [BOOK_UPDATE])
+        assert worker.l1.get("test:book:b1") is _MISSING
+        assert await worker.get_version(CATALOG_VERSION) == 1
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.services import circulation_history_service as history
+from app.services.circulation_history_service import CirculationHistoryService
+
+
+class FakeQuery:
+    """PostgREST query over in-memory rows, capped at max-rows like the real API."""
+
+    def __init__(self, rows, max_rows, requests):
+        self.rows, self.max_rows, self.requests = rows, max_rows, requests
+        self.bounds = (0, None)
+
+    def select(self, columns):
+        self.columns = columns.split(',')
+        return self
+
+    def gte(self, column, value):
+        self.rows = [row for row in self.rows if row[column] >= value]
+        return self
+
+    def lte(self, column, value):
+        self.rows = [row for row in self.rows if row[column] <= value]
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, first, last):
+        self.bounds = (first, last + 1)
+        return self
+
+    def execute(self):
+        self.requests.append(self.bounds)
+        rows = sorted(self.rows, key=lambda row: (row['issue_date'], row['id']))[slice(*self.bounds)]
+
+        class Response:
+            data = [{column: row[column] for column in self.columns} for row in rows[:self.max_rows]]
+        return Response()
+
+
+class FakeClient:
+    def __init__(self, rows, max_rows=1000):
+        self.rows, self.max_rows, self.requests = rows, max_rows, []
+
+    def table(self, name):
+        assert name == 'circulation_records'
+        return FakeQuery(self.rows, self.max_rows, self.requests)
+
+
+def loans(count, first_day):
+    return [
+        {'id': f'{i:06d}', 'user_id': f'u{i % 7}', 'issue_date': (first_day + timedelta(days=i % 300)).isoformat()}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def live(monkeypatch):
+    client = FakeClient(loans(2500, date(2026, 1, 1)))
+    monkeypatch.setattr(history, 'get_supabase', lambda: client)
+    monkeypatch.setattr(history, 'read_supabase', lambda: client)
+    monkeypatch.setattr(history, 'get_circulation_archive', lambda: None)
+    return client
+
+
+async def test_live_records_are_paged_past_max_rows(live):
+    rows = await CirculationHistoryService().get_records(date(2026, 1, 1), date(2026, 12, 31), ('id', 'user_id'))
+    assert len(rows) == 2500
+    assert len({row['id'] for row in rows}) == 2500
+    assert live.requests == [(0, 1000), (1000, 2000), (2000, 3000)]
+
+
+async def test_archived_years_are_merged(live, monkeypatch, tmp_path):
+    pytest.importorskip('pyarrow')
+    from app.db.archive import CirculationArchive
+
+    archive = CirculationArchive(str(tmp_path))
+    # As asyncpg returns them: dates, not strings
+    archived = [{**row, 'issue_date': date.fromisoformat(row['issue_date'])} for row in loans(1200, date(2019, 1, 1))]
+    archive.write(2019, '2019', archived)
+    monkeypatch.setattr(history, 'get_circulation_archive', lambda: archive)
+
+    rows = await CirculationHistoryService().get_records(date(2019, 1, 1), date(2026, 12, 31), ('id', 'issue_date'))
+    assert len(rows) == 2500 + 1200
+    assert {row['issue_date'][:4] for row in rows} >= {'2019', '2026'}
+
+    only_live = await CirculationHistoryService().get_records(date(2026, 1, 1), date(2026, 12, 31), ('id',))
+    assert len(only_live) == 2500
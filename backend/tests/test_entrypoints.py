@@ -0,0 +1,26 @@
+import pytest
+
+
+def middleware_of(app):
+    """Middleware class names, outermost first."""
+    return [middleware.cls.__name__ for middleware in app.user_middleware]
+
+
+@pytest.fixture(scope="module")
+def entrypoints():
+    import main
+    from api import index
+
+    return {"main": main.app, "vercel": index.app}
+
+
+@pytest.mark.parametrize("name", ["main", "vercel"])
+def test_desk_writes_are_idempotent_in_every_entrypoint(entrypoints, name):
+    stack = middleware_of(entrypoints[name])
+    assert stack.index("ResponseEncodingMiddleware") < stack.index("CORSMiddleware") \
+        < stack.index("IdempotencyMiddleware") < stack.index("AdmissionMiddleware")
+
+
+def test_entrypoints_share_one_middleware_stack(entrypoints):
+    assert middleware_of(entrypoints["main"]) == middleware_of(entrypoints["vercel"])
+    assert middleware_of(entrypoints["vercel"])[0] == "StaleResponseMiddleware"
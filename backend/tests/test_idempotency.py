@@ -0,0 +1,72 @@
+import httpx
+import pytest
+
+from app.core import idempotency
+from app.core.cache import LRUCache
+from app.core.idempotency import IdempotencyMiddleware, IdempotencyStore
+from app.core.security import create_access_token
+
+PATH = "/api/v1/circulation"
+
+
+class Desk:
+    """Inner app answering with the given statuses in turn."""
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        await receive()
+        status = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        self.calls += 1
+        body = f'{{"call":{self.calls}}}'.encode()
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = IdempotencyStore(local=LRUCache(100))
+    monkeypatch.setattr(idempotency, "idempotency_store", store)
+    return store
+
+
+async def checkout(app, key="k1"):
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'user_id': 'u1'})}",
+        "Idempotency-Key": key,
+    }
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(PATH, json={"book_id": "b1"}, headers=headers)
+
+
+@pytest.mark.parametrize("status", [401, 403, 408, 409, 429, 500, 503])
+async def test_transient_responses_are_not_replayed(store, status):
+    desk = Desk(status, 201)
+    app = IdempotencyMiddleware(desk)
+
+    first = await checkout(app)
+    assert first.status_code == status
+
+    retry = await checkout(app)
+    assert retry.status_code == 201
+    assert "idempotent-replayed" not in retry.headers
+    assert desk.calls == 2
+
+    again = await checkout(app)
+    assert again.status_code == 201 and again.json() == {"call": 2}
+    assert again.headers["idempotent-replayed"] == "true"
+    assert desk.calls == 2
+
+
+@pytest.mark.parametrize("status", [200, 201, 400, 404, 422])
+async def test_final_responses_are_replayed(store, status):
+    desk = Desk(status, 201)
+    app = IdempotencyMiddleware(desk)
+
+    await checkout(app)
+    retry = await checkout(app)
+    assert retry.status_code == status and retry.json() == {"call": 1}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert desk.calls == 1
@@ -0,0 +1,38 @@
+from app.core.trigram_index import COMPACT_MIN_DEAD, TrigramIndex
+
+
+def test_suggests_closest_vocabulary_words():
+    index = TrigramIndex.build(["Naguib Mahfouz", "Palace Walk", "Sugar Street"])
+    assert index.suggest("naguib mahfuz") == ["Naguib Mahfouz"]
+    assert index.suggest("palace walk") == []
+
+
+def test_suggestions_keep_the_indexed_spelling():
+    index = TrigramIndex.build(["Flann O'Brien", "مدرسة المشاغبين", "Gabriel García Márquez"])
+    assert index.suggest("o brian") == ["O'Brien"]
+    assert index.suggest("مدرسه المشاغبن") == ["مدرسة المشاغبين"]
+    assert index.suggest("garcia marqez") == ["García Márquez"]
+
+
+def test_removed_words_are_not_suggested():
+    index = TrigramIndex()
+    index.add("The Cairo Trilogy")
+    index.add("Cairo Modern")
+    index.remove("The Cairo Trilogy")
+    assert index.suggest("trilogi") == []
+    assert index.suggest("kairo") == ["Cairo"]
+
+
+def test_postings_are_compacted_under_churn():
+    index = TrigramIndex()
+    index.add("permanent collection")
+    for i in range(COMPACT_MIN_DEAD * 3):
+        word = f"temporary{i}"
+        index.add(word)
+        index.remove(word)
+
+    assert len(index) == 2
+    assert len(index._words) <= COMPACT_MIN_DEAD + 2
+    assert sum(len(ids) for ids in index._postings.values()) < 20 * (COMPACT_MIN_DEAD + 2)
+    assert not index._spellings.keys() - {"permanent", "collection"}
+    assert index.suggest("colection") == ["collection"]